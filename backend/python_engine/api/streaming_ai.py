@@ -0,0 +1,432 @@
+"""
+Streaming AI pipeline behind the /streaming endpoints.
+Template cards are sent as soon as they are built, then each card's
+rationale is rewritten by the LLM and streamed token by token, so the UI
+has content within milliseconds and live text well before generation
+finishes. Also provides the per-profile indexer used by the RAG stream.
+"""
+
+import re
+import json
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.api_cache import api_cache, UnifiedAPICache
+from ai.unified_card_generator import unified_card_generator
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on an LLM-written card rationale
+RATIONALE_MAX_TOKENS = 160
+
+# Questions whose (structured) answers ground the card rationales
+PROFILE_CONTEXT_QUERIES = [
+    "What are my account balances?",
+    "How much did I spend last month?"
+]
+
+
+class StreamEventType(str, Enum):
+    """Kinds of events emitted by the streaming pipeline"""
+    START = "start"
+    CARD = "card"
+    RAG_RETRIEVAL = "rag_retrieval"
+    INSIGHT_GENERATION = "insight_generation"
+    TOKEN = "token"
+    CARD_COMPLETE = "card_complete"
+    VALIDATION = "validation"
+    COMPLETE = "complete"
+    ERROR = "error"
+
+
+@dataclass
+class StreamEvent:
+    """One progress update; data always carries the message for plain-text clients"""
+    event_type: StreamEventType
+    data: Dict[str, Any]
+    progress: float = 0.0
+    message: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        self.data.setdefault("message", self.message)
+
+
+class OptimizedRAGIndexer:
+    """
+    Per-profile lookup indexes over the profile's records (category, month,
+    amount range, account type, institution) plus query classification.
+    Aggregate questions are answered by the profile's structured planner;
+    anything else goes through the profile's RAG tools.
+    """
+
+    # Keyword patterns -> query type
+    QUERY_PATTERNS = {
+        'spending_analysis': ['spending', 'spend', 'spent', 'expense', 'transaction', 'purchase'],
+        'account_analysis': ['account', 'balance', 'savings', 'checking'],
+        'investment_analysis': ['investment', 'portfolio', 'stock', 'holding'],
+        'debt_analysis': ['debt', 'loan', 'credit', 'mortgage'],
+        'goal_analysis': ['goal', 'target', 'planning'],
+        'risk_analysis': ['risk', 'safety', 'emergency']
+    }
+
+    # Query type -> (data type, RAG tool)
+    QUERY_TOOLS = {
+        'spending_analysis': ('transactions', 'query_transactions'),
+        'account_analysis': ('accounts', 'query_accounts'),
+        'investment_analysis': ('investments', 'query_investments'),
+        'debt_analysis': ('accounts', 'query_accounts'),
+        'goal_analysis': ('goals', 'query_goals'),
+        'risk_analysis': ('demographics', 'query_demographics'),
+        'general': (None, 'query_all_data')
+    }
+
+    # (index prefix, data type, column)
+    INDEX_SPECS = [
+        ('category', 'transactions', '_category'),
+        ('month', 'transactions', '_month'),
+        ('amount', 'transactions', '_amount_range'),
+        ('account_type', 'accounts', 'account_type'),
+        ('institution', 'accounts', 'institution_name')
+    ]
+
+    AMOUNT_RANGES = [(50.0, 'small'), (500.0, 'medium'), (5000.0, 'large'), (np.inf, 'very_large')]
+
+    def __init__(self, profile_system, max_records: int = 20):
+        """
+        Args:
+            profile_system: rag.profile_rag_system.ProfileRAGSystem to index and query
+            max_records: Records returned with each query result
+        """
+        self.profile_system = profile_system
+        self.planner = profile_system.query_planner
+        self.max_records = max_records
+        self.frames = self._prepare_frames()
+        # index key -> (index prefix, data type, row positions)
+        self.indexes: Dict[str, Tuple[str, str, np.ndarray]] = {}
+        for prefix, data_type, column in self.INDEX_SPECS:
+            self.indexes.update(self._build_index(data_type, column, prefix))
+
+    def _prepare_frames(self) -> Dict[str, pd.DataFrame]:
+        """The planner's per-profile frames, with derived month and amount range columns"""
+        transactions = self.planner.transactions
+        if not transactions.empty:
+            bins = [-np.inf] + [upper for upper, _ in self.AMOUNT_RANGES]
+            transactions = transactions.assign(
+                _month=transactions['_date'].dt.strftime('%Y_%m'),
+                _amount_range=pd.cut(
+                    transactions['_amount'].abs(), bins=bins,
+                    labels=[label for _, label in self.AMOUNT_RANGES], right=False
+                ).astype(str)
+            )
+        return {
+            'accounts': self.planner.accounts,
+            'transactions': transactions,
+            'goals': self.planner.goals,
+            'investments': self.planner.investments
+        }
+
+    def _build_index(self, data_type: str, column: str, prefix: str) -> Dict[str, Tuple[str, str, np.ndarray]]:
+        """Row positions for each value of a column, keyed '<prefix>_<value>'"""
+        df = self.frames.get(data_type, pd.DataFrame())
+        if df.empty or column not in df.columns:
+            return {}
+        return {
+            f"{prefix}_{str(value).lower().replace(' ', '_')}": (prefix, data_type, positions)
+            for value, positions in df.groupby(column, sort=False).indices.items()
+            if pd.notna(value) and str(value) != 'nan'
+        }
+
+    def _classify_query(self, query: str) -> str:
+        """Query type whose keywords occur most often in the query"""
+        text = query.lower()
+        scores = {
+            query_type: sum(1 for keyword in keywords if re.search(r"\b" + keyword, text))
+            for query_type, keywords in self.QUERY_PATTERNS.items()
+        }
+        best = max(scores, key=scores.get)
+        return best if scores[best] > 0 else 'general'
+
+    def _matching_indexes(self, text: str) -> List[str]:
+        """Index keys whose value the query names"""
+        date_range = self.planner.date_range(text)
+        matched = []
+        for key, (prefix, _, _) in self.indexes.items():
+            value = key[len(prefix) + 1:]
+            if prefix == 'month':
+                if date_range is not None:
+                    month_start = pd.Timestamp(year=int(value[:4]), month=int(value[5:]), day=1)
+                    if month_start < date_range.end and month_start + pd.DateOffset(months=1) > date_range.start:
+                        matched.append(key)
+            elif prefix == 'amount':
+                label = value.replace('_', ' ')
+                if re.search(rf"\b{label}\s+(transactions?|purchases?|expenses?|payments?)\b", text):
+                    matched.append(key)
+            elif self.planner.mentions(text, value.replace('_', ' ')):
+                matched.append(key)
+        return matched
+
+    def _lookup(self, text: str, data_type: Optional[str]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Records selected by the indexes the query names: values of one index
+        family are unioned, different families intersected.
+        """
+        matched = [key for key in self._matching_indexes(text) if data_type is None or self.indexes[key][1] == data_type]
+        if not matched:
+            return [], []
+        target = self.indexes[matched[0]][1]
+        matched = [key for key in matched if self.indexes[key][1] == target]
+
+        families: Dict[str, np.ndarray] = {}
+        for key in matched:
+            prefix, _, rows = self.indexes[key]
+            families[prefix] = np.union1d(families[prefix], rows) if prefix in families else rows
+        rows = None
+        for family_rows in families.values():
+            rows = family_rows if rows is None else np.intersect1d(rows, family_rows)
+
+        df = self.frames[target].iloc[np.sort(rows)[:self.max_records]]
+        if '_category' in df.columns and 'category' not in df.columns:
+            df = df.assign(category=df['_category'])
+        df = df.drop(columns=[c for c in df.columns if c.startswith('_')])
+        return matched, json.loads(df.to_json(orient='records', date_format='iso'))
+
+    def optimized_query(self, query: str, context: str = "") -> Dict[str, Any]:
+        """
+        Answer a question about the profile.
+
+        Args:
+            query: The question
+            context: Caller-supplied label for the query, echoed in the result
+
+        Returns:
+            answer, source ('structured' or 'retrieval'), query_type, indexes_used,
+            the records those indexes select, and timing
+        """
+        start_time = time.time()
+        query_type = self._classify_query(query)
+        data_type, tool_name = self.QUERY_TOOLS[query_type]
+        indexes_used, records = self._lookup(query.lower(), data_type)
+
+        answer = self.planner.answer(query, data_type) if data_type else None
+        source = 'structured'
+        if answer is None:
+            answer = self.profile_system.query(query, tool_name)
+            source = 'retrieval'
+
+        return {
+            'query': query,
+            'context': context,
+            'query_type': query_type,
+            'answer': answer,
+            'source': source,
+            'indexes_used': indexes_used,
+            'records': records,
+            'execution_time_ms': (time.time() - start_time) * 1000
+        }
+
+
+class StreamingAIPipeline:
+    """Streams explanation card generation and serves per-profile RAG indexers."""
+
+    def __init__(self, rag_manager=None, llm: Optional[UnifiedAPICache] = None):
+        """
+        Args:
+            rag_manager: rag.profile_rag_system.ProfileRAGManager; without one,
+                cards are generated without profile context
+            llm: Completion provider for rationales; defaults to the shared API
+                cache when it has a provider configured
+        """
+        self.rag_manager = rag_manager
+        if llm is None and api_cache.configs:
+            llm = api_cache
+        self.ai_system = llm
+        self.indexers: Dict[int, OptimizedRAGIndexer] = {}
+        self._lock = threading.Lock()
+
+    def get_optimized_indexer(self, profile_id: int) -> OptimizedRAGIndexer:
+        """
+        Indexer for a profile, rebuilt when the RAG manager has rebuilt the profile.
+
+        Raises:
+            RuntimeError: If no RAG manager is available
+        """
+        if self.rag_manager is None:
+            raise RuntimeError("RAG manager is not available")
+        profile_system = self.rag_manager.get_profile_system(profile_id)
+        with self._lock:
+            indexer = self.indexers.get(profile_id)
+            if indexer is None or indexer.profile_system is not profile_system:
+                indexer = OptimizedRAGIndexer(profile_system)
+                self.indexers[profile_id] = indexer
+        return indexer
+
+    async def stream_ai_generation(
+        self,
+        simulation_data: Dict[str, Any],
+        user_profile: Dict[str, Any],
+        profile_id: int = 1,
+        scenario_config: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Generate explanation cards, yielding events as each stage produces output.
+
+        Stages: template cards (one CARD event each), profile context, LLM
+        rationales streamed as TOKEN events with a CARD_COMPLETE per card,
+        validation, and COMPLETE with the final cards.
+        """
+        start_time = time.time()
+        scenario = simulation_data.get("scenario_name") or simulation_data.get("scenario_type") or "financial_planning"
+        yield StreamEvent(
+            StreamEventType.START, {"scenario": scenario, "profile_id": profile_id},
+            0.0, "Starting AI generation pipeline"
+        )
+
+        # Template cards are cheap; send them first so the UI can render immediately
+        cards = unified_card_generator.generate_cards(
+            simulation_data=simulation_data,
+            user_profile=user_profile,
+            scenario_config=scenario_config
+        )[:3]
+        for index, card in enumerate(cards):
+            yield StreamEvent(StreamEventType.CARD, {"card_index": index, "card": card}, 5.0 + 5.0 * index, f"Card {index + 1} ready")
+
+        profile_context = await self._profile_context(profile_id)
+        yield StreamEvent(
+            StreamEventType.RAG_RETRIEVAL, {"profile_context": profile_context},
+            25.0, "RAG retrieval completed" if profile_context else "No profile context available"
+        )
+
+        if self.ai_system is None:
+            yield StreamEvent(
+                StreamEventType.INSIGHT_GENERATION, {"llm": False},
+                85.0, "No LLM provider configured; keeping template rationales"
+            )
+        else:
+            yield StreamEvent(StreamEventType.INSIGHT_GENERATION, {"llm": True}, 25.0, "Generating personalized rationales")
+            async for event in self._stream_rationales(cards, scenario, user_profile, profile_context):
+                yield event
+
+        missing = [index for index, card in enumerate(cards) if not all(card.get(f) for f in ("title", "description", "rationale"))]
+        yield StreamEvent(
+            StreamEventType.VALIDATION, {"card_count": len(cards), "incomplete_cards": missing},
+            95.0, "Cards validated" if not missing else f"{len(missing)} cards are missing fields"
+        )
+        yield StreamEvent(
+            StreamEventType.COMPLETE,
+            {"cards": cards, "execution_time_ms": (time.time() - start_time) * 1000},
+            100.0, "AI generation completed"
+        )
+
+    async def _profile_context(self, profile_id: int) -> Optional[str]:
+        """Exact balance and spending summary for grounding rationales, or None"""
+        if self.rag_manager is None:
+            return None
+        try:
+            # The first request for a profile may load the shared index; keep it off the loop
+            indexer = await asyncio.to_thread(self.get_optimized_indexer, profile_id)
+            results = await asyncio.gather(*[
+                asyncio.to_thread(indexer.optimized_query, query, "card_context") for query in PROFILE_CONTEXT_QUERIES
+            ])
+        except Exception as e:
+            logger.warning(f"Profile context unavailable for profile {profile_id}: {e}")
+            return None
+        return "\n".join(result['answer'] for result in results if result['source'] == 'structured') or None
+
+    async def _stream_rationales(
+        self,
+        cards: List[Dict[str, Any]],
+        scenario: str,
+        user_profile: Dict[str, Any],
+        profile_context: Optional[str]
+    ) -> AsyncIterator[StreamEvent]:
+        """Rewrite every card's rationale concurrently, interleaving their tokens"""
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def generate(index: int, card: Dict[str, Any]) -> None:
+            parts: List[str] = []
+            try:
+                async for delta in self.ai_system.stream_completion(
+                    prompt=self._rationale_prompt(card, scenario, user_profile, profile_context),
+                    max_tokens=RATIONALE_MAX_TOKENS
+                ):
+                    parts.append(delta)
+                    await queue.put((index, delta, None))
+                rationale = "".join(parts).strip()
+                if rationale:
+                    card["rationale"] = rationale
+                await queue.put((index, None, None))
+            except Exception as e:
+                logger.warning(f"Rationale generation failed for card {index + 1}: {e}")
+                await queue.put((index, None, str(e)))
+
+        tasks = [asyncio.create_task(generate(index, card)) for index, card in enumerate(cards)]
+        finished = 0
+        try:
+            while finished < len(tasks):
+                index, delta, error = await queue.get()
+                progress = 25.0 + 60.0 * finished / len(tasks)
+                if delta is not None:
+                    yield StreamEvent(StreamEventType.TOKEN, {"card_index": index, "delta": delta}, progress)
+                    continue
+                finished += 1
+                yield StreamEvent(
+                    StreamEventType.CARD_COMPLETE,
+                    {"card_index": index, "card": cards[index], "error": error},
+                    25.0 + 60.0 * finished / len(tasks),
+                    f"Card {index + 1} rationale {'kept from template' if error else 'generated'}"
+                )
+        finally:
+            # Stop generating if the client went away
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _rationale_prompt(
+        card: Dict[str, Any],
+        scenario: str,
+        user_profile: Dict[str, Any],
+        profile_context: Optional[str]
+    ) -> str:
+        income = user_profile.get('monthly_income', user_profile.get('income'))
+        lines = [
+            "Write a 2-3 sentence rationale (under 60 words) explaining why this recommendation fits the user. "
+            "Use the figures given; do not invent numbers.",
+            f"Scenario: {scenario.replace('_', ' ')}",
+            f"Recommendation: {card.get('title', '')} - {card.get('description', '')}",
+        ]
+        if card.get('action'):
+            lines.append(f"Action: {card['action']}")
+        lines.append(f"User: {user_profile.get('demographic', 'unknown demographic')}"
+                     + (f", income ${income:,.0f}" if isinstance(income, (int, float)) else ""))
+        if profile_context:
+            lines.append(f"User's data:\n{profile_context}")
+        lines.append("Rationale:")
+        return "\n".join(lines)
+
+
+_streaming_pipeline: Optional[StreamingAIPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_streaming_pipeline() -> StreamingAIPipeline:
+    """Process-wide pipeline, created on first use"""
+    global _streaming_pipeline
+    with _pipeline_lock:
+        if _streaming_pipeline is None:
+            try:
+                from rag.profile_rag_system import get_rag_manager
+                rag_manager = get_rag_manager()
+            except Exception as e:
+                logger.error(f"Streaming pipeline running without RAG: {e}")
+                rag_manager = None
+            _streaming_pipeline = StreamingAIPipeline(rag_manager)
+        return _streaming_pipeline
@@ -17,6 +17,7 @@ from fastapi.responses import StreamingResponse
 from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 
 # Local imports
+from core.simulation_progress import stream_simulation
 from api.streaming_ai import (
     StreamingAIPipeline, 
     StreamEvent, 
@@ -77,9 +78,6 @@ async def stream_ai_generation_endpoint(request: Dict[str, Any]):
                     )
                     yield sse_event
                     
-                    # Add small delay to prevent overwhelming the client
-                    await asyncio.sleep(0.1)
-                    
             except Exception as e:
                 logger.error(f"SSE generation failed: {e}")
                 # Send error event
@@ -147,9 +145,6 @@ async def stream_ai_generation_simple(request: Dict[str, Any]):
                     progress_text = f"Progress: {event.progress:.1f}% - {event.data.get('message', 'Processing...')}\n"
                     yield progress_text
                     
-                    # Add delay
-                    await asyncio.sleep(0.1)
-                    
             except Exception as e:
                 logger.error(f"Simple streaming failed: {e}")
                 yield f"Error: {str(e)}\n"
@@ -193,7 +188,8 @@ async def stream_rag_query_endpoint(
         
         # Get streaming pipeline and indexer
         pipeline = get_streaming_pipeline()
-        indexer = pipeline.get_optimized_indexer(profile_id)
+        # The first request for a profile may load the shared index; keep it off the loop
+        indexer = await asyncio.to_thread(pipeline.get_optimized_indexer, profile_id)
         
         # Create async generator for RAG query streaming
         async def generate_rag_stream() -> AsyncGenerator[ServerSentEvent, None]:
@@ -216,8 +212,8 @@ async def stream_rag_query_endpoint(
                 )
                 yield start_event
                 
-                # Execute optimized query
-                result = indexer.optimized_query(query, context)
+                # Execute optimized query off the event loop
+                result = await asyncio.to_thread(indexer.optimized_query, query, context)
                 
                 # Check for client disconnection
                 if await http_request.is_disconnected():
@@ -310,7 +306,9 @@ async def stream_simulation_with_ai(
     Stream complete simulation with AI generation in real-time.
     
     This endpoint combines simulation execution with AI generation
-    streaming, providing end-to-end real-time updates.
+    streaming, providing end-to-end real-time updates. The simulation runs
+    off the event loop and emits percentile and success probability
+    estimates after each chunk of Monte Carlo paths.
     """
     try:
         # Extract request data
@@ -356,8 +354,22 @@ async def stream_simulation_with_ai(
                 )
                 yield sim_start_event
                 
-                # Execute simulation
-                simulation_results = scenario.run_simulation(profile_data, config)
+                # Execute simulation off the event loop, streaming estimates after each chunk
+                simulation_results = None
+                async for update in stream_simulation(scenario, profile_data, config):
+                    if update.progress is None:
+                        simulation_results = update.result
+                        continue
+                    yield ServerSentEvent(
+                        data=json.dumps({
+                            "message": f"{update.progress['completed']} of {update.progress['total']} paths simulated",
+                            "step": "simulation_progress",
+                            "progress": 50 * update.progress['fraction'],
+                            "estimate": update.progress
+                        }),
+                        event="simulation_progress",
+                        id=str(int(time.time() * 1000))
+                    )
                 
                 sim_complete_event = ServerSentEvent(
                     data=json.dumps({
@@ -392,8 +404,6 @@ async def stream_simulation_with_ai(
                         id=str(int(event.timestamp * 1000))
                     )
                     yield sse_event
-                    
-                    await asyncio.sleep(0.1)
                 
                 # Final completion event
                 final_event = ServerSentEvent(
@@ -4,9 +4,9 @@ Provides REST API endpoints for Next.js integration.
 """
 
 from typing import Dict, Any, Optional, List
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import logging
 import traceback
 import sys
@@ -14,6 +14,7 @@ import os
 import json
 import numpy as np
 import time
+import asyncio
 from datetime import datetime
 
 # Load environment variables from .env file
@@ -44,10 +45,16 @@ from core.models import (
     SimulationResponse,
     ScenarioType,
     ScenarioResult,
-    AccountType
+    AccountType,
+    ProfileData
 )
 from core.market_data import market_data_service
+from core.profile_projection import ProfileProjection, PROJECTION_FIELDS, scenario_profile_fields
+from core.data_version import DataVersionService, DataChange, DEFAULT_POLL_INTERVAL
+from core.bulk_simulation import BulkSimulationRunner, encode_ndjson_line, DEFAULT_MAX_WORKERS
 from data.csv_loader import CSVDataLoader
+from data.sqlite_repository import SQLiteProfileRepository
+from data.transaction_index import TransactionIndex, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from scenarios.emergency_fund import EmergencyFundScenario
 from scenarios.student_loan import StudentLoanScenario
 from scenarios.medical_crisis import MedicalCrisisScenario
@@ -56,14 +63,15 @@ from scenarios.market_crash import MarketCrashScenario
 from scenarios.home_purchase import HomePurchaseScenario
 from scenarios.rent_hike import RentHikeScenario
 from scenarios.auto_repair import AutoRepairScenario
-from rag.profile_rag_system import get_rag_manager
+from rag.profile_rag_system import get_rag_manager, create_embeddings
 # Import the batched RAG service for optimized queries
 from rag.batched_service import BatchedRAGService
+from rag.semantic_cache import SemanticRAGCache
 from rag.abstractions import (
     BatchedRAGRequest, RAGQuery, QueryType
 )
 from rag.implementations import (
-    SimpleRAGQueryExecutor, SimpleRAGCache, SimpleRAGMetrics
+    SimpleRAGQueryExecutor, SimpleRAGCache, SharedRAGCache, SimpleRAGMetrics
 )
 # Import the multi-agent AI system
 from ai.langgraph_dspy_agent import FinancialAIAgentSystem
@@ -124,7 +132,7 @@ perf_logger = PerformanceLogger(logger)
 app = FastAPI(title="FinanceAI Secure API", version="4.0.0", description="Secure microservice API for Netlify frontend")
 
 # Configure FastAPI to use custom JSON encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 
 def custom_json_response(content, status_code=200, headers=None):
@@ -193,9 +201,18 @@ async def startup_event():
         # await api_cache.warm_cache(CACHE_WARMING_SCENARIOS)
         # print("[RAILWAY BACKEND] ✅ Cache warming completed")
         
-        # RAG system is already initialized at module level
-        print("[RAILWAY BACKEND] 🔄 RAG system ready")
-        print("[RAILWAY BACKEND] ✅ RAG system initialized")
+        # Load (or build) the shared RAG index in the background so first queries don't pay for it
+        if rag_manager is not None:
+            rag_manager.start_background_build()
+            print("[RAILWAY BACKEND] 🔄 RAG index loading in background")
+        
+        if data_version_service.poll_interval > 0:
+            data_version_service.start()
+            print("[RAILWAY BACKEND] ✅ Data change watcher started")
+        
+        # Refresh market data in the background; startup does not wait on the API
+        market_data_service.start()
+        print("[RAILWAY BACKEND] 🔄 Market data refresh started in background")
         
         print("[RAILWAY BACKEND] 🎉 Application startup completed successfully")
         
@@ -204,6 +221,13 @@ async def startup_event():
         print(f"[RAILWAY BACKEND] Error details: {traceback.format_exc()}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background resources on shutdown"""
+    data_version_service.stop()
+    market_data_service.close()
+    print("[RAILWAY BACKEND] 👋 Application shutdown completed")
+
 @app.get("/")
 async def root():
     """Root endpoint for Railway deployment health checks"""
@@ -231,15 +255,8 @@ async def health_check():
             print(f"[RAILWAY BACKEND] ❌ Database health check failed: {e}")
             db_status = "unhealthy"
         
-        # Check market data service
-        market_status = "healthy"
-        try:
-            # Simple market data check
-            market_data_service.get_current_prices()
-            print("[RAILWAY BACKEND] ✅ Market data service check passed")
-        except Exception as e:
-            print(f"[RAILWAY BACKEND] ⚠️ Market data service check failed: {e}")
-            market_status = "degraded"
+        # Check market data service (liveness only; see /ready for readiness)
+        market_status = "healthy" if market_data_service.is_ready() else "initializing"
         
         health_data = {
             "status": "healthy" if db_status == "healthy" else "degraded",
@@ -264,6 +281,23 @@ async def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until market data is available from the last run or the initial refresh"""
+    readiness = market_data_service.get_readiness()
+    # Reported only: RAG queries still work (building the index on demand) before it is loaded
+    readiness["rag_index_ready"] = rag_manager is not None and rag_manager.is_index_ready()
+    status_code = 200 if readiness["ready"] else 503
+    return JSONResponse(status_code=status_code, content=readiness)
+
+@app.get("/data/version")
+async def get_data_version():
+    """Current data version, bumped whenever the CSV data files change"""
+    return {
+        "version": data_version_service.version,
+        "data_dir": data_version_service.data_dir
+    }
+
 @app.get("/db/health")
 async def database_health():
     """Database health check"""
@@ -284,25 +318,53 @@ async def initialize_database():
 
 # Global data loader and RAG manager
 try:
-    data_loader = CSVDataLoader()
-    logger.info("CSV data loader initialized successfully")
+    if os.getenv("PROFILE_STORE", "csv").lower() == "sqlite":
+        # Indexed SQLite repository built from the same CSV files
+        data_loader = SQLiteProfileRepository(
+            db_path=os.getenv("PROFILE_DB_PATH", ":memory:")
+        )
+        logger.info("SQLite profile repository initialized successfully")
+    else:
+        data_loader = CSVDataLoader()
+        logger.info("CSV data loader initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize CSV data loader: {e}")
     raise
 
+try:
+    transaction_index = TransactionIndex(data_loader.data_dir)
+    logger.info("Transaction index initialized successfully")
+except Exception as e:
+    logger.error(f"Failed to initialize transaction index: {e}")
+    raise
+
+# Watch the CSV data directory so derived caches are refreshed when files change in place
+data_version_service = DataVersionService(
+    data_loader.data_dir,
+    poll_interval=float(os.getenv("DATA_POLL_INTERVAL_SECONDS", DEFAULT_POLL_INTERVAL))
+)
+
 try:
     rag_manager = get_rag_manager()
     logger.info("RAG manager initialized successfully")
     
     # Initialize batched RAG service for optimized performance
     rag_query_executor = SimpleRAGQueryExecutor(rag_manager)
-    rag_cache = SimpleRAGCache()
+    # With Redis every worker shares RAG results; keys carry the profile's data fingerprint
+    rag_cache = SharedRAGCache(cache_manager) if cache_manager.use_redis else SimpleRAGCache()
     rag_metrics = SimpleRAGMetrics()
+    # Reworded repeats of earlier questions are answered from the nearest cached query.
+    # Opt-in: a paraphrase match can serve an answer computed for different parameters
+    semantic_rag_cache = None
+    if os.getenv("RAG_SEMANTIC_CACHE_ENABLED", "false").lower() == "true":
+        semantic_rag_cache = SemanticRAGCache(create_embeddings())
     batched_rag_service = BatchedRAGService(
         query_executor=rag_query_executor,
         cache=rag_cache,
         metrics=rag_metrics,
-        max_parallel_queries=6
+        max_parallel_queries=6,
+        data_version=data_version_service.profile_fingerprint,
+        semantic_cache=semantic_rag_cache
     )
     logger.info("Batched RAG service initialized successfully")
 except Exception as e:
@@ -310,6 +372,20 @@ except Exception as e:
     rag_manager = None
     batched_rag_service = None
 
+def handle_data_change(change: DataChange):
+    """Invalidate CSV-derived state for the profiles affected by a data change"""
+    if isinstance(data_loader, SQLiteProfileRepository):
+        data_loader.rebuild()
+    transaction_index.rebuild()
+    
+    if rag_manager is not None:
+        rag_manager.invalidate_profiles(change.profile_ids)
+        rag_manager.start_background_build()
+    # RAG result keys include each profile's data fingerprint, so results computed
+    # from the old data are no longer reachable and simply age out
+
+data_version_service.subscribe(handle_data_change)
+
 # Pydantic models for request/response
 class SimulationRequest(BaseModel):
     profile_id: str
@@ -323,6 +399,15 @@ class SimulationResponse(BaseModel):
     data: Dict[str, Any]
     message: str
 
+class BulkScenarioJob(BaseModel):
+    scenario_type: str
+    parameters: Dict[str, Any] = {}
+
+class BulkSimulationRequest(BaseModel):
+    profile_ids: Optional[List[int]] = None  # None runs every available profile
+    scenarios: List[BulkScenarioJob]
+    max_workers: int = Field(DEFAULT_MAX_WORKERS, ge=1, le=16)
+
 # Initialize simulation scenarios
 simulation_scenarios = {
     'emergency_fund': EmergencyFundScenario(),
@@ -380,7 +465,7 @@ async def run_simulation(
         # Get profile data
         logger.info(f"🔄 FETCHING PROFILE: ID {request.profile_id}")
         profile_start = time.time()
-        profile_data = await get_profile_data(request.profile_id)
+        profile_data = await get_profile_projection(request.profile_id)
         profile_time = time.time() - profile_start
         logger.info(f"✅ PROFILE LOADED: {profile_time:.3f}s")
         
@@ -408,7 +493,8 @@ async def run_simulation(
         ai_start = time.time()
         ai_explanations = await generate_ai_explanations_with_llm(
             simulation_result,
-            profile_data,
+            # The agent checkpoints its state, which needs a plain, serializable dict
+            profile_data.to_dict(),
             request.original_simulation_id or "new_simulation",
             config  # Pass the config for unified card generator
         )
@@ -425,7 +511,9 @@ async def run_simulation(
             "data": {
                 "simulation_result": simulation_result,
                 "ai_explanations": ai_explanations,
-                "profile_data": profile_data,
+                "profile_data": profile_data.to_dict(
+                    scenario_profile_fields(simulation_scenarios[scenario_type])
+                ),
                 "config": config
             },
             "message": f"Simulation completed successfully with {len(ai_explanations)} AI explanations",
@@ -638,8 +726,10 @@ async def run_scenario_simulation(
         # Get the scenario class
         scenario_class = simulation_scenarios[scenario_type]
         
-        # Run the simulation - scenarios have their own simulation logic
-        result = scenario_class.run_simulation(profile_data, config)
+        # Run the simulation - scenarios have their own simulation logic.
+        # Scenarios are CPU-bound and read market data through blocking facades,
+        # so they run on a worker thread to keep the event loop responsive
+        result = await asyncio.to_thread(scenario_class.run_simulation, profile_data, config)
         
         return result
         
@@ -693,70 +783,38 @@ async def get_profile_data(profile_id: str) -> Dict[str, Any]:
     try:
         # Load profile data from CSV using the data loader
         profile_data = data_loader.load_profile(int(profile_id))
-        
-        # Calculate emergency fund and student loan balance from accounts
-        emergency_fund = sum(
-            account.balance for account in profile_data.accounts 
-            if account.account_type in [AccountType.SAVINGS, "savings"] and account.balance > 0
+        return build_profile_payload(profile_data)
+    except Exception as e:
+        logger.error(f"Failed to load profile {profile_id}: {e}")
+        raise ValueError(f"Profile {profile_id} not found in CSV data")
+
+async def get_profile_projection(profile_id: str) -> ProfileProjection:
+    """
+    Get the compact simulation projection for a profile.
+    Metrics come from the compact index records; transactions are only
+    materialized if a consumer asks for them.
+    """
+    try:
+        customer_id = int(profile_id)
+        profile_data = data_loader.load_profile_summary(
+            customer_id, transaction_index.iter_transactions(customer_id)
         )
-        
-        student_loan_balance = sum(
-            abs(account.balance) for account in profile_data.accounts 
-            if account.account_type in [AccountType.STUDENT_LOAN, "student_loan"] and account.balance < 0
+        return ProfileProjection.from_profile(
+            profile_data,
+            transaction_loader=lambda: [
+                record.to_dict() for record in transaction_index.iter_transactions(customer_id)
+            ]
         )
-        
-        # Determine risk tolerance based on demographic
-        risk_tolerance_map = {
-            "genz": "aggressive",
-            "millennial": "moderate",
-            "midcareer": "moderate",
-            "senior": "conservative",
-            "retired": "conservative"
-        }
-        # Handle demographic as string or enum
-        demographic_value = profile_data.demographic.value if hasattr(profile_data.demographic, 'value') else str(profile_data.demographic)
-        risk_tolerance = risk_tolerance_map.get(demographic_value, "moderate")
-        
-        # Convert to dictionary format
-        return {
-            "customer_id": profile_data.customer_id,
-            "name": f"Profile {profile_data.customer_id}",  # Use profile ID as name
-            "age": profile_data.age,
-            "demographic": demographic_value,
-            "monthly_income": profile_data.monthly_income,
-            "monthly_expenses": profile_data.monthly_expenses,
-            "emergency_fund": emergency_fund,
-            "student_loan_balance": student_loan_balance,
-            "risk_tolerance": risk_tolerance,
-            "credit_score": profile_data.credit_score,
-            "location": profile_data.location,
-            "accounts": [
-                {
-                    "type": str(account.account_type),
-                    "balance": account.balance,
-                    "institution": account.institution_name
-                }
-                for account in profile_data.accounts
-            ],
-            "transactions": [
-                {
-                    "amount": transaction.amount,
-                    "category": transaction.category or "uncategorized",
-                    "date": transaction.timestamp.isoformat(),
-                    "description": transaction.description
-                }
-                for transaction in profile_data.transactions
-            ],
-            "total_debt": abs(sum(
-                account.balance for account in profile_data.accounts 
-                if account.balance < 0
-            )),
-            "income": profile_data.monthly_income  # Add income field for AI agent
-        }
     except Exception as e:
         logger.error(f"Failed to load profile {profile_id}: {e}")
         raise ValueError(f"Profile {profile_id} not found in CSV data")
 
+def build_profile_payload(profile_data: ProfileData) -> Dict[str, Any]:
+    """
+    Convert a loaded ProfileData model into the full dictionary, including transactions.
+    """
+    return ProfileProjection.from_profile(profile_data).to_dict(PROJECTION_FIELDS + ("transactions",))
+
 def prepare_simulation_config(request: SimulationRequest, scenario_type: str) -> Dict[str, Any]:
     """
     Prepare simulation configuration based on request parameters.
@@ -832,6 +890,48 @@ def prepare_simulation_config(request: SimulationRequest, scenario_type: str) ->
     
     return base_config
 
+def build_bulk_simulation_config(profile_id: str, scenario_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a simulation config for a bulk job using the single-request defaults.
+    """
+    request = SimulationRequest(
+        profile_id=profile_id,
+        scenario_type=scenario_type,
+        parameters=parameters
+    )
+    return prepare_simulation_config(request, scenario_type)
+
+@app.post("/simulations/bulk")
+async def run_bulk_simulations(
+    request: BulkSimulationRequest,
+    service_auth: Dict[str, Any] = Depends(verify_netlify_service)
+):
+    """Run many scenario simulations across profiles and stream results as NDJSON"""
+    invalid = [job.scenario_type for job in request.scenarios if job.scenario_type not in simulation_scenarios]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid scenario type(s): {', '.join(invalid)}")
+    
+    logger.info(
+        f"🚀 BULK SIMULATION REQUEST: {len(request.scenarios)} scenarios for "
+        f"{len(request.profile_ids) if request.profile_ids is not None else 'all'} profiles"
+    )
+    
+    runner = BulkSimulationRunner(
+        data_loader=data_loader,
+        scenarios=simulation_scenarios,
+        profile_builder=ProfileProjection.from_profile,
+        config_builder=build_bulk_simulation_config,
+        market_data=market_data_service,
+        max_workers=request.max_workers
+    )
+    jobs = [(job.scenario_type, job.parameters) for job in request.scenarios]
+    
+    async def stream_results():
+        async for record in runner.run(request.profile_ids, jobs):
+            yield encode_ndjson_line(record)
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @app.post("/rag/query/{profile_id}")
 async def query_profile_rag(
     profile_id: int, 
@@ -1277,6 +1377,7 @@ async def get_optimization_metrics():
         metrics = {
             "api_cache": api_cache.get_stats(),
             "rag_batching": rag_metrics.get_metrics_summary() if batched_rag_service else None,
+            "rag_semantic_cache": semantic_rag_cache.get_stats() if batched_rag_service and semantic_rag_cache else None,
             "cache_manager": cache_manager.get_stats() if cache_manager else None
         }
         
@@ -1531,6 +1632,67 @@ async def get_transaction_categories(profile_id: int):
             "error": str(e)
         }
 
+@app.get("/api/transactions/{profile_id}")
+async def get_transactions_page(
+    profile_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    category: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Get a cursor-paginated page of transactions, optionally filtered by date range and category."""
+    if not transaction_index.has_customer(profile_id):
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    
+    try:
+        page = transaction_index.get_page(
+            profile_id,
+            start_date=start_date,
+            end_date=end_date,
+            categories=category,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "success": True,
+        "profile_id": profile_id,
+        "transactions": [t.to_dict() for t in page.transactions],
+        "count": len(page.transactions),
+        "next_cursor": page.next_cursor
+    }
+
+@app.get("/api/transactions/{profile_id}/export")
+async def export_transactions(
+    profile_id: int,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    category: Optional[List[str]] = Query(None)
+):
+    """Stream all matching transactions as NDJSON, one transaction per line."""
+    if not transaction_index.has_customer(profile_id):
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    
+    try:
+        records = transaction_index.iter_transactions(
+            profile_id, start_date=start_date, end_date=end_date, categories=category
+        )
+        first = next(records, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def stream_transactions():
+        if first is None:
+            return
+        yield json.dumps(first.to_dict()) + "\n"
+        for record in records:
+            yield json.dumps(record.to_dict()) + "\n"
+    
+    return StreamingResponse(stream_transactions(), media_type="application/x-ndjson")
+
 # ==================== OPTIMIZED PROFILE ENDPOINTS - PHASE 1 CRITICAL ====================
 
 @app.get("/api/profiles/summary/{profile_id}")
@@ -10,7 +10,8 @@ import hashlib
 import logging
 import asyncio
 import time
-from typing import Dict, Any, Optional, Union, Callable, TypeVar, List
+import random
+from typing import Dict, Any, Optional, Union, Callable, TypeVar, List, Awaitable, AsyncIterator
 from datetime import datetime, timedelta
 from functools import wraps, lru_cache
 from dataclasses import dataclass, asdict
@@ -21,11 +22,15 @@ from concurrent.futures import ThreadPoolExecutor
 from langchain_core.embeddings import Embeddings
 
 from .cache_manager import cache_manager, CacheCategories
+from .embedding_store import EmbeddingStore, content_key, get_embedding_store
+from .sync_bridge import SyncBridge
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
 
 class APIProvider(str, Enum):
     """Supported API providers - single source of truth"""
@@ -58,10 +63,16 @@ class CacheConfig:
     """Cache configuration with TTL and invalidation strategies"""
     ttl_seconds: int = 3600  # 1 hour default
     enable_compression: bool = True
-    max_cache_size_mb: int = 100
+    max_cache_size_mb: int = int(os.getenv('CACHE_MAX_MEMORY_MB', 100))
     cache_embeddings: bool = True
     cache_completions: bool = True
     cache_warmup: bool = True
+    single_flight_lock_seconds: float = 30.0  # cross-process lock lifetime, matches API timeout
+    single_flight_poll_seconds: float = 0.05  # how often waiters re-check the shared cache
+    stale_ttl_multiplier: float = 4.0  # hard TTL = operation TTL * multiplier; stale in between
+    ttl_jitter: float = 0.1  # expire up to 10% early so entries written together don't expire together
+    embedding_batch_size: int = 96  # texts per embeddings request
+    embedding_max_concurrency: int = 4  # embeddings requests in flight at once
     
     def get_ttl_for_operation(self, operation_type: str) -> int:
         """Get TTL based on operation type"""
@@ -73,6 +84,16 @@ class CacheConfig:
             "steps": 3600,       # 1 hour for action steps
         }
         return ttl_map.get(operation_type, self.ttl_seconds)
+    
+    def get_soft_ttl(self, operation_type: str) -> float:
+        """Jittered TTL after which a cached result is served stale and refreshed"""
+        ttl = self.get_ttl_for_operation(operation_type)
+        return ttl * random.uniform(1 - self.ttl_jitter, 1)
+    
+    def get_hard_ttl(self, operation_type: str) -> int:
+        """Jittered TTL after which a cached result is no longer served at all"""
+        ttl = self.get_ttl_for_operation(operation_type) * self.stale_ttl_multiplier
+        return int(ttl * random.uniform(1 - self.ttl_jitter, 1))
 
 
 class UnifiedAPICache:
@@ -96,16 +117,28 @@ class UnifiedAPICache:
             self.configs: Dict[str, APIConfig] = {}
             self.cache_config = CacheConfig()
             self.clients: Dict[str, httpx.AsyncClient] = {}
+            # Separate clients for run_sync callers: pooled connections belong to the loop that opened them
+            self._bridge_clients: Dict[str, httpx.AsyncClient] = {}
             self.sync_executor = ThreadPoolExecutor(max_workers=4)
+            self._sync_bridge = SyncBridge("api-cache-sync-bridge")
+            # Cache key -> future of the call currently fetching it (single-flight)
+            self._in_flight: Dict[str, asyncio.Future] = {}
+            # Background stale-while-revalidate refreshes, keyed by cache key
+            self._refresh_tasks: Dict[str, asyncio.Task] = {}
             self._stats = {
                 "cache_hits": 0,
                 "cache_misses": 0,
+                "coalesced_calls": 0,
+                "stale_hits": 0,
+                "background_refreshes": 0,
                 "api_calls": 0,
                 "errors": 0,
                 "total_tokens": 0,
                 "total_cost": 0.0
             }
             self._initialized = True
+            cache_manager.set_memory_limit(self.cache_config.max_cache_size_mb)
+            cache_manager.set_compression(self.cache_config.enable_compression)
             self._setup_providers()
     
     def _setup_providers(self):
@@ -128,6 +161,16 @@ class UnifiedAPICache:
                 self.clients[provider.value] = httpx.AsyncClient(timeout=config.timeout)
                 logger.info(f"Configured {provider.value} with model {config.model}")
     
+    def _client(self, config: APIConfig) -> httpx.AsyncClient:
+        """HTTP client for the running loop; calls from run_sync use the sync bridge's own clients"""
+        if not self._sync_bridge.in_bridge_loop():
+            return self.clients[config.provider.value]
+        client = self._bridge_clients.get(config.provider.value)
+        if client is None:
+            client = httpx.AsyncClient(timeout=config.timeout)
+            self._bridge_clients[config.provider.value] = client
+        return client
+    
     def _generate_cache_key(
         self,
         operation: str,
@@ -176,9 +219,63 @@ class UnifiedAPICache:
         if cached_result:
             self._stats["cache_hits"] += 1
             logger.debug(f"Cache hit for {operation} with {provider.value}")
+            if self._is_stale(cached_result):
+                self._stats["stale_hits"] += 1
+                self._schedule_refresh(cache_key, config, operation, prompt, messages, **kwargs)
             return cached_result.get("result", "")
         
+        # Single-flight: concurrent misses for the same key share one API call
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.get(cache_key)
+        if in_flight is not None and in_flight.get_loop() is loop:
+            self._stats["coalesced_calls"] += 1
+            logger.debug(f"Joining in-flight {operation} call with {provider.value}")
+            return await asyncio.shield(in_flight)
+        
+        future = loop.create_future()
+        self._in_flight[cache_key] = future
+        try:
+            result = await self._fetch_and_cache(
+                cache_key, config, operation, prompt, messages, **kwargs
+            )
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters, if any, re-raise it
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.cancel()
+            if self._in_flight.get(cache_key) is future:
+                del self._in_flight[cache_key]
+    
+    async def _fetch_and_cache(
+        self,
+        cache_key: str,
+        config: APIConfig,
+        operation: str,
+        prompt: Optional[str],
+        messages: Optional[List[Dict]],
+        **kwargs
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        Fetch a missed key from the API and cache it, falling back to another provider.
+        
+        When the cache is shared across processes (Redis), a short lock ensures only one
+        worker calls the API; the others wait for its result to land in the cache.
+        """
         self._stats["cache_misses"] += 1
+        provider = config.provider
+        lock_name = f"lock:{cache_key}"
+        
+        token = await self._acquire_flight_lock(lock_name)
+        if token is None:
+            cached_result = await self._wait_for_shared_result(cache_key, lock_name)
+            if cached_result:
+                self._stats["coalesced_calls"] += 1
+                return cached_result.get("result", "")
         
         # Make API call
         try:
@@ -186,29 +283,257 @@ class UnifiedAPICache:
                 config, operation, prompt, messages, **kwargs
             )
             
-            # Cache the result
-            ttl = self.cache_config.get_ttl_for_operation(operation)
-            await cache_manager.set(
-                cache_key,
-                {"result": result, "timestamp": time.time()},
-                ttl
-            )
-            
+            await self._store_result(cache_key, operation, result)
             self._stats["api_calls"] += 1
             return result
             
         except Exception as e:
             self._stats["errors"] += 1
             logger.error(f"API call failed for {provider.value}: {e}")
+            error = e
+        finally:
+            if token is not None:
+                await self._release_flight_lock(lock_name, token)
+        
+        # Try fallback provider
+        fallback = self._get_fallback_provider(provider)
+        if fallback:
+            logger.info(f"Falling back to {fallback.value}")
+            return await self.cached_api_call(
+                operation, fallback, prompt, messages, **kwargs
+            )
+        raise error
+    
+    async def _store_result(self, cache_key: str, operation: str, result: Any) -> None:
+        """
+        Cache a result with a soft (stale-after) and hard (evict-after) TTL.
+        
+        Both are jittered so entries written in the same burst do not all expire
+        in the same instant.
+        """
+        await cache_manager.set(
+            cache_key,
+            self._cache_entry(operation, result),
+            self.cache_config.get_hard_ttl(operation)
+        )
+    
+    def _cache_entry(self, operation: str, result: Any) -> Dict[str, Any]:
+        """Cached representation of a result with its soft expiry"""
+        now = time.time()
+        return {
+            "result": result,
+            "timestamp": now,
+            "stale_at": now + self.cache_config.get_soft_ttl(operation)
+        }
+    
+    def _is_stale(self, cached_result: Dict[str, Any]) -> bool:
+        """Whether a cached entry is past its soft TTL (entries without one never are)"""
+        stale_at = cached_result.get("stale_at")
+        return stale_at is not None and time.time() >= stale_at
+    
+    def _schedule_refresh(
+        self,
+        cache_key: str,
+        config: APIConfig,
+        operation: str,
+        prompt: Optional[str],
+        messages: Optional[List[Dict]],
+        **kwargs
+    ) -> None:
+        """Refresh a stale entry in the background, at most once per key at a time"""
+        if cache_key in self._refresh_tasks or cache_key in self._in_flight:
+            return
+        
+        task = asyncio.get_running_loop().create_task(
+            self._revalidate(cache_key, config, operation, prompt, messages, **kwargs)
+        )
+        self._refresh_tasks[cache_key] = task
+        
+        def _forget(done: asyncio.Task) -> None:
+            if self._refresh_tasks.get(cache_key) is done:
+                del self._refresh_tasks[cache_key]
+        
+        task.add_done_callback(_forget)
+    
+    async def _revalidate(
+        self,
+        cache_key: str,
+        config: APIConfig,
+        operation: str,
+        prompt: Optional[str],
+        messages: Optional[List[Dict]],
+        **kwargs
+    ) -> None:
+        """Re-fetch a stale entry; on failure the stale value keeps being served"""
+        lock_name = f"lock:{cache_key}"
+        token = await self._acquire_flight_lock(lock_name)
+        if token is None:
+            return  # Another process is already refreshing it
+        
+        try:
+            result = await self._execute_api_call(
+                config, operation, prompt, messages, **kwargs
+            )
+            await self._store_result(cache_key, operation, result)
+            self._stats["api_calls"] += 1
+            self._stats["background_refreshes"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Background refresh failed for {config.provider.value}: {e}")
+        finally:
+            await self._release_flight_lock(lock_name, token)
+    
+    async def _acquire_flight_lock(self, lock_name: str) -> Optional[str]:
+        """
+        Take the cross-process single-flight lock for a cache key.
+        
+        Returns:
+            Lock token, None if another process holds it, or "" if locking is
+            unavailable (the call then proceeds unlocked)
+        """
+        try:
+            return await cache_manager.acquire_lock(
+                lock_name, self.cache_config.single_flight_lock_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Single-flight lock unavailable, proceeding without it: {e}")
+            return ""
+    
+    async def _release_flight_lock(self, lock_name: str, token: str) -> None:
+        """Release the cross-process single-flight lock"""
+        if not token:
+            return
+        try:
+            await cache_manager.release_lock(lock_name, token)
+        except Exception as e:
+            logger.warning(f"Failed to release single-flight lock {lock_name}: {e}")
+    
+    async def _wait_for_shared_result(
+        self,
+        cache_key: str,
+        lock_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for another process to populate the cache key.
+        
+        Returns:
+            The cached entry, or None if the lock was released or expired without one
+        """
+        deadline = time.monotonic() + self.cache_config.single_flight_lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.cache_config.single_flight_poll_seconds)
+            cached_result = await cache_manager.get(cache_key)
+            if cached_result:
+                return cached_result
+            if not await cache_manager.is_locked(lock_name):
+                # The holder may have written just before releasing
+                return await cache_manager.get(cache_key)
+        return None
+    
+    async def cached_embeddings(
+        self,
+        texts: List[str],
+        provider: Optional[APIProvider] = None,
+        **kwargs
+    ) -> List[List[float]]:
+        """
+        Embed many texts, calling the API only for texts not already cached.
+        
+        Cache entries are shared with single-text cached_api_call("embedding", ...).
+        Cached vectors are looked up with one multi-get; misses are de-duplicated and
+        sent in batches of embedding_batch_size, with at most embedding_max_concurrency
+        requests in flight.
+        
+        Args:
+            texts: Texts to embed
+            provider: Provider to use (defaults to the best available)
             
-            # Try fallback provider
-            fallback = self._get_fallback_provider(provider)
-            if fallback:
-                logger.info(f"Falling back to {fallback.value}")
-                return await self.cached_api_call(
-                    operation, fallback, prompt, messages, **kwargs
-                )
-            raise
+        Returns:
+            One embedding per input text, in input order
+        """
+        if not texts:
+            return []
+        if provider is None:
+            provider = self._select_best_provider()
+        if provider.value not in self.configs:
+            raise ValueError(f"Provider {provider.value} not configured")
+        config = self.configs[provider.value]
+        
+        keys = [self._generate_cache_key("embedding", provider.value, text, **kwargs) for text in texts]
+        cached = await cache_manager.get_many(list(dict.fromkeys(keys)))
+        
+        vectors: Dict[str, List[float]] = {
+            key: entry.get("result") for key, entry in cached.items() if entry
+        }
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        
+        self._stats["cache_hits"] += len(texts) - sum(1 for key in keys if key in missing)
+        self._stats["cache_misses"] += len(missing)
+        
+        if missing:
+            semaphore = asyncio.Semaphore(self.cache_config.embedding_max_concurrency)
+            missing_keys = list(missing)
+            batch_size = self.cache_config.embedding_batch_size
+            batches = [missing_keys[i:i + batch_size] for i in range(0, len(missing_keys), batch_size)]
+            
+            async def embed_batch(batch_keys: List[str]) -> Dict[str, List[float]]:
+                async with semaphore:
+                    batch_vectors = await self._execute_embedding_batch(
+                        config, [missing[key] for key in batch_keys], **kwargs
+                    )
+                self._stats["api_calls"] += 1
+                return dict(zip(batch_keys, batch_vectors))
+            
+            try:
+                results = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Batch embedding failed for {provider.value}: {e}")
+                raise
+            
+            fetched: Dict[str, List[float]] = {}
+            for result in results:
+                fetched.update(result)
+            vectors.update(fetched)
+            
+            await cache_manager.set_many(
+                {key: self._cache_entry("embedding", vector) for key, vector in fetched.items()},
+                self.cache_config.get_hard_ttl("embedding")
+            )
+        
+        return [vectors[key] for key in keys]
+    
+    async def _execute_embedding_batch(
+        self,
+        config: APIConfig,
+        texts: List[str],
+        **kwargs
+    ) -> List[List[float]]:
+        """Embed a batch of texts with a single request where the provider supports it"""
+        if config.provider != APIProvider.OPENAI:
+            raise ValueError(f"Provider {config.provider.value} does not support embeddings")
+        
+        client = self._client(config)
+        response = await client.post(
+            f"{config.base_url}/embeddings",
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": kwargs.get("embedding_model", DEFAULT_EMBEDDING_MODEL),
+                "input": texts
+            }
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"OpenAI API error: {response.status_code} - {response.text}")
+        
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
     
     async def _execute_api_call(
         self,
@@ -219,7 +544,7 @@ class UnifiedAPICache:
         **kwargs
     ) -> Union[str, Dict[str, Any]]:
         """Execute the actual API call - DRY principle enforced"""
-        client = self.clients[config.provider.value]
+        client = self._client(config)
         
         if config.provider == APIProvider.OPENAI:
             return await self._call_openai_unified(
@@ -245,7 +570,7 @@ class UnifiedAPICache:
         if operation == "embedding":
             endpoint = f"{config.base_url}/embeddings"
             payload = {
-                "model": kwargs.get("embedding_model", "text-embedding-3-small"),
+                "model": kwargs.get("embedding_model", DEFAULT_EMBEDDING_MODEL),
                 "input": prompt or messages
             }
         else:  # completion
@@ -324,6 +649,119 @@ class UnifiedAPICache:
         data = response.json()
         return data["content"][0]["text"]
     
+    async def stream_completion(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict]] = None,
+        provider: Optional[APIProvider] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Yield a completion's text as the provider generates it.
+        
+        Shares cache entries with cached_api_call("completion", ...): a cached
+        completion is yielded as one chunk, and a streamed one is cached once it
+        finishes. If a provider fails before its first chunk, the fallback
+        provider is tried once; a failure mid-stream is raised.
+        """
+        if provider is None:
+            provider = self._select_best_provider()
+        if provider.value not in self.configs:
+            raise ValueError(f"Provider {provider.value} not configured")
+        fallback = self._get_fallback_provider(provider)
+        providers = [provider] + ([fallback] if fallback else [])
+        
+        content = prompt or json.dumps(messages)
+        for attempt, current in enumerate(providers):
+            cache_key = self._generate_cache_key("completion", current.value, content, **kwargs)
+            cached_result = await cache_manager.get(cache_key)
+            if cached_result:
+                self._stats["cache_hits"] += 1
+                yield cached_result.get("result", "")
+                return
+            self._stats["cache_misses"] += 1
+            
+            chunks: List[str] = []
+            try:
+                async for chunk in self._stream_api_call(self.configs[current.value], prompt, messages, **kwargs):
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Streaming completion failed for {current.value}: {e}")
+                if chunks or attempt == len(providers) - 1:
+                    raise
+                logger.info(f"Falling back to {providers[attempt + 1].value}")
+                continue
+            
+            self._stats["api_calls"] += 1
+            await self._store_result(cache_key, "completion", "".join(chunks))
+            return
+    
+    async def _stream_api_call(
+        self,
+        config: APIConfig,
+        prompt: Optional[str],
+        messages: Optional[List[Dict]],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream completion text deltas from a provider's server-sent events"""
+        client = self._client(config)
+        max_tokens = kwargs.get("max_tokens", config.max_tokens)
+        temperature = kwargs.get("temperature", config.temperature)
+        
+        if config.provider == APIProvider.OPENAI:
+            if messages is None:
+                messages = [
+                    {"role": "system", "content": "You are a helpful financial advisor AI."},
+                    {"role": "user", "content": prompt}
+                ]
+            endpoint = f"{config.base_url}/chat/completions"
+            headers = {"Authorization": f"Bearer {config.api_key}", "Content-Type": "application/json"}
+        elif config.provider == APIProvider.ANTHROPIC:
+            if messages is None:
+                messages = [{"role": "user", "content": prompt}]
+            endpoint = f"{config.base_url}/messages"
+            headers = {
+                "x-api-key": config.api_key,
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json"
+            }
+        else:
+            raise ValueError(f"Provider {config.provider} not implemented")
+        
+        payload = {
+            "model": config.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True
+        }
+        
+        async with client.stream("POST", endpoint, headers=headers, json=payload) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode(errors="replace")
+                raise Exception(f"{config.provider.value} API error: {response.status_code} - {body}")
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if config.provider == APIProvider.OPENAI:
+                    choices = event.get("choices") or [{}]
+                    text = (choices[0].get("delta") or {}).get("content")
+                elif event.get("type") == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                elif event.get("type") == "error":
+                    raise Exception(f"Anthropic stream error: {event.get('error')}")
+                else:
+                    text = None
+                if text:
+                    yield text
+    
     def _select_best_provider(self) -> APIProvider:
         """Select best available provider based on availability and performance"""
         # Priority order: Anthropic > OpenAI > Others
@@ -339,6 +777,12 @@ class UnifiedAPICache:
         
         raise ValueError("No API providers configured")
     
+    def _select_embedding_provider(self) -> APIProvider:
+        """Select a configured provider that offers an embeddings API"""
+        if APIProvider.OPENAI.value in self.configs:
+            return APIProvider.OPENAI
+        raise ValueError("No embedding provider configured")
+    
     def _get_fallback_provider(self, current: APIProvider) -> Optional[APIProvider]:
         """Get fallback provider if current fails"""
         providers = list(self.configs.keys())
@@ -358,14 +802,18 @@ class UnifiedAPICache:
         **kwargs
     ) -> Union[str, Dict[str, Any]]:
         """Synchronous wrapper for cached API calls"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(
-                self.cached_api_call(operation, provider, prompt, messages, **kwargs)
-            )
-        finally:
-            loop.close()
+        return self.run_sync(
+            self.cached_api_call(operation, provider, prompt, messages, **kwargs)
+        )
+    
+    def run_sync(self, coro: Awaitable[T]) -> T:
+        """
+        Run a coroutine from synchronous code.
+        
+        All synchronous callers share one background event loop, so HTTP clients and
+        background refreshes outlive the call instead of dying with a per-call loop.
+        """
+        return self._sync_bridge.run(coro)
     
     async def warm_cache(self, scenarios: List[Dict[str, Any]]):
         """Pre-warm cache with common queries - proactive optimization"""
@@ -408,8 +856,17 @@ class UnifiedAPICache:
         """Cleanup resources"""
         for client in self.clients.values():
             await client.aclose()
+        if self._bridge_clients:
+            await self._sync_bridge.run_async(self._close_bridge_clients())
         
         self.sync_executor.shutdown(wait=True)
+        self._sync_bridge.stop()
+    
+    async def _close_bridge_clients(self):
+        """Close the sync bridge's HTTP clients on the bridge loop"""
+        for client in self._bridge_clients.values():
+            await client.aclose()
+        self._bridge_clients.clear()
 
 
 # Global instance - singleton pattern enforced
@@ -478,45 +935,65 @@ class CacheAwareEmbeddings(Embeddings):
     Properly implements LangChain Embeddings interface
     """
     
-    def __init__(self, provider: Optional[APIProvider] = None):
-        self.provider = provider or api_cache._select_best_provider()
+    def __init__(
+        self,
+        provider: Optional[APIProvider] = None,
+        store: Optional[EmbeddingStore] = None,
+        persist: bool = True
+    ):
+        """
+        Args:
+            provider: Embedding provider (defaults to the configured one)
+            store: On-disk embedding store consulted before the API cache
+            persist: Use the shared on-disk store when no store is given
+        """
+        self.provider = provider or api_cache._select_embedding_provider()
+        self.model = DEFAULT_EMBEDDING_MODEL
         self.dimension = 1536  # OpenAI default
+        self.store = store or (get_embedding_store() if persist else None)
     
     async def _embed_documents_async(self, texts: List[str]) -> List[List[float]]:
-        """Async implementation for multiple documents with caching"""
-        embeddings = []
-        
-        for text in texts:
-            embedding = await api_cache.cached_api_call(
-                operation="embedding",
-                provider=self.provider,
-                prompt=text
-            )
-            embeddings.append(embedding)
+        """Async implementation for multiple documents: on-disk store, then batched API cache"""
+        if self.store is None:
+            return await api_cache.cached_embeddings(texts, provider=self.provider)
+        
+        keys = [content_key(text, self.model) for text in texts]
+        stored = self.store.get_many(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in stored}
+        
+        fetched: Dict[str, List[float]] = {}
+        if missing:
+            vectors = await api_cache.cached_embeddings(list(missing.values()), provider=self.provider)
+            fetched = dict(zip(missing.keys(), vectors))
+            await asyncio.get_running_loop().run_in_executor(None, self.store.put_many, fetched)
         
-        return embeddings
+        return [fetched[key] if key in fetched else stored[key].tolist() for key in keys]
     
     async def _embed_query_async(self, text: str) -> List[float]:
         """Async implementation for single query with caching"""
+        if self.store is not None:
+            return (await self._embed_documents_async([text]))[0]
         return await api_cache.cached_api_call(
             operation="embedding",
             provider=self.provider,
             prompt=text
         )
     
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """LangChain interface: Asynchronous document embedding"""
+        return await self._embed_documents_async(texts)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        """LangChain interface: Asynchronous query embedding"""
+        return await self._embed_query_async(text)
+    
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """LangChain interface: Synchronous document embedding"""
-        # For now, return fake embeddings to get RAG working
-        # TODO: Fix async/sync embedding integration properly
-        logger.warning("Using fake embeddings for development - CSV data will still be retrieved")
-        return [[0.1, 0.2, 0.3, 0.4, 0.5] for _ in texts]
+        return api_cache.run_sync(self._embed_documents_async(texts))
     
     def embed_query(self, text: str) -> List[float]:
         """LangChain interface: Synchronous query embedding"""
-        # For now, return fake embeddings to get RAG working
-        # TODO: Fix async/sync embedding integration properly
-        logger.warning("Using fake embeddings for development - CSV data will still be retrieved")
-        return [0.1, 0.2, 0.3, 0.4, 0.5]
+        return api_cache.run_sync(self._embed_query_async(text))
 
 
 # Export common warming scenarios
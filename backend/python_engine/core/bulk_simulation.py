@@ -0,0 +1,182 @@
+"""
+Bulk simulation runner.
+Loads many profiles in one pass and runs scenario simulations across a worker pool,
+yielding one result record per (profile, scenario) pair as soon as it completes.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+# Quotes read by the built-in scenarios; warmed once per bulk run
+SIMULATION_QUOTE_SYMBOLS = ['^GSPC', '^DJI', '^IXIC', '^VIX', 'GLD', 'BND']
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """
+    Recursively convert simulation output into JSON-safe values.
+
+    Non-finite floats become None; numpy types, dataclasses, pydantic models,
+    enums and datetimes are converted to their plain equivalents.
+    """
+    if isinstance(obj, dict):
+        return {str(k): _to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [_to_jsonable(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _to_jsonable(obj.tolist())
+    if isinstance(obj, (bool, np.bool_)):
+        return bool(obj)
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        value = float(obj)
+        return None if np.isinf(value) or np.isnan(value) else value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return _to_jsonable(dataclasses.asdict(obj))
+    if hasattr(obj, 'model_dump'):
+        return _to_jsonable(obj.model_dump())
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'value'):
+        return _to_jsonable(obj.value)
+    return obj
+
+
+def encode_ndjson_line(record: Dict[str, Any]) -> str:
+    """
+    Encode a result record as a single NDJSON line.
+
+    Args:
+        record: Result record to encode
+
+    Returns:
+        JSON string terminated by a newline
+    """
+    return json.dumps(_to_jsonable(record), default=str) + "\n"
+
+
+class BulkSimulationRunner:
+    """Runs simulations for many profiles and scenarios concurrently."""
+
+    def __init__(
+        self,
+        data_loader: Any,
+        scenarios: Dict[str, Any],
+        profile_builder: Callable[[Any], Dict[str, Any]],
+        config_builder: Callable[[str, str, Dict[str, Any]], Dict[str, Any]],
+        market_data: Optional[Any] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS
+    ):
+        """
+        Initialize the bulk runner.
+
+        Args:
+            data_loader: Loader exposing load_profiles(customer_ids)
+            scenarios: Mapping of scenario type to scenario instance
+            profile_builder: Converts a ProfileData model into the (read-only) simulation payload
+            config_builder: Builds a config from (profile_id, scenario_type, parameters)
+            market_data: Optional market data service to warm before running
+            max_workers: Number of worker threads running simulations
+        """
+        self.data_loader = data_loader
+        self.scenarios = scenarios
+        self.profile_builder = profile_builder
+        self.config_builder = config_builder
+        self.market_data = market_data
+        self.max_workers = max(1, max_workers)
+
+    def _prefetch_market_data(self) -> None:
+        """Warm shared market data so simulations hit the cache instead of the API."""
+        if self.market_data is None:
+            return
+        try:
+            self.market_data.prefetch_quotes(SIMULATION_QUOTE_SYMBOLS)
+        except Exception as e:
+            logger.warning(f"Market data prefetch failed: {e}")
+
+    def _run_one(
+        self,
+        profile_id: int,
+        scenario_type: str,
+        profile_payload: Dict[str, Any],
+        parameters: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Run a single simulation and wrap the outcome in a result record."""
+        start = time.time()
+        record = {"profile_id": profile_id, "scenario_type": scenario_type}
+        try:
+            config = self.config_builder(str(profile_id), scenario_type, parameters)
+            result = self.scenarios[scenario_type].run_simulation(profile_payload, config)
+            record.update(success=True, simulation_result=result)
+        except Exception as e:
+            logger.error(f"Bulk simulation {scenario_type} failed for profile {profile_id}: {e}")
+            record.update(success=False, error=str(e))
+        record["execution_time"] = time.time() - start
+        return record
+
+    async def run(
+        self,
+        profile_ids: Optional[List[int]],
+        jobs: List[Tuple[str, Dict[str, Any]]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run every job for every profile.
+
+        Args:
+            profile_ids: Profiles to simulate. If None, simulates every profile.
+            jobs: (scenario_type, parameters) pairs to run for each profile
+
+        Yields:
+            Result records in completion order
+        """
+        loop = asyncio.get_running_loop()
+
+        profiles = await loop.run_in_executor(None, self.data_loader.load_profiles, profile_ids)
+        if profile_ids is None:
+            profile_ids = list(profiles.keys())
+
+        for profile_id in profile_ids:
+            if profile_id not in profiles:
+                yield {
+                    "profile_id": profile_id,
+                    "scenario_type": None,
+                    "success": False,
+                    "error": f"Profile {profile_id} not found"
+                }
+
+        await loop.run_in_executor(None, self._prefetch_market_data)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = []
+            for profile_id, profile in profiles.items():
+                payload = self.profile_builder(profile)
+                for scenario_type, parameters in jobs:
+                    if scenario_type not in self.scenarios:
+                        yield {
+                            "profile_id": profile_id,
+                            "scenario_type": scenario_type,
+                            "success": False,
+                            "error": f"Invalid scenario type: {scenario_type}"
+                        }
+                        continue
+                    futures.append(loop.run_in_executor(
+                        executor, self._run_one, profile_id, scenario_type, payload, parameters
+                    ))
+
+            for future in asyncio.as_completed(futures):
+                yield await future
+        finally:
+            # Don't block the event loop if the client disconnects mid-stream
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,32 +1,65 @@
 """
 Cache Manager for Railway Deployment
-Handles caching with Redis and fallback to in-memory storage
+Handles caching with Redis (fronted by a small in-process L1) and fallback to in-memory storage
 """
 
 import os
-import json
+import uuid
+import weakref
+import threading
 import hashlib
 import logging
-from typing import Dict, Any, Optional, Union
-from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Union, List
 import asyncio
 from functools import wraps
 import redis.asyncio as redis
 
+from .memory_cache import MemoryCacheTier, DEFAULT_SWEEP_INTERVAL
+from .cache_serialization import CacheSerializer
+
 logger = logging.getLogger(__name__)
 
+# Delete the lock only if it still holds our token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 class CacheManager:
     """Unified cache manager for Railway Redis and local development"""
     
     def __init__(self):
         self.use_redis = os.getenv('REDIS_URL') is not None
         self.cache_ttl = int(os.getenv('CACHE_TTL_SECONDS', 3600))  # 1 hour default
-        self._memory_cache = {}  # Fallback for local development
+        # Bounded LRU/TTL fallback for local development and Redis-less pods
+        self._memory_cache = MemoryCacheTier(
+            max_bytes=int(os.getenv('CACHE_MAX_MEMORY_MB', 100)) * 1024 * 1024,
+            default_ttl=self.cache_ttl,
+            sweep_interval=float(os.getenv('CACHE_SWEEP_INTERVAL_SECONDS', DEFAULT_SWEEP_INTERVAL))
+        )
         self._redis_client = None
+        # redis.asyncio connections belong to the loop that opened them: _redis_client serves
+        # the first loop to use it, other loops (e.g. a sync bridge thread) get their own client
+        self._redis_loop = None
+        self._loop_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = weakref.WeakKeyDictionary()
+        self._redis_lock = threading.Lock()
+        self._serializer = CacheSerializer()
+        
+        # Per-process L1 in front of Redis; bounded staleness across processes via a short TTL
+        self._l1_cache: Optional[MemoryCacheTier] = None
+        self.l1_ttl = int(os.getenv('CACHE_L1_TTL_SECONDS', 30))
         
         if self.use_redis:
             self._setup_redis()
-            logger.info("Using Redis for caching")
+            if self.use_redis and os.getenv('CACHE_L1_ENABLED', 'true').lower() == 'true':
+                self._l1_cache = MemoryCacheTier(
+                    max_bytes=int(os.getenv('CACHE_L1_MAX_MB', 16)) * 1024 * 1024,
+                    default_ttl=self.l1_ttl,
+                    sweep_interval=float(os.getenv('CACHE_SWEEP_INTERVAL_SECONDS', DEFAULT_SWEEP_INTERVAL))
+                )
+            logger.info(f"Using Redis for caching (L1 {'enabled' if self._l1_cache else 'disabled'})")
         else:
             logger.info("Using in-memory cache for local development")
     
@@ -35,13 +68,7 @@ class CacheManager:
         try:
             redis_url = os.getenv('REDIS_URL')
             if redis_url:
-                self._redis_client = redis.from_url(
-                    redis_url,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                    retry_on_timeout=True
-                )
+                self._redis_client = self._connect_redis(redis_url)
                 logger.info("Redis connection established")
             else:
                 logger.warning("REDIS_URL not set, falling back to in-memory cache")
@@ -50,6 +77,31 @@ class CacheManager:
             logger.error(f"Failed to setup Redis: {e}")
             self.use_redis = False
     
+    @staticmethod
+    def _connect_redis(redis_url: str) -> redis.Redis:
+        """Create a Redis client; connections open lazily on the loop that first uses it"""
+        return redis.from_url(
+            redis_url,
+            decode_responses=False,  # values are binary-serialized
+            socket_connect_timeout=5,
+            socket_timeout=5,
+            retry_on_timeout=True
+        )
+    
+    def _redis(self) -> redis.Redis:
+        """Redis client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._redis_lock:
+            if self._redis_loop is None:
+                self._redis_loop = weakref.ref(loop)
+            if self._redis_loop() is loop:
+                return self._redis_client
+            client = self._loop_redis_clients.get(loop)
+            if client is None:
+                client = self._connect_redis(os.getenv('REDIS_URL'))
+                self._loop_redis_clients[loop] = client
+            return client
+    
     def _generate_cache_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate a consistent cache key from function arguments"""
         # Create a deterministic string representation
@@ -71,7 +123,14 @@ class CacheManager:
         """Get cached data"""
         try:
             if self.use_redis and self._redis_client:
-                return await self._get_from_redis(key)
+                if self._l1_cache is not None:
+                    value = self._l1_cache.get(key)
+                    if value is not None:
+                        return value
+                value = await self._get_from_redis(key)
+                if value is not None and self._l1_cache is not None:
+                    self._l1_cache.set(key, value, self.l1_ttl)
+                return value
             else:
                 return self._get_from_memory(key)
         except Exception as e:
@@ -82,7 +141,9 @@ class CacheManager:
         """Set cached data"""
         try:
             if self.use_redis and self._redis_client:
-                return await self._set_in_redis(key, data, ttl)
+                stored = await self._set_in_redis(key, data, ttl)
+                self._update_l1(key, data if stored else None, ttl)
+                return stored
             else:
                 return self._set_in_memory(key, data, ttl)
         except Exception as e:
@@ -93,6 +154,7 @@ class CacheManager:
         """Delete cached data"""
         try:
             if self.use_redis and self._redis_client:
+                self._update_l1(key, None)
                 return await self._delete_from_redis(key)
             else:
                 return self._delete_from_memory(key)
@@ -104,6 +166,8 @@ class CacheManager:
         """Clear all cache entries matching a pattern"""
         try:
             if self.use_redis and self._redis_client:
+                if self._l1_cache is not None:
+                    self._l1_cache.clear_pattern(pattern)
                 return await self._clear_pattern_redis(pattern)
             else:
                 return self._clear_pattern_memory(pattern)
@@ -111,18 +175,103 @@ class CacheManager:
             logger.error(f"Cache clear pattern error for {pattern}: {e}")
             return 0
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several keys at once (L1 first, then one pipelined Redis MGET)
+        
+        Returns:
+            Mapping of found keys to their values; missing keys are omitted
+        """
+        results: Dict[str, Any] = {}
+        try:
+            if not (self.use_redis and self._redis_client):
+                for key in keys:
+                    value = self._get_from_memory(key)
+                    if value is not None:
+                        results[key] = value
+                return results
+            
+            missing = []
+            for key in keys:
+                value = self._l1_cache.get(key) if self._l1_cache is not None else None
+                if value is not None:
+                    results[key] = value
+                else:
+                    missing.append(key)
+            
+            if missing:
+                raw_values = await self._redis().mget(missing)
+                for key, raw in zip(missing, raw_values):
+                    if raw is None:
+                        continue
+                    value = self._serializer.loads(raw)
+                    results[key] = value
+                    self._update_l1(key, value)
+            return results
+        except Exception as e:
+            logger.error(f"Cache get_many error: {e}")
+            return results
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Set several keys at once using a single Redis pipeline"""
+        try:
+            if not (self.use_redis and self._redis_client):
+                return all(self._set_in_memory(key, value, ttl) for key, value in items.items())
+            
+            async with self._redis().pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl or self.cache_ttl, self._serializer.dumps(value))
+                await pipe.execute()
+            
+            for key, value in items.items():
+                self._update_l1(key, value, ttl)
+            return True
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            return False
+    
+    async def acquire_lock(self, name: str, ttl_seconds: float = 30) -> Optional[str]:
+        """Try to take a short cross-process lock (Redis SET NX PX)
+        
+        Returns:
+            A token to pass to release_lock, or None if another process holds the lock.
+            Without Redis there are no other processes to coordinate with, so the lock
+            is always granted.
+        """
+        token = uuid.uuid4().hex
+        if not (self.use_redis and self._redis_client):
+            return token
+        acquired = await self._redis().set(name, token, nx=True, px=int(ttl_seconds * 1000))
+        return token if acquired else None
+    
+    async def release_lock(self, name: str, token: str) -> None:
+        """Release a lock taken with acquire_lock if it is still ours"""
+        if not (self.use_redis and self._redis_client):
+            return
+        await self._redis().eval(_RELEASE_LOCK_SCRIPT, 1, name, token)
+    
+    async def is_locked(self, name: str) -> bool:
+        """Check whether a cross-process lock is currently held"""
+        if not (self.use_redis and self._redis_client):
+            return False
+        return bool(await self._redis().exists(name))
+    
+    def _update_l1(self, key: str, value: Optional[Any], ttl: Optional[int] = None) -> None:
+        """Write through to L1, or drop the key when value is None"""
+        if self._l1_cache is None:
+            return
+        if value is None:
+            self._l1_cache.delete(key)
+        else:
+            self._l1_cache.set(key, value, min(ttl or self.l1_ttl, self.l1_ttl))
+    
     # Redis Methods
     async def _get_from_redis(self, key: str) -> Optional[Dict[str, Any]]:
         """Get data from Redis"""
         try:
-            data = await self._redis_client.get(key)
-            if data:
-                cache_data = json.loads(data)
-                if not self._is_expired(cache_data):
-                    return cache_data['data']
-                else:
-                    # Clean up expired data
-                    await self._redis_client.delete(key)
+            data = await self._redis().get(key)
+            if data is not None:
+                # Redis enforces the TTL via SETEX, so no timestamp check is needed
+                return self._serializer.loads(data)
             return None
         except Exception as e:
             logger.error(f"Redis get error: {e}")
@@ -131,16 +280,10 @@ class CacheManager:
     async def _set_in_redis(self, key: str, data: Dict[str, Any], ttl: Optional[int] = None) -> bool:
         """Set data in Redis"""
         try:
-            cache_data = {
-                'data': data,
-                'timestamp': datetime.now().isoformat(),
-                'ttl': ttl or self.cache_ttl
-            }
-            
-            await self._redis_client.setex(
+            await self._redis().setex(
                 key,
                 ttl or self.cache_ttl,
-                json.dumps(cache_data)
+                self._serializer.dumps(data)
             )
             return True
         except Exception as e:
@@ -150,7 +293,7 @@ class CacheManager:
     async def _delete_from_redis(self, key: str) -> bool:
         """Delete data from Redis"""
         try:
-            result = await self._redis_client.delete(key)
+            result = await self._redis().delete(key)
             return result > 0
         except Exception as e:
             logger.error(f"Redis delete error: {e}")
@@ -159,9 +302,9 @@ class CacheManager:
     async def _clear_pattern_redis(self, pattern: str) -> int:
         """Clear all cache entries matching a pattern"""
         try:
-            keys = await self._redis_client.keys(pattern)
+            keys = await self._redis().keys(pattern)
             if keys:
-                result = await self._redis_client.delete(*keys)
+                result = await self._redis().delete(*keys)
                 return result
             return 0
         except Exception as e:
@@ -171,25 +314,12 @@ class CacheManager:
     # Memory Cache Methods (fallback)
     def _get_from_memory(self, key: str) -> Optional[Dict[str, Any]]:
         """Get data from memory cache"""
-        if key in self._memory_cache:
-            cache_data = self._memory_cache[key]
-            if not self._is_expired(cache_data):
-                return cache_data['data']
-            else:
-                # Clean up expired data
-                del self._memory_cache[key]
-        return None
+        return self._memory_cache.get(key)
     
     def _set_in_memory(self, key: str, data: Dict[str, Any], ttl: Optional[int] = None) -> bool:
         """Set data in memory cache"""
         try:
-            cache_data = {
-                'data': data,
-                'timestamp': datetime.now().isoformat(),
-                'ttl': ttl or self.cache_ttl
-            }
-            self._memory_cache[key] = cache_data
-            return True
+            return self._memory_cache.set(key, data, ttl or self.cache_ttl)
         except Exception as e:
             logger.error(f"Memory cache set error: {e}")
             return False
@@ -197,10 +327,7 @@ class CacheManager:
     def _delete_from_memory(self, key: str) -> bool:
         """Delete data from memory cache"""
         try:
-            if key in self._memory_cache:
-                del self._memory_cache[key]
-                return True
-            return False
+            return self._memory_cache.delete(key)
         except Exception as e:
             logger.error(f"Memory cache delete error: {e}")
             return False
@@ -208,49 +335,41 @@ class CacheManager:
     def _clear_pattern_memory(self, pattern: str) -> int:
         """Clear all memory cache entries matching a pattern"""
         try:
-            deleted_count = 0
-            keys_to_delete = []
-            
-            for key in self._memory_cache.keys():
-                if pattern in key:  # Simple pattern matching
-                    keys_to_delete.append(key)
-            
-            for key in keys_to_delete:
-                del self._memory_cache[key]
-                deleted_count += 1
-            
-            return deleted_count
+            return self._memory_cache.clear_pattern(pattern)
         except Exception as e:
             logger.error(f"Memory cache clear pattern error: {e}")
             return 0
     
-    def _is_expired(self, cache_data: Dict[str, Any]) -> bool:
-        """Check if cache data is expired"""
-        try:
-            timestamp = datetime.fromisoformat(cache_data['timestamp'])
-            ttl = cache_data.get('ttl', self.cache_ttl)
-            expiry_time = timestamp + timedelta(seconds=ttl)
-            return datetime.now() > expiry_time
-        except Exception:
-            return True
+    def set_memory_limit(self, max_mb: int) -> None:
+        """Set the byte budget of the in-memory tier"""
+        self._memory_cache.set_max_bytes(max_mb * 1024 * 1024)
+    
+    def set_compression(self, enabled: bool) -> None:
+        """Enable or disable compression of values stored in Redis"""
+        self._serializer.enable_compression = enabled
     
     async def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         try:
             if self.use_redis and self._redis_client:
-                info = await self._redis_client.info()
+                info = await self._redis().info()
                 return {
                     'type': 'redis',
                     'connected_clients': info.get('connected_clients', 0),
                     'used_memory_human': info.get('used_memory_human', '0B'),
                     'keyspace_hits': info.get('keyspace_hits', 0),
-                    'keyspace_misses': info.get('keyspace_misses', 0)
+                    'keyspace_misses': info.get('keyspace_misses', 0),
+                    'l1': self._l1_cache.get_stats() if self._l1_cache is not None else None
                 }
             else:
+                memory_stats = self._memory_cache.get_stats()
                 return {
                     'type': 'memory',
-                    'cache_size': len(self._memory_cache),
-                    'memory_usage': 'N/A'
+                    'cache_size': memory_stats['entries'],
+                    'memory_usage': f"{memory_stats['size_bytes'] / (1024 * 1024):.2f}MB",
+                    'memory_limit': f"{memory_stats['max_bytes'] / (1024 * 1024):.0f}MB",
+                    'evictions': memory_stats['evictions'],
+                    'expirations': memory_stats['expirations']
                 }
         except Exception as e:
             logger.error(f"Cache stats error: {e}")
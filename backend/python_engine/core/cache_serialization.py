@@ -0,0 +1,79 @@
+"""
+Binary serialization for cached values.
+Pickle protocol 5 with optional zlib/lz4 compression, tagged with a one-byte
+header so payloads written with different settings remain readable.
+"""
+
+import json
+import zlib
+import pickle
+import logging
+from typing import Any
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+RAW = b'P'
+ZLIB = b'Z'
+LZ4 = b'L'
+
+# Payloads smaller than this are not worth compressing
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+
+class CacheSerializer:
+    """Serialize cache values to compact bytes."""
+
+    def __init__(
+        self,
+        enable_compression: bool = True,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        zlib_level: int = 1
+    ):
+        """
+        Initialize the serializer.
+
+        Args:
+            enable_compression: Compress payloads above the threshold
+            compression_threshold: Minimum payload size in bytes to compress
+            zlib_level: zlib level used when lz4 is not installed
+        """
+        self.enable_compression = enable_compression
+        self.compression_threshold = compression_threshold
+        self.zlib_level = zlib_level
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to tagged bytes."""
+        payload = pickle.dumps(value, protocol=5)
+        if self.enable_compression and len(payload) >= self.compression_threshold:
+            if lz4_frame is not None:
+                return LZ4 + lz4_frame.compress(payload)
+            return ZLIB + zlib.compress(payload, self.zlib_level)
+        return RAW + payload
+
+    def loads(self, data: bytes) -> Any:
+        """
+        Deserialize tagged bytes produced by dumps().
+
+        Values written by the previous JSON format ({'data': ..., 'timestamp': ...})
+        are still understood so a rolling deploy does not flush the cache.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+
+        tag, payload = data[:1], data[1:]
+        if tag == RAW:
+            return pickle.loads(payload)
+        if tag == ZLIB:
+            return pickle.loads(zlib.decompress(payload))
+        if tag == LZ4:
+            if lz4_frame is None:
+                raise ValueError("lz4-compressed cache value but lz4 is not installed")
+            return pickle.loads(lz4_frame.decompress(payload))
+        if tag == b'{':
+            return json.loads(data).get('data')
+        raise ValueError(f"Unknown cache payload tag: {tag!r}")
@@ -0,0 +1,268 @@
+"""
+Data version service.
+Polls the CSV data directory for changes, maintains a monotonically increasing
+data version and tells subscribed caches which profiles were affected.
+"""
+
+import os
+import csv
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5.0
+
+# Files whose rows can be attributed to a single customer, and the column that identifies them
+CUSTOMER_KEYED_FILES = {
+    'customer.csv': 'customer_id',
+    'account.csv': 'customer_id',
+    'goal.csv': 'customer_id',
+}
+
+
+@dataclass
+class DataChange:
+    """A detected change to the data directory."""
+    version: int
+    changed_files: List[str]
+    profile_ids: Optional[Set[int]] = None  # None means every profile may be affected
+
+    def affects(self, profile_id: int) -> bool:
+        """Check whether a profile is affected by this change."""
+        return self.profile_ids is None or profile_id in self.profile_ids
+
+
+@dataclass
+class _FileState:
+    """Last observed state of a data file."""
+    signature: Tuple[int, int]
+    digests: Dict[int, str] = field(default_factory=dict)
+
+
+class DataVersionService:
+    """Tracks data file changes and notifies caches of affected profiles."""
+
+    def __init__(self, data_dir: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Initialize the service and record the current state of the data files.
+
+        Args:
+            data_dir: Directory containing the CSV files
+            poll_interval: Seconds between polls when running in the background
+        """
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self._version = 0
+        self._profile_versions: Dict[int, int] = {}
+        self._all_profiles_version = 0
+        self._subscribers: List[Callable[[DataChange], None]] = []
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._account_owners = self._read_account_owners()
+        self._files: Dict[str, _FileState] = {
+            filename: self._snapshot(filename) for filename in self._list_files()
+        }
+
+    @property
+    def version(self) -> int:
+        """Current global data version."""
+        return self._version
+
+    def profile_version(self, profile_id: int) -> int:
+        """
+        Get the data version at which a profile last changed.
+
+        Caches can include this in their keys so stale entries are never served.
+        """
+        with self._lock:
+            return max(self._profile_versions.get(profile_id, 0), self._all_profiles_version)
+
+    def profile_fingerprint(self, profile_id: int) -> str:
+        """
+        Content fingerprint of the data a profile depends on.
+
+        Unlike profile_version, which counts changes seen by this process, it is
+        the same in every process reading the same files, so caches shared across
+        workers can key on it.
+        """
+        with self._lock:
+            hasher = hashlib.md5()
+            for filename in sorted(self._files):
+                state = self._files[filename]
+                if state.digests:
+                    part = state.digests.get(profile_id, "-")
+                else:
+                    # Rows can't be attributed to customers: any change affects every profile
+                    part = f"{state.signature[0]}:{state.signature[1]}"
+                hasher.update(f"{filename}={part};".encode())
+            return hasher.hexdigest()[:16]
+
+    def subscribe(self, callback: Callable[[DataChange], None]) -> None:
+        """Register a callback invoked with each DataChange."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def _list_files(self) -> List[str]:
+        """List the CSV files in the data directory."""
+        try:
+            return sorted(f for f in os.listdir(self.data_dir) if f.endswith('.csv'))
+        except FileNotFoundError:
+            return []
+
+    def _signature(self, filename: str) -> Tuple[int, int]:
+        """Cheap change signature for a file: (mtime_ns, size)."""
+        stat = os.stat(os.path.join(self.data_dir, filename))
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_rows(self, filename: str) -> List[Dict[str, str]]:
+        """Read a CSV file as dictionaries."""
+        with open(os.path.join(self.data_dir, filename), newline='') as f:
+            return list(csv.DictReader(f))
+
+    def _read_account_owners(self) -> Dict[int, int]:
+        """Map account IDs to their owning customer."""
+        try:
+            return {
+                int(row['account_id']): int(row['customer_id'])
+                for row in self._read_rows('account.csv')
+            }
+        except (FileNotFoundError, KeyError, ValueError):
+            return {}
+
+    def _owner_of(self, filename: str, row: Dict[str, str]) -> Optional[int]:
+        """Find the customer a row belongs to, if it can be attributed."""
+        try:
+            if filename in CUSTOMER_KEYED_FILES:
+                return int(row[CUSTOMER_KEYED_FILES[filename]])
+            if filename == 'transaction.csv':
+                return self._account_owners.get(int(row['account_id']))
+        except (KeyError, ValueError, TypeError):
+            pass
+        return None
+
+    def _snapshot(self, filename: str) -> _FileState:
+        """Record a file's signature and, for customer-attributable files, per-customer digests."""
+        state = _FileState(signature=self._signature(filename))
+        if filename not in CUSTOMER_KEYED_FILES and filename != 'transaction.csv':
+            return state
+
+        hashers: Dict[int, Any] = {}
+        for row in self._read_rows(filename):
+            owner = self._owner_of(filename, row)
+            if owner is None:
+                continue
+            hasher = hashers.setdefault(owner, hashlib.md5())
+            hasher.update(repr(sorted(row.items())).encode())
+        state.digests = {owner: hasher.hexdigest() for owner, hasher in hashers.items()}
+        return state
+
+    def check(self) -> Optional[DataChange]:
+        """
+        Poll the data directory once and publish any change.
+
+        Returns:
+            The DataChange published, or None if nothing changed
+        """
+        with self._lock:
+            current_files = set(self._list_files())
+            known_files = set(self._files)
+
+            changed = sorted(current_files ^ known_files)
+            for filename in current_files & known_files:
+                try:
+                    if self._signature(filename) != self._files[filename].signature:
+                        changed.append(filename)
+                except FileNotFoundError:
+                    changed.append(filename)
+
+            if not changed:
+                return None
+
+            if 'account.csv' in changed:
+                self._account_owners = self._read_account_owners()
+
+            profile_ids: Optional[Set[int]] = set()
+            for filename in changed:
+                old_state = self._files.pop(filename, None)
+                if filename not in current_files:
+                    profile_ids = None
+                    continue
+
+                try:
+                    new_state = self._snapshot(filename)
+                except Exception as e:
+                    logger.error(f"Failed to read {filename}: {e}")
+                    profile_ids = None
+                    continue
+                self._files[filename] = new_state
+
+                if old_state is None or (not new_state.digests and not old_state.digests):
+                    # New file or one that can't be attributed to customers
+                    profile_ids = None
+                elif profile_ids is not None:
+                    owners = set(old_state.digests) | set(new_state.digests)
+                    profile_ids |= {
+                        owner for owner in owners
+                        if old_state.digests.get(owner) != new_state.digests.get(owner)
+                    }
+
+            if profile_ids is not None and not profile_ids:
+                # Files were touched but no customer's rows changed
+                return None
+
+            self._version += 1
+            if profile_ids is None:
+                self._all_profiles_version = self._version
+            else:
+                for profile_id in profile_ids:
+                    self._profile_versions[profile_id] = self._version
+
+            change = DataChange(
+                version=self._version,
+                changed_files=sorted(changed),
+                profile_ids=profile_ids
+            )
+            subscribers = list(self._subscribers)
+
+        logger.info(
+            f"Data version {change.version}: {', '.join(change.changed_files)} changed, "
+            f"affected profiles: {'all' if profile_ids is None else sorted(profile_ids)}"
+        )
+
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                logger.error(f"Data change subscriber failed: {e}")
+
+        return change
+
+    def start(self) -> None:
+        """Start polling in a background daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name="data-version-poller", daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.data_dir} for data changes every {self.poll_interval}s")
+
+    def stop(self) -> None:
+        """Stop the background polling thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _poll_loop(self) -> None:
+        """Background polling loop."""
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Data version poll failed: {e}")
@@ -0,0 +1,194 @@
+"""
+Persistent on-disk embedding store.
+Append-only float32 vector file plus a text index keyed by content hash, read
+through a memory map so stored embeddings survive restarts without re-embedding.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writes are then only serialized in-process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.getenv(
+    "EMBEDDING_STORE_DIR",
+    str(Path(__file__).parent.parent / ".embedding_store")
+)
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.tsv"
+
+_ITEM_SIZE = np.dtype(np.float32).itemsize
+
+
+def content_key(text: str, model: str = "") -> str:
+    """Content hash identifying an embedding; the model is part of the key."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Content-hash -> float32 vector store backed by two append-only files.
+
+    vectors.f32 holds raw float32 vectors back to back; index.tsv holds one
+    "<key>\\t<offset>\\t<dimension>" line per vector. Vector bytes are written
+    before their index line, so a crash can leave unused bytes but never an index
+    entry pointing at a partial vector. Other processes' appends are picked up
+    on the next lookup miss.
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR):
+        """
+        Open (or create) an embedding store.
+
+        Args:
+            store_dir: Directory holding the vector and index files
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.store_dir / VECTORS_FILE
+        self._index_path = self.store_dir / INDEX_FILE
+        self._vectors_path.touch(exist_ok=True)
+        self._index_path.touch(exist_ok=True)
+
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._index_position = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.RLock()
+
+        self._read_new_index_entries()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get one stored vector, or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up stored vectors.
+
+        Returns:
+            Mapping of found keys to read-only float32 vectors
+        """
+        keys = list(keys)
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                self._read_new_index_entries()
+
+            found = [(key, self._index[key]) for key in keys if key in self._index]
+            if not found:
+                return {}
+
+            vectors = self._mapped_vectors(max(offset + dim for _, (offset, dim) in found))
+            return {key: vectors[offset:offset + dim] for key, (offset, dim) in found}
+
+    def put_many(self, vectors: Dict[str, List[float]]) -> int:
+        """
+        Append vectors that are not already stored.
+
+        Returns:
+            Number of vectors written
+        """
+        with self._lock:
+            self._read_new_index_entries()
+            new = {key: vector for key, vector in vectors.items() if key not in self._index}
+            if not new:
+                return 0
+
+            with open(self._vectors_path, "ab") as vector_file, open(self._index_path, "a") as index_file:
+                self._lock_file(vector_file)
+                try:
+                    vector_file.seek(0, os.SEEK_END)
+                    offset = vector_file.tell() // _ITEM_SIZE
+                    lines = []
+                    for key, vector in new.items():
+                        array = np.asarray(vector, dtype=np.float32).ravel()
+                        vector_file.write(array.tobytes())
+                        lines.append(f"{key}\t{offset}\t{array.size}\n")
+                        offset += array.size
+                    vector_file.flush()
+                    os.fsync(vector_file.fileno())
+
+                    index_file.write("".join(lines))
+                    index_file.flush()
+                finally:
+                    self._unlock_file(vector_file)
+
+            self._read_new_index_entries()
+            return len(new)
+
+    def put(self, key: str, vector: List[float]) -> bool:
+        """Append one vector. Returns False if it was already stored."""
+        return self.put_many({key: vector}) == 1
+
+    def _read_new_index_entries(self) -> None:
+        """Read index lines appended since the last read."""
+        with open(self._index_path, "r") as index_file:
+            index_file.seek(self._index_position)
+            while True:
+                line = index_file.readline()
+                if not line.endswith("\n"):
+                    break  # EOF, or a line another process is still writing
+                self._index_position = index_file.tell()
+                try:
+                    key, offset, dim = line.rstrip("\n").split("\t")
+                    self._index.setdefault(key, (int(offset), int(dim)))
+                except ValueError:
+                    logger.warning(f"Skipping malformed embedding index line in {self._index_path}")
+
+    def _mapped_vectors(self, min_length: int) -> np.ndarray:
+        """Read-only memory map of the vector file covering at least min_length floats."""
+        if self._mmap is None or len(self._mmap) < min_length:
+            length = os.path.getsize(self._vectors_path) // _ITEM_SIZE
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(length,))
+        return self._mmap
+
+    @staticmethod
+    def _lock_file(handle) -> None:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    @staticmethod
+    def _unlock_file(handle) -> None:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+_default_store: Optional[EmbeddingStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """
+    Process-wide store in EMBEDDING_STORE_DIR.
+
+    Returns:
+        The shared store, or None if EMBEDDING_STORE_DIR is set empty or the
+        directory is not writable
+    """
+    global _default_store
+    if not DEFAULT_STORE_DIR:
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            try:
+                _default_store = EmbeddingStore(DEFAULT_STORE_DIR)
+            except OSError as e:
+                logger.warning(f"Embedding store unavailable at {DEFAULT_STORE_DIR}: {e}")
+                return None
+        return _default_store
@@ -0,0 +1,218 @@
+"""
+Historical price series cache.
+Per-symbol daily close series persisted locally, with annualized returns and
+volatilities precomputed for common windows so simulations never refetch or
+rescan full price histories.
+"""
+
+import os
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "MARKET_DATA_CACHE_DIR",
+    str(Path(__file__).parent.parent / ".market_data_cache")
+)
+
+# Windows (years) precomputed for every series
+COMMON_WINDOWS = (1, 3, 5, 10)
+
+# Years of history requested from the API; covers the longest window
+HISTORY_YEARS = max(COMMON_WINDOWS)
+
+TRADING_DAYS_PER_YEAR = 252
+DAYS_PER_YEAR = 365.25
+
+
+@dataclass
+class WindowStats:
+    """Annualized statistics for one lookback window."""
+    annualized_return: float
+    annualized_volatility: float
+    start_date: str
+    end_date: str
+
+
+@dataclass
+class PriceSeries:
+    """Daily closes for one symbol, oldest first, with precomputed window stats."""
+    symbol: str
+    dates: np.ndarray  # datetime64[D]
+    closes: np.ndarray  # float64
+    fetched_on: date
+    stats: Dict[int, WindowStats] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.stats:
+            self.stats = {
+                years: window_stats
+                for years in COMMON_WINDOWS
+                if (window_stats := compute_window_stats(self.dates, self.closes, years)) is not None
+            }
+
+    def window(self, years: int) -> Optional[WindowStats]:
+        """Stats for a lookback window, computed on demand for uncommon windows."""
+        if years not in self.stats:
+            window_stats = compute_window_stats(self.dates, self.closes, years)
+            if window_stats is None:
+                return None
+            self.stats[years] = window_stats
+        return self.stats[years]
+
+    def is_current(self, today: Optional[date] = None) -> bool:
+        """Daily granularity: a series fetched today is up to date."""
+        return self.fetched_on >= (today or _utc_today())
+
+    @classmethod
+    def from_fmp(cls, symbol: str, historical: List[Dict[str, Any]]) -> Optional["PriceSeries"]:
+        """
+        Build a series from FMP 'historical' rows ({'date': 'YYYY-MM-DD', 'close': ...}).
+
+        Returns:
+            The series, or None if there are no usable rows
+        """
+        rows = [
+            (row['date'], row['close'])
+            for row in historical
+            if row.get('date') and row.get('close') is not None
+        ]
+        if not rows:
+            return None
+        rows.sort()
+        dates = np.array([row[0][:10] for row in rows], dtype='datetime64[D]')
+        closes = np.array([row[1] for row in rows], dtype=np.float64)
+        return cls(symbol=symbol, dates=dates, closes=closes, fetched_on=_utc_today())
+
+
+def compute_window_stats(dates: np.ndarray, closes: np.ndarray, years: int) -> Optional[WindowStats]:
+    """
+    Annualized return and volatility over the trailing window.
+
+    The return is annualized over the window's actual span, so a series shorter
+    than the requested window is not overstated.
+
+    Returns:
+        Stats, or None if fewer than two positive closes fall in the window
+    """
+    if len(dates) < 2:
+        return None
+    start = dates[-1] - np.timedelta64(int(round(years * DAYS_PER_YEAR)), 'D')
+    mask = (dates >= start) & (closes > 0)
+    window_dates = dates[mask]
+    window_closes = closes[mask]
+    if len(window_closes) < 2:
+        return None
+
+    span_years = (window_dates[-1] - window_dates[0]).astype(int) / DAYS_PER_YEAR
+    if span_years <= 0:
+        return None
+
+    total_return = window_closes[-1] / window_closes[0]
+    log_returns = np.diff(np.log(window_closes))
+    volatility = float(np.std(log_returns, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)) if len(log_returns) > 1 else 0.0
+
+    return WindowStats(
+        annualized_return=float(total_return ** (1 / span_years) - 1),
+        annualized_volatility=volatility,
+        start_date=str(window_dates[0]),
+        end_date=str(window_dates[-1])
+    )
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+class HistoricalSeriesCache:
+    """In-memory cache of PriceSeries backed by one .npz file per symbol."""
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """
+        Args:
+            cache_dir: Directory for persisted series; None or empty keeps series in memory only
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._series: Dict[str, PriceSeries] = {}
+        self._lock = threading.Lock()
+
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Historical series cache dir unavailable ({e}); keeping series in memory")
+                self.cache_dir = None
+
+    def get(self, symbol: str) -> Optional[PriceSeries]:
+        """Cached series for a symbol (current or not), loading it from disk on first use."""
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._load(symbol)
+            if series is not None:
+                with self._lock:
+                    self._series.setdefault(symbol, series)
+        return series
+
+    def missing_or_outdated(self, symbols: Iterable[str]) -> List[str]:
+        """Symbols whose series must be fetched to be current as of today."""
+        today = _utc_today()
+        result = []
+        for symbol in dict.fromkeys(symbols):
+            series = self.get(symbol)
+            if series is None or not series.is_current(today):
+                result.append(symbol)
+        return result
+
+    def put(self, series: PriceSeries) -> None:
+        """Cache a series and persist it."""
+        with self._lock:
+            self._series[series.symbol] = series
+        self._save(series)
+
+    def _path(self, symbol: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+        return self.cache_dir / f"{safe}.npz"
+
+    def _save(self, series: PriceSeries) -> None:
+        """Write atomically so a concurrent reader never sees a partial file."""
+        if self.cache_dir is None:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    symbol=np.array(series.symbol),
+                    dates=series.dates.astype('datetime64[D]').astype(np.int64),
+                    closes=series.closes,
+                    fetched_on=np.array(series.fetched_on.isoformat())
+                )
+            os.replace(tmp_path, self._path(series.symbol))
+        except OSError as e:
+            logger.warning(f"Could not persist historical series for {series.symbol}: {e}")
+
+    def _load(self, symbol: str) -> Optional[PriceSeries]:
+        if self.cache_dir is None:
+            return None
+        path = self._path(symbol)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return PriceSeries(
+                    symbol=symbol,
+                    dates=data['dates'].astype('datetime64[D]'),
+                    closes=data['closes'],
+                    fetched_on=date.fromisoformat(str(data['fetched_on']))
+                )
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable historical series {path}: {e}")
+            return None
@@ -4,17 +4,36 @@ Provides cached market data for simulations and analysis with robust fallback me
 """
 
 import os
-import requests
 import json
 import time
+import tempfile
+import random
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import threading
+import httpx
+
+from .sync_bridge import SyncBridge
+from .historical_series import HistoricalSeriesCache, PriceSeries, WindowStats, HISTORY_YEARS, DEFAULT_CACHE_DIR
+from .market_snapshot import (
+    MarketDataSnapshot,
+    SnapshotRecorder,
+    MARKET_DATA_MODES,
+    MODE_LIVE,
+    MODE_REPLAY,
+    MODE_RECORD,
+)
 
 logger = logging.getLogger(__name__)
 
+QUOTES_FILE = "quotes.json"
+
+# How long a first price lookup waits for the initial refresh before fetching the symbol itself
+READY_WAIT_SECONDS = 2.0
+
 @dataclass
 class MarketDataCache:
     """Cache structure for market data."""
@@ -22,21 +41,107 @@ class MarketDataCache:
     timestamp: float
     last_known_values: Dict[str, Any]
     is_fresh: bool = True
+    stale_at: Optional[float] = None  # Jittered soft expiry; served stale and refreshed after it
+
+class AsyncTokenBucket:
+    """Async token-bucket rate limiter: callers wait for a token instead of sleeping a thread."""
+    
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
 
 class FMPMarketDataService:
-    """Enhanced market data service with FMP API integration."""
+    """
+    Enhanced market data service with FMP API integration.
     
-    def __init__(self):
+    Network I/O is async on a pooled httpx client running on the service's own
+    event loop; the synchronous methods are facades over it for scenario code.
+    Cached reads never take a lock or touch the network.
+    
+    Construction does no network I/O: the cache starts from the quotes persisted
+    by the last run, and start() refreshes them in the background.
+    
+    MARKET_DATA_MODE selects where responses come from: "live" calls the API,
+    "replay" serves only the MARKET_DATA_SNAPSHOT file and never touches the
+    network, and "record" calls the API and writes every response into it.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        mode: Optional[str] = None,
+        snapshot_path: Optional[str] = None
+    ):
+        """
+        Args:
+            cache_dir: Directory for persisted quotes and historical series;
+                None or empty keeps everything in memory
+            mode: "live", "replay" or "record"; defaults to MARKET_DATA_MODE or "live"
+            snapshot_path: Snapshot file for replay/record; defaults to MARKET_DATA_SNAPSHOT
+        
+        Raises:
+            ValueError: If the mode is unknown, or replay/record has no usable snapshot
+        """
+        self.mode = (mode or os.getenv('MARKET_DATA_MODE') or MODE_LIVE).lower()
+        if self.mode not in MARKET_DATA_MODES:
+            raise ValueError(f"Unknown market data mode '{self.mode}' (expected one of {', '.join(MARKET_DATA_MODES)})")
+        self.snapshot_path = snapshot_path or os.getenv('MARKET_DATA_SNAPSHOT')
+        self.snapshot: Optional[MarketDataSnapshot] = None
+        self.recorder: Optional[SnapshotRecorder] = None
+        if self.mode != MODE_LIVE and not self.snapshot_path:
+            raise ValueError(f"Market data mode '{self.mode}' requires MARKET_DATA_SNAPSHOT")
+        if self.mode == MODE_REPLAY:
+            self.snapshot = MarketDataSnapshot.load(self.snapshot_path)
+            cache_dir = None  # Replayed series must not overwrite or be mixed with the live cache
+        elif self.mode == MODE_RECORD:
+            self.recorder = SnapshotRecorder(self.snapshot_path)
+        
         self.api_key = os.getenv('FMP_API_KEY', 'demo')
         self.base_url = "https://financialmodelingprep.com/api/v3"
         self.cache: Dict[str, MarketDataCache] = {}
         self.cache_duration = 3600  # 1 hour cache
+        self.stale_duration = 4 * 3600  # Serve stale quotes while refreshing for up to 4 hours
+        self.cache_jitter = 0.1  # Expire up to 10% early so quotes loaded together refresh apart
+        self.historical_series = HistoricalSeriesCache(cache_dir)
+        self.quotes_path = self.historical_series.cache_dir / QUOTES_FILE if self.historical_series.cache_dir else None
         self.last_known_values: Dict[str, Any] = {}
         self.lock = threading.Lock()
         
+        # All network calls run on this loop so the pooled client and limiter stay on one loop
+        self._bridge = SyncBridge("market-data-loop")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: Dict[str, asyncio.Task] = {}  # symbol -> in-flight quote fetch
+        self._pending_history: Dict[str, asyncio.Task] = {}  # symbol -> in-flight series fetch
+        self._history_retry_at: Dict[str, float] = {}  # symbol -> earliest retry after a failed fetch
+        self.history_retry_interval = 300  # Seconds before retrying a failed series fetch
+        
         # Rate limiting for FMP free tier
         self.last_api_call = 0
-        self.min_call_interval = 1.0  # Minimum 1 second between calls
+        self.min_call_interval = 1.0  # Sustained rate of 1 call per second
+        self.rate_limiter = AsyncTokenBucket(rate=1 / self.min_call_interval, capacity=5)
         self.daily_call_count = 0
         self.daily_call_limit = 500  # Conservative limit for free tier
         self.last_reset_date = datetime.now().date()
@@ -75,10 +180,101 @@ class FMPMarketDataService:
             "VMFXX",  # Vanguard Money Market
         ]
         
-        # Initialize cache on startup
-        self._initialize_cache()
+        # Readiness: set once the cache holds usable quotes (persisted or refreshed)
+        self._ready = threading.Event()
+        self._initial_refresh = None
+        self.data_source = "none"
+        self.last_refresh: Optional[float] = None
+        
+        # Start from last-known quotes (or the replayed snapshot); the refresh happens in start()
+        if self.snapshot is not None:
+            self._load_snapshot_quotes()
+        else:
+            self._load_persisted_quotes()
+    
+    def start(self):
+        """Refresh the cache in the background. Safe to call more than once."""
+        if self._initial_refresh is None:
+            self._initial_refresh = self._bridge.submit(self._initialize_cache_async())
+    
+    def is_ready(self) -> bool:
+        """Readiness: quotes are available, from the last run or the initial refresh."""
+        return self._ready.is_set()
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until ready, starting the background refresh if needed."""
+        self.start()
+        return self._ready.wait(timeout)
+    
+    def get_readiness(self) -> Dict[str, Any]:
+        """Readiness details for the /ready probe."""
+        return {
+            'ready': self.is_ready(),
+            'data_source': self.data_source,
+            'initial_refresh_done': bool(self._initial_refresh and self._initial_refresh.done()),
+            'last_refresh': datetime.fromtimestamp(self.last_refresh).isoformat() if self.last_refresh else None,
+            'cached_symbols': len(self.cache),
+            'mode': self.mode,
+            'snapshot_version': self.snapshot.version if self.snapshot else None
+        }
+    
+    def _load_snapshot_quotes(self):
+        """Seed the cache with every quote in the replayed snapshot."""
+        for symbol, quote in self.snapshot.quotes.items():
+            self.cache[symbol] = self._new_cache_entry(quote, quote)
+            self.last_known_values[symbol] = quote
+        self.data_source = "snapshot"
+        self._ready.set()
+        logger.info(
+            f"Replaying market data snapshot {self.snapshot_path} "
+            f"({len(self.snapshot.quotes)} quotes, {len(self.snapshot.historical)} series, "
+            f"version {self.snapshot.version})"
+        )
+    
+    def _load_persisted_quotes(self):
+        """Seed the cache with quotes saved by a previous run, keeping their original age."""
+        if not self.quotes_path or not self.quotes_path.exists():
+            return
+        try:
+            with open(self.quotes_path) as f:
+                saved = json.load(f)
+            now = time.time()
+            for symbol, quote in saved.get('quotes', {}).items():
+                entry = self._new_cache_entry(quote['data'], quote['data'])
+                age = now - quote['timestamp']
+                entry.timestamp -= age
+                entry.stale_at -= age
+                self.cache[symbol] = entry
+                self.last_known_values[symbol] = quote['data']
+            if self.cache:
+                self.data_source = "persisted"
+                self._ready.set()
+                logger.info(f"Loaded {len(self.cache)} persisted quotes from {self.quotes_path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable persisted quotes {self.quotes_path}: {e}")
+    
+    def _persist_quotes(self):
+        """Save live quotes so the next start has last-known values without a network call."""
+        if not self.quotes_path:
+            return
+        quotes = {
+            symbol: {'data': entry.data, 'timestamp': entry.timestamp}
+            for symbol, entry in list(self.cache.items())
+            if entry.is_fresh
+        }
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.quotes_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({'saved_at': time.time(), 'quotes': quotes}, f)
+            os.replace(tmp_path, self.quotes_path)
+        except OSError as e:
+            logger.warning(f"Could not persist quotes: {e}")
     
     def _initialize_cache(self):
+        """Initialize cache with one batch API call, blocking until done."""
+        self._bridge.run(self._initialize_cache_async())
+    
+    async def _initialize_cache_async(self):
         """Initialize cache with startup data loading using minimal API calls."""
         logger.info("Initializing market data cache...")
         
@@ -107,7 +303,7 @@ class FMPMarketDataService:
             ]
             
             # Single batch call for all symbols
-            results = self._load_market_data_batch(all_symbols, "quote")
+            results = await self._load_market_data_batch_async(all_symbols, "quote")
             
             # If no data was loaded, use fallback values
             if not results:
@@ -120,6 +316,8 @@ class FMPMarketDataService:
             logger.error(f"Error initializing market data cache: {e}")
             # Set fallback values
             self._set_fallback_values()
+        finally:
+            self._ready.set()
     
     def _set_fallback_values(self):
         """Set fallback values when API is unavailable."""
@@ -135,17 +333,15 @@ class FMPMarketDataService:
         }
         
         for symbol, data in fallback_data.items():
+            if symbol in self.cache:
+                continue  # Keep persisted or live quotes over static fallbacks
             self.last_known_values[symbol] = data
-            self.cache[symbol] = MarketDataCache(
-                data=data,
-                timestamp=time.time(),
-                last_known_values=data,
-                is_fresh=False
-            )
+            self.cache[symbol] = self._new_cache_entry(data, data, is_fresh=False)
+        if self.data_source == "none":
+            self.data_source = "fallback"
     
-    def _check_rate_limits(self) -> bool:
-        """Check if we can make an API call based on rate limits."""
-        current_time = time.time()
+    def _within_daily_limit(self) -> bool:
+        """Check the daily API call budget, resetting it on a new day."""
         current_date = datetime.now().date()
         
         # Reset daily counter if it's a new day
@@ -153,31 +349,35 @@ class FMPMarketDataService:
             self.daily_call_count = 0
             self.last_reset_date = current_date
         
-        # Check daily limit
         if self.daily_call_count >= self.daily_call_limit:
             logger.warning("Daily API call limit reached, using cached data")
             return False
-        
-        # Check minimum interval between calls
-        if current_time - self.last_api_call < self.min_call_interval:
-            time.sleep(self.min_call_interval - (current_time - self.last_api_call))
-        
         return True
     
-    def _make_api_call(self, url: str) -> Optional[Dict]:
-        """Make an API call with rate limiting."""
-        if not self._check_rate_limits():
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client, created on first use on the service loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+            )
+        return self._client
+    
+    async def _make_api_call_async(self, url: str) -> Optional[Any]:
+        """Make an API call with rate limiting. Runs on the service loop."""
+        if not self._within_daily_limit():
             return None
         
+        await self.rate_limiter.acquire()
         try:
             self.last_api_call = time.time()
             self.daily_call_count += 1
             
-            response = requests.get(url, timeout=10)
+            response = await self._get_client().get(url)
             response.raise_for_status()
             return response.json()
             
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:
                 logger.warning("Rate limit exceeded, using cached data")
                 # Don't set daily_call_count to limit - let it reset naturally
@@ -188,13 +388,39 @@ class FMPMarketDataService:
         
         return None
     
-    def _load_market_data_batch(self, symbols: List[str], endpoint: str = "quote") -> Dict[str, Any]:
-        """Load market data for multiple symbols in a single API call with rate limiting."""
+    def _make_api_call(self, url: str) -> Optional[Any]:
+        """Blocking facade for _make_api_call_async."""
+        return self._bridge.run(self._make_api_call_async(url))
+    
+    async def _request_quotes(self, symbols: List[str], endpoint: str = "quote") -> Optional[List[Dict[str, Any]]]:
+        """Quote payloads from the snapshot (replay) or the API (live/record). Runs on the service loop."""
+        if self.snapshot is not None:
+            return self.snapshot.quotes_for(symbols)
+        
+        url = f"{self.base_url}/{endpoint}/{','.join(symbols)}?apikey={self.api_key}"
+        data = await self._make_api_call_async(url)
+        if data and self.recorder is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.recorder.record_quotes, data)
+        return data
+    
+    async def _request_historical(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Historical payload from the snapshot (replay) or the API (live/record). Runs on the service loop."""
+        if self.snapshot is not None:
+            return self.snapshot.historical_for(symbol)
+        
+        start = (datetime.now() - timedelta(days=int(HISTORY_YEARS * 365.25) + 7)).strftime('%Y-%m-%d')
+        url = f"{self.base_url}/historical-price-full/{symbol}?serietype=line&from={start}&apikey={self.api_key}"
+        data = await self._make_api_call_async(url)
+        if data and data.get('historical') and self.recorder is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.recorder.record_historical, symbol, data['historical']
+            )
+        return data
+    
+    async def _load_market_data_batch_async(self, symbols: List[str], endpoint: str = "quote") -> Dict[str, Any]:
+        """Load market data for multiple symbols in a single API call. Runs on the service loop."""
         try:
-            symbols_str = ','.join(symbols)
-            url = f"{self.base_url}/{endpoint}/{symbols_str}?apikey={self.api_key}"
-            
-            data = self._make_api_call(url)
+            data = await self._request_quotes(symbols, endpoint)
             if not data:
                 logger.warning(f"Using cached data for {len(symbols)} symbols")
                 return {}
@@ -204,20 +430,23 @@ class FMPMarketDataService:
                 symbol = item.get('symbol', '')
                 if symbol:
                     results[symbol] = item
-                    self.cache[symbol] = MarketDataCache(
-                        data=item,
-                        timestamp=time.time(),
-                        last_known_values=item,
-                        is_fresh=True
-                    )
+                    self.cache[symbol] = self._new_cache_entry(item, item)
                     self.last_known_values[symbol] = item
             
+            if results:
+                self.data_source = "snapshot" if self.snapshot is not None else "live"
+                self.last_refresh = time.time()
+                await asyncio.get_running_loop().run_in_executor(None, self._persist_quotes)
             return results
                     
         except Exception as e:
             logger.error(f"Error loading {endpoint} data: {e}")
             return {}
     
+    def _load_market_data_batch(self, symbols: List[str], endpoint: str = "quote") -> Dict[str, Any]:
+        """Blocking facade for _load_market_data_batch_async."""
+        return self._bridge.run(self._load_market_data_batch_async(symbols, endpoint))
+    
     def _load_market_indexes(self):
         """Load major market indexes using batch API call."""
         index_symbols = ['^GSPC', '^DJI', '^IXIC']
@@ -234,46 +463,134 @@ class FMPMarketDataService:
         self._load_market_data_batch(stock_symbols, "quote")
     
     def get_stock_price(self, symbol: str) -> Optional[float]:
-        """Get current stock price with caching and fallback."""
-        with self.lock:
-            # Check cache first
-            if symbol in self.cache:
-                cached_data = self.cache[symbol]
-                if time.time() - cached_data.timestamp < self.cache_duration:
-                    return cached_data.data.get('price', 0)
-            
-            # Try to fetch fresh data
+        """Get current stock price with caching and fallback (blocking; for scenario code)."""
+        price = self._cached_price(symbol)
+        if price is not None:
+            return price
+        
+        # First use before start(): initialize lazily, then retry the cache.
+        # A slow initial refresh only delays this lookup briefly; the single fetch
+        # or the fallback price below still answer.
+        if not self.is_ready():
+            self.wait_until_ready(timeout=READY_WAIT_SECONDS)
+            price = self._cached_price(symbol)
+            if price is not None:
+                return price
+        
+        try:
+            price = self._bridge.run(self._fetch_price_once(symbol))
+        except Exception as e:
+            logger.error(f"Error fetching price for {symbol}: {e}")
+            price = None
+        return price if price else self._fallback_price(symbol)
+    
+    async def get_stock_price_async(self, symbol: str) -> Optional[float]:
+        """Get current stock price with caching and fallback without blocking the caller's loop."""
+        price = self._cached_price(symbol)
+        if price is not None:
+            return price
+        
+        # First use before start(): initialize lazily, then retry the cache
+        if not self.is_ready():
+            self.start()
             try:
-                price = self._fetch_stock_price(symbol)
-                if price:
-                    # Update cache
-                    self.cache[symbol] = MarketDataCache(
-                        data={'price': price},
-                        timestamp=time.time(),
-                        last_known_values=self.last_known_values.get(symbol, {}),
-                        is_fresh=True
-                    )
-                    return price
-            except Exception as e:
-                logger.error(f"Error fetching price for {symbol}: {e}")
-            
-            # Fallback to last known value
-            if symbol in self.last_known_values:
-                last_price = self.last_known_values[symbol].get('price', 0)
-                logger.warning(f"Using last known price for {symbol}: {last_price}")
-                return last_price
-            
-            # Final fallback
-            logger.error(f"No price data available for {symbol}")
-            raise ValueError(f"Real market data not available for {symbol}")
-    
-    def _fetch_stock_price(self, symbol: str) -> Optional[float]:
-        """Fetch stock price from FMP API with rate limiting."""
-        url = f"{self.base_url}/quote/{symbol}?apikey={self.api_key}"
-        data = self._make_api_call(url)
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(self._initial_refresh)), READY_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Initial market data refresh still running; fetching {symbol} directly")
+            price = self._cached_price(symbol)
+            if price is not None:
+                return price
+        
+        try:
+            price = await self._bridge.run_async(self._fetch_price_once(symbol))
+        except Exception as e:
+            logger.error(f"Error fetching price for {symbol}: {e}")
+            price = None
+        return price if price else self._fallback_price(symbol)
+    
+    def _cached_price(self, symbol: str) -> Optional[float]:
+        """
+        Lock-free cache read. Stale quotes are returned while a background refresh runs.
+        
+        Returns:
+            Cached price, or None if the quote is missing or past its hard TTL
+        """
+        cached_data = self.cache.get(symbol)
+        if cached_data is None:
+            return None
+        if self._is_fresh(cached_data):
+            return cached_data.data.get('price', 0)
+        if time.time() - cached_data.timestamp < self.stale_duration:
+            self._schedule_refresh(symbol)
+            return cached_data.data.get('price', 0)
+        return None
+    
+    def _fallback_price(self, symbol: str) -> float:
+        """Last known price when a fetch fails."""
+        if symbol in self.last_known_values:
+            last_price = self.last_known_values[symbol].get('price', 0)
+            logger.warning(f"Using last known price for {symbol}: {last_price}")
+            return last_price
+        
+        # Final fallback
+        logger.error(f"No price data available for {symbol}")
+        raise ValueError(f"Real market data not available for {symbol}")
+    
+    async def _fetch_price_once(self, symbol: str) -> Optional[float]:
+        """Fetch and cache a quote; concurrent requests for a symbol share one call. Runs on the service loop."""
+        task = self._pending.get(symbol)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_stock_price_async(symbol))
+            self._pending[symbol] = task
+            task.add_done_callback(lambda _: self._pending.pop(symbol, None))
+        return await asyncio.shield(task)
+    
+    def _new_cache_entry(
+        self,
+        data: Dict[str, Any],
+        last_known_values: Dict[str, Any],
+        is_fresh: bool = True
+    ) -> MarketDataCache:
+        """Create a cache entry with a jittered soft expiry."""
+        now = time.time()
+        ttl = self.cache_duration * random.uniform(1 - self.cache_jitter, 1)
+        return MarketDataCache(
+            data=data,
+            timestamp=now,
+            last_known_values=last_known_values,
+            is_fresh=is_fresh,
+            stale_at=now + ttl
+        )
+    
+    def _is_fresh(self, entry: MarketDataCache) -> bool:
+        """Whether a cache entry is within its soft TTL."""
+        stale_at = entry.stale_at if entry.stale_at is not None else entry.timestamp + self.cache_duration
+        return time.time() < stale_at
+    
+    def _schedule_refresh(self, symbol: str) -> None:
+        """Refresh a stale quote in the background, at most once per symbol at a time."""
+        if symbol in self._pending:
+            return
+        self._bridge.submit(self._refresh_quote(symbol))
+    
+    async def _refresh_quote(self, symbol: str) -> None:
+        """Background refresh of one quote; on failure the stale quote stays cached."""
+        try:
+            await self._fetch_price_once(symbol)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {symbol}: {e}")
+    
+    async def _fetch_stock_price_async(self, symbol: str) -> Optional[float]:
+        """Fetch a stock price from the FMP API and cache it."""
+        data = await self._request_quotes([symbol], "quote")
         
         if data and len(data) > 0:
-            return data[0].get('price', 0)
+            price = data[0].get('price', 0)
+            if price:
+                self.cache[symbol] = self._new_cache_entry(
+                    {'price': price}, self.last_known_values.get(symbol, {})
+                )
+                return price
         return None
     
     # Mock price function removed - no mocks allowed
@@ -294,6 +611,9 @@ class FMPMarketDataService:
         indexes = ["^GSPC", "^DJI", "^IXIC"]
         market_data = {}
         
+        # One batch call for every index that is missing or stale
+        self.prefetch_quotes(indexes)
+        
         for index in indexes:
             price = self.get_stock_price(index)
             if price:
@@ -308,34 +628,148 @@ class FMPMarketDataService:
         
         return market_data
     
+    async def get_market_indexes_async(self) -> Dict[str, Dict[str, float]]:
+        """Get major market indexes without blocking the caller's loop."""
+        indexes = ["^GSPC", "^DJI", "^IXIC"]
+        await self.prefetch_quotes_async(indexes)
+        prices = await asyncio.gather(
+            *[self.get_stock_price_async(index) for index in indexes], return_exceptions=True
+        )
+        names = {'^GSPC': 'S&P 500', '^DJI': 'Dow Jones', '^IXIC': 'NASDAQ'}
+        return {
+            index: {'price': price, 'name': names.get(index, index)}
+            for index, price in zip(indexes, prices)
+            if price and not isinstance(price, Exception)
+        }
+    
+    def _stale_symbols(self, symbols: List[str]) -> List[str]:
+        """Symbols whose quotes are missing or past their soft TTL."""
+        return [
+            symbol for symbol in symbols
+            if symbol not in self.cache or not self._is_fresh(self.cache[symbol])
+        ]
+    
+    def prefetch_quotes(self, symbols: List[str]) -> Dict[str, Any]:
+        """Warm the quote cache for symbols that are missing or stale using one batch call."""
+        stale = self._stale_symbols(symbols)
+        if not stale:
+            return {}
+        return self._load_market_data_batch(stale, "quote")
+    
+    async def prefetch_quotes_async(self, symbols: List[str]) -> Dict[str, Any]:
+        """Async variant of prefetch_quotes."""
+        stale = self._stale_symbols(symbols)
+        if not stale:
+            return {}
+        return await self._bridge.run_async(self._load_market_data_batch_async(stale, "quote"))
+    
+    # Fallback returns based on asset type
+    FALLBACK_RETURNS = {
+        '^GSPC': 0.10,  # 10% annual return for S&P 500
+        'BND': 0.04,    # 4% annual return for bonds
+        'VTI': 0.09,    # 9% annual return for total market
+        'default': 0.07  # 7% default return
+    }
+    
     def get_historical_return(self, symbol: str, years: int = 5) -> float:
-        """Get historical return for simulation scenarios with rate limiting."""
-        try:
-            url = f"{self.base_url}/historical-price-full/{symbol}?apikey={self.api_key}"
-            data = self._make_api_call(url)
-            
-            if data and 'historical' in data and len(data['historical']) > 0:
-                # Calculate annualized return
-                current_price = data['historical'][0]['close']
-                past_price = data['historical'][-1]['close']
-                
-                if past_price > 0:
-                    total_return = (current_price - past_price) / past_price
-                    annualized_return = (1 + total_return) ** (1 / years) - 1
-                    return annualized_return
-                    
-        except Exception as e:
-            logger.error(f"Error calculating historical return for {symbol}: {e}")
+        """Get annualized historical return for simulation scenarios."""
+        return self.get_historical_returns([symbol], years)[symbol]
+    
+    def get_historical_returns(self, symbols: List[str], years: int = 5) -> Dict[str, float]:
+        """
+        Get annualized historical returns for several symbols.
         
-        # Fallback returns based on asset type
-        fallback_returns = {
-            '^GSPC': 0.10,  # 10% annual return for S&P 500
-            'BND': 0.04,    # 4% annual return for bonds
-            'VTI': 0.09,    # 9% annual return for total market
-            'default': 0.07  # 7% default return
+        Series that are missing or not yet fetched today are loaded concurrently;
+        everything else is served from the local series cache.
+        """
+        return {
+            symbol: stats.annualized_return if stats else self.FALLBACK_RETURNS.get(symbol, self.FALLBACK_RETURNS['default'])
+            for symbol, stats in self.get_historical_stats(symbols, years).items()
         }
+    
+    def get_historical_volatility(self, symbol: str, years: int = 5) -> Optional[float]:
+        """Get annualized volatility of daily returns, or None if no history is available."""
+        stats = self.get_historical_stats([symbol], years)[symbol]
+        return stats.annualized_volatility if stats else None
+    
+    def get_historical_stats(self, symbols: List[str], years: int = 5) -> Dict[str, Optional[WindowStats]]:
+        """
+        Get precomputed return/volatility stats for a lookback window.
         
-        return fallback_returns.get(symbol, fallback_returns['default'])
+        Returns:
+            Mapping of symbol to stats, or None where no history is available
+        """
+        self.prefetch_historical_series(symbols)
+        return self._window_stats(symbols, years)
+    
+    async def get_historical_stats_async(self, symbols: List[str], years: int = 5) -> Dict[str, Optional[WindowStats]]:
+        """Async variant of get_historical_stats."""
+        await self.prefetch_historical_series_async(symbols)
+        return self._window_stats(symbols, years)
+    
+    def prefetch_historical_series(self, symbols: List[str]) -> None:
+        """Fetch every series that is missing or outdated, concurrently."""
+        if self._series_to_fetch(symbols):
+            self._bridge.run(self._load_historical_series_async(symbols))
+    
+    async def prefetch_historical_series_async(self, symbols: List[str]) -> None:
+        """Async variant of prefetch_historical_series."""
+        if self._series_to_fetch(symbols):
+            await self._bridge.run_async(self._load_historical_series_async(symbols))
+    
+    def _series_to_fetch(self, symbols: List[str]) -> List[str]:
+        """Outdated series, skipping symbols whose last fetch failed recently."""
+        now = time.time()
+        return [
+            symbol for symbol in self.historical_series.missing_or_outdated(symbols)
+            if self._history_retry_at.get(symbol, 0) <= now
+        ]
+    
+    def _window_stats(self, symbols: List[str], years: int) -> Dict[str, Optional[WindowStats]]:
+        """Read window stats from the series cache."""
+        result = {}
+        for symbol in symbols:
+            series = self.historical_series.get(symbol)
+            result[symbol] = series.window(years) if series else None
+        return result
+    
+    async def _load_historical_series_async(self, symbols: List[str]) -> None:
+        """Fetch outdated series concurrently, sharing in-flight fetches per symbol. Runs on the service loop."""
+        tasks = []
+        for symbol in self._series_to_fetch(symbols):
+            task = self._pending_history.get(symbol)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch_historical_series_async(symbol))
+                self._pending_history[symbol] = task
+                task.add_done_callback(lambda _, symbol=symbol: self._pending_history.pop(symbol, None))
+            tasks.append(task)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _fetch_historical_series_async(self, symbol: str) -> Optional[PriceSeries]:
+        """Fetch a symbol's daily closes and cache them. On failure any older cached series is kept."""
+        try:
+            data = await self._request_historical(symbol)
+            if data and data.get('historical'):
+                series = PriceSeries.from_fmp(symbol, data['historical'])
+                if series is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, self.historical_series.put, series)
+                    self._history_retry_at.pop(symbol, None)
+                    return series
+        except Exception as e:
+            logger.error(f"Error loading historical series for {symbol}: {e}")
+        self._history_retry_at[symbol] = time.time() + self.history_retry_interval
+        return None
+    
+    def close(self):
+        """Close the pooled HTTP client and stop the service loop."""
+        if self._client is not None:
+            try:
+                self._bridge.run(self._client.aclose(), timeout=5)
+            except Exception as e:
+                logger.warning(f"Error closing market data client: {e}")
+            self._client = None
+        self._bridge.stop()
     
     def refresh_cache(self):
         """Manually refresh the cache."""
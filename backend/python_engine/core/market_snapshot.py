@@ -0,0 +1,142 @@
+"""
+Market data snapshots.
+A versioned local file of quotes and daily historical series that the market
+data service can replay instead of calling the API, or record live responses into.
+"""
+
+import os
+import gzip
+import json
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Market data modes selectable with MARKET_DATA_MODE
+MODE_LIVE = "live"        # Call the API (default)
+MODE_REPLAY = "replay"    # Serve only from the snapshot; never touch the network
+MODE_RECORD = "record"    # Call the API and record every response into the snapshot
+MARKET_DATA_MODES = (MODE_LIVE, MODE_REPLAY, MODE_RECORD)
+
+
+@dataclass
+class MarketDataSnapshot:
+    """Quotes and historical series captured at a point in time."""
+    quotes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    historical: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    updated_at: Optional[str] = None
+    source: str = "fmp"
+    format_version: int = SNAPSHOT_FORMAT_VERSION
+
+    @property
+    def version(self) -> str:
+        """Identifier of this snapshot's contents, for logs and readiness reporting."""
+        return self.updated_at or self.created_at
+
+    def quotes_for(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """Quote payloads for the requested symbols that the snapshot holds."""
+        return [self.quotes[symbol] for symbol in symbols if symbol in self.quotes]
+
+    def historical_for(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """FMP-shaped historical payload for a symbol, or None."""
+        rows = self.historical.get(symbol)
+        return {"symbol": symbol, "historical": rows} if rows else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format_version": self.format_version,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "source": self.source,
+            "quotes": self.quotes,
+            "historical": self.historical
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MarketDataSnapshot":
+        """
+        Raises:
+            ValueError: If the snapshot was written in an unsupported format version
+        """
+        format_version = data.get("format_version")
+        if format_version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported market data snapshot format {format_version} "
+                f"(expected {SNAPSHOT_FORMAT_VERSION})"
+            )
+        return cls(
+            quotes=data.get("quotes", {}),
+            historical=data.get("historical", {}),
+            created_at=data["created_at"],
+            updated_at=data.get("updated_at"),
+            source=data.get("source", "fmp"),
+            format_version=format_version
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "MarketDataSnapshot":
+        """Load a snapshot from .json or .json.gz."""
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path: str) -> None:
+        """Write the snapshot atomically (.json.gz paths are compressed)."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw:
+                payload = json.dumps(self.to_dict()).encode("utf-8")
+                raw.write(gzip.compress(payload) if target.name.endswith(".gz") else payload)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class SnapshotRecorder:
+    """Accumulates live responses into a snapshot file."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Snapshot file to extend; created if it does not exist
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.snapshot = MarketDataSnapshot.load(path)
+        else:
+            self.snapshot = MarketDataSnapshot()
+
+    def record_quotes(self, quotes: List[Dict[str, Any]]) -> None:
+        """Record quote payloads, keyed by their symbol."""
+        with self._lock:
+            for quote in quotes:
+                symbol = quote.get("symbol")
+                if symbol:
+                    self.snapshot.quotes[symbol] = quote
+            self._save()
+
+    def record_historical(self, symbol: str, rows: List[Dict[str, Any]]) -> None:
+        """Record a symbol's historical rows."""
+        with self._lock:
+            self.snapshot.historical[symbol] = rows
+            self._save()
+
+    def _save(self) -> None:
+        self.snapshot.updated_at = datetime.now(timezone.utc).isoformat()
+        try:
+            self.snapshot.save(self.path)
+        except OSError as e:
+            logger.warning(f"Could not write market data snapshot {self.path}: {e}")
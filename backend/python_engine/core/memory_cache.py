@@ -0,0 +1,286 @@
+"""
+Bounded in-process cache tier.
+LRU eviction against a byte budget, monotonic-clock TTL expiry with a
+background sweeper, and namespace-indexed pattern deletes.
+"""
+
+import sys
+import time
+import heapq
+import pickle
+import fnmatch
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_SWEEP_INTERVAL = 60.0
+
+_GLOB_CHARS = set('*?[')
+
+
+class _Entry:
+    """Cached value with its expiry deadline and accounted size."""
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+def estimate_size(key: str, value: Any) -> int:
+    """Estimate the memory footprint of a cache entry in bytes."""
+    try:
+        value_size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        value_size = sys.getsizeof(value)
+    return len(key) + value_size
+
+
+def _namespace(key_or_pattern: str) -> Optional[str]:
+    """Leading 'namespace:' segment of a key, used to index pattern deletes."""
+    head, sep, _ = key_or_pattern.partition(':')
+    return head if sep else None
+
+
+class MemoryCacheTier:
+    """Thread-safe LRU/TTL cache bounded by an approximate byte budget."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: int = 3600,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL
+    ):
+        """
+        Initialize the cache tier.
+
+        Args:
+            max_bytes: Byte budget; least recently used entries are evicted beyond it
+            default_ttl: TTL in seconds for entries set without one
+            sweep_interval: Seconds between background expiry sweeps (0 disables)
+        """
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._namespaces: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.expires_at > time.monotonic()
+
+    @property
+    def size_bytes(self) -> int:
+        """Total accounted size of cached entries."""
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value, refreshing its LRU position.
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Cache a value, evicting least recently used entries to stay within budget.
+
+        Returns:
+            False if the value alone exceeds the byte budget
+        """
+        size = estimate_size(key, value)
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {key}: {size} bytes exceeds budget of {self.max_bytes}")
+            with self._lock:
+                self._remove(key)
+            return False
+
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+
+        with self._lock:
+            self._remove(key)
+            self._evict_to(self.max_bytes - size)
+
+            self._entries[key] = _Entry(value, expires_at, size)
+            self._bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            namespace = _namespace(key)
+            if namespace is not None:
+                self._namespaces.setdefault(namespace, set()).add(key)
+
+        self._ensure_sweeper()
+        return True
+
+    def set_max_bytes(self, max_bytes: int) -> int:
+        """
+        Change the byte budget, evicting least recently used entries beyond it now.
+
+        Returns:
+            Number of entries evicted
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            return self._evict_to(max_bytes)
+
+    def delete(self, key: str) -> bool:
+        """Delete a cached value. Returns True if it existed."""
+        with self._lock:
+            return self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._namespaces.clear()
+            self._bytes = 0
+
+    def clear_pattern(self, pattern: str) -> int:
+        """
+        Delete entries matching a pattern.
+
+        Glob patterns ('user_profile:*') follow Redis KEYS semantics and are
+        resolved through the namespace index when they start with a literal
+        'namespace:' segment. Patterns without wildcards match as substrings.
+
+        Returns:
+            Number of entries deleted
+        """
+        is_glob = any(c in _GLOB_CHARS for c in pattern)
+
+        with self._lock:
+            namespace = _namespace(pattern) if is_glob else None
+            if namespace is not None and not any(c in _GLOB_CHARS for c in namespace):
+                candidates = list(self._namespaces.get(namespace, ()))
+            else:
+                candidates = list(self._entries.keys())
+
+            if is_glob:
+                matches = [key for key in candidates if fnmatch.fnmatchcase(key, pattern)]
+            else:
+                matches = [key for key in candidates if pattern in key]
+
+            for key in matches:
+                self._remove(key)
+            return len(matches)
+
+    def sweep_expired(self) -> int:
+        """
+        Remove expired entries using the expiry heap.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        now = time.monotonic()
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, key = heapq.heappop(self._expiry_heap)
+                entry = self._entries.get(key)
+                # Skip heap records superseded by a later set()
+                if entry is not None and entry.expires_at == expires_at:
+                    self._remove(key)
+                    removed += 1
+            self._stats["expirations"] += removed
+
+            # Keep the heap from growing unboundedly with superseded records
+            if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+                self._expiry_heap = [(e.expires_at, k) for k, e in self._entries.items()]
+                heapq.heapify(self._expiry_heap)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache tier statistics."""
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "size_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "utilization": self._bytes / self.max_bytes if self.max_bytes else 0
+            }
+
+    def _evict_to(self, budget: int) -> int:
+        """Evict least recently used entries until at most budget bytes remain. Caller holds the lock."""
+        evicted = 0
+        while self._entries and self._bytes > budget:
+            self._remove(next(iter(self._entries)))
+            evicted += 1
+        self._stats["evictions"] += evicted
+        return evicted
+
+    def _remove(self, key: str) -> bool:
+        """Remove an entry and its accounting. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.size
+        namespace = _namespace(key)
+        if namespace is not None:
+            keys = self._namespaces.get(namespace)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._namespaces[namespace]
+        return True
+
+    def _ensure_sweeper(self) -> None:
+        """Start the background sweeper thread on first use."""
+        if self.sweep_interval <= 0 or (self._sweeper and self._sweeper.is_alive()):
+            return
+        with self._lock:
+            if self._sweeper and self._sweeper.is_alive():
+                return
+            self._stop_event.clear()
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, name="memory-cache-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper thread."""
+        self._stop_event.set()
+        if self._sweeper:
+            self._sweeper.join(timeout=1)
+            self._sweeper = None
+
+    def _sweep_loop(self) -> None:
+        """Background expiry sweep loop."""
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                removed = self.sweep_expired()
+                if removed:
+                    logger.debug(f"Swept {removed} expired cache entries")
+            except Exception as e:
+                logger.error(f"Memory cache sweep failed: {e}")
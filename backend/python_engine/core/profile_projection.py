@@ -0,0 +1,207 @@
+"""
+Lightweight profile projection for simulation inputs.
+Holds only the scalar fields and account summaries scenarios read, with the
+transaction list loaded lazily on first access.
+"""
+
+import copy
+from collections.abc import Mapping
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator
+
+from .models import ProfileData, AccountType
+
+# Fields exposed by the projection, in the order they are serialized
+PROJECTION_FIELDS = (
+    'customer_id',
+    'name',
+    'age',
+    'demographic',
+    'monthly_income',
+    'monthly_expenses',
+    'emergency_fund',
+    'student_loan_balance',
+    'risk_tolerance',
+    'credit_score',
+    'location',
+    'accounts',
+    'total_debt',
+    'income',
+)
+
+# Fields always echoed back alongside a scenario's declared requirements
+IDENTITY_FIELDS = ('customer_id', 'name', 'demographic')
+
+RISK_TOLERANCE_BY_DEMOGRAPHIC = {
+    "genz": "aggressive",
+    "millennial": "moderate",
+    "midcareer": "moderate",
+    "senior": "conservative",
+    "retired": "conservative"
+}
+
+
+class ProfileProjection(Mapping):
+    """Read-only, slotted view of a profile exposing the dict interface scenarios use."""
+
+    __slots__ = PROJECTION_FIELDS + ('_transaction_loader', '_transactions')
+
+    def __init__(
+        self,
+        transaction_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        **fields: Any
+    ):
+        """
+        Initialize the projection.
+
+        Args:
+            transaction_loader: Callable returning the transaction dicts on demand
+            **fields: Values for every name in PROJECTION_FIELDS
+        """
+        for field in PROJECTION_FIELDS:
+            object.__setattr__(self, field, fields[field])
+        object.__setattr__(self, '_transaction_loader', transaction_loader)
+        object.__setattr__(self, '_transactions', None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ProfileProjection is read-only")
+
+    def __copy__(self) -> 'ProfileProjection':
+        clone = ProfileProjection(self._transaction_loader, **self.to_dict())
+        object.__setattr__(clone, '_transactions', self._transactions)
+        return clone
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> 'ProfileProjection':
+        clone = ProfileProjection(self._transaction_loader, **copy.deepcopy(self.to_dict(), memo))
+        object.__setattr__(clone, '_transactions', copy.deepcopy(self._transactions, memo))
+        return clone
+
+    def __reduce__(self):
+        # Loaders are usually closures and can't be pickled; ship the transactions themselves
+        return (_restore_projection, (self.to_dict(), self.transactions))
+
+    @classmethod
+    def from_profile(
+        cls,
+        profile: ProfileData,
+        transaction_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None
+    ) -> 'ProfileProjection':
+        """
+        Build a projection from a loaded ProfileData model.
+
+        Args:
+            profile: Loaded profile
+            transaction_loader: Optional transaction source. Defaults to converting
+                the profile's own transactions on first access.
+
+        Returns:
+            ProfileProjection for the profile
+        """
+        emergency_fund = sum(
+            account.balance for account in profile.accounts
+            if account.account_type in [AccountType.SAVINGS, "savings"] and account.balance > 0
+        )
+        student_loan_balance = sum(
+            abs(account.balance) for account in profile.accounts
+            if account.account_type in [AccountType.STUDENT_LOAN, "student_loan"] and account.balance < 0
+        )
+
+        # Handle demographic as string or enum
+        demographic = profile.demographic.value if hasattr(profile.demographic, 'value') else str(profile.demographic)
+
+        if transaction_loader is None:
+            transaction_loader = lambda: [
+                {
+                    "amount": transaction.amount,
+                    "category": transaction.category or "uncategorized",
+                    "date": transaction.timestamp.isoformat(),
+                    "description": transaction.description
+                }
+                for transaction in profile.transactions
+            ]
+
+        return cls(
+            transaction_loader=transaction_loader,
+            customer_id=profile.customer_id,
+            name=f"Profile {profile.customer_id}",
+            age=profile.age,
+            demographic=demographic,
+            monthly_income=profile.monthly_income,
+            monthly_expenses=profile.monthly_expenses,
+            emergency_fund=emergency_fund,
+            student_loan_balance=student_loan_balance,
+            risk_tolerance=RISK_TOLERANCE_BY_DEMOGRAPHIC.get(demographic, "moderate"),
+            credit_score=profile.credit_score,
+            location=profile.location,
+            accounts=[
+                {
+                    "type": str(account.account_type),
+                    "balance": account.balance,
+                    "institution": account.institution_name
+                }
+                for account in profile.accounts
+            ],
+            total_debt=abs(sum(
+                account.balance for account in profile.accounts
+                if account.balance < 0
+            )),
+            income=profile.monthly_income
+        )
+
+    @property
+    def transactions(self) -> List[Dict[str, Any]]:
+        """Transactions, loaded on first access."""
+        if self._transactions is None:
+            loaded = self._transaction_loader() if self._transaction_loader else []
+            object.__setattr__(self, '_transactions', loaded)
+        return self._transactions
+
+    def __getitem__(self, key: str) -> Any:
+        if key in PROJECTION_FIELDS:
+            return getattr(self, key)
+        if key == 'transactions':
+            return self.transactions
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        # Transactions are deliberately excluded so dict()/str() stay compact
+        return iter(PROJECTION_FIELDS)
+
+    def __len__(self) -> int:
+        return len(PROJECTION_FIELDS)
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Convert the projection to a plain dictionary.
+
+        Args:
+            fields: Fields to include. If None, includes every projection field
+                (transactions are only included when named explicitly).
+
+        Returns:
+            Dictionary of the selected fields
+        """
+        if fields is None:
+            fields = PROJECTION_FIELDS
+        return {field: self[field] for field in fields if field in self}
+
+
+def _restore_projection(fields: Dict[str, Any], transactions: List[Dict[str, Any]]) -> ProfileProjection:
+    """Rebuild a pickled projection with its transactions already loaded"""
+    projection = ProfileProjection(**fields)
+    object.__setattr__(projection, '_transactions', transactions)
+    return projection
+
+
+def scenario_profile_fields(scenario: Any) -> tuple:
+    """
+    Get the profile fields a scenario declares it reads, plus identity fields.
+
+    Scenarios without a declaration get every projection field.
+    """
+    declared = getattr(scenario, 'profile_fields', None)
+    if declared is None:
+        return PROJECTION_FIELDS
+    return IDENTITY_FIELDS + tuple(f for f in declared if f not in IDENTITY_FIELDS)
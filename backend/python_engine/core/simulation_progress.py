@@ -0,0 +1,150 @@
+"""
+Progressive Monte Carlo results.
+Scenarios record each simulated path's outcome on a SimulationProgress. When a
+listener is installed (report_progress), every chunk of paths produces a
+snapshot of the outcome percentiles and success probability so far, so a
+client can draw a converging estimate long before the run finishes.
+Without a listener, recording is a no-op.
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROGRESS_CHUNKS = 20
+
+PROGRESS_PERCENTILES = (10, 25, 50, 75, 90)
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+# (callback, number of chunks) for simulations started in this context
+_listener: ContextVar[Optional[Tuple[ProgressCallback, int]]] = ContextVar("simulation_progress_listener", default=None)
+
+
+class SimulationCancelled(Exception):
+    """Raised inside a simulation whose listener no longer wants results."""
+
+
+@contextmanager
+def report_progress(callback: ProgressCallback, chunks: int = DEFAULT_PROGRESS_CHUNKS) -> Iterator[None]:
+    """
+    Send snapshots from simulations run inside the block to callback.
+
+    The callback runs on the simulating thread after each chunk; raising
+    SimulationCancelled from it stops the simulation.
+    """
+    token = _listener.set((callback, max(1, chunks)))
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+class SimulationProgress:
+    """Accumulates per-path outcomes and reports a snapshot every chunk."""
+
+    def __init__(self, total: int, metric: str):
+        """
+        Args:
+            total: Number of paths the simulation will record
+            metric: Name of the recorded outcome, e.g. 'total_cost'
+        """
+        listener = _listener.get()
+        self.callback = listener[0] if listener else None
+        self.total = max(1, int(total))
+        self.metric = metric
+        self.chunk_size = max(1, -(-self.total // listener[1])) if listener else self.total
+        self.completed = 0
+        if self.callback is not None:
+            self.outcomes = np.empty(self.total, dtype=np.float64)
+            self.successes = np.zeros(self.total, dtype=bool)
+            self.has_success = False
+
+    def record(self, outcome: float, success: Optional[bool] = None) -> None:
+        """
+        Record one simulated path.
+
+        Args:
+            outcome: The path's value of the metric
+            success: Whether the path met the scenario's goal, if it has one
+        """
+        if self.callback is None or self.completed >= self.total:
+            return
+        self.outcomes[self.completed] = outcome
+        if success is not None:
+            self.successes[self.completed] = success
+            self.has_success = True
+        self.completed += 1
+        if self.completed % self.chunk_size == 0 or self.completed == self.total:
+            self.callback(self.snapshot())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estimates from the paths recorded so far"""
+        outcomes = self.outcomes[:self.completed]
+        return {
+            'metric': self.metric,
+            'completed': self.completed,
+            'total': self.total,
+            'fraction': self.completed / self.total,
+            'mean': float(outcomes.mean()),
+            'percentiles': {
+                str(p): float(value) for p, value in zip(PROGRESS_PERCENTILES, np.percentile(outcomes, PROGRESS_PERCENTILES))
+            },
+            'success_probability': float(self.successes[:self.completed].mean()) if self.has_success else None
+        }
+
+
+@dataclass
+class SimulationUpdate:
+    """A partial estimate while a simulation runs, or its final result"""
+    progress: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+
+
+async def stream_simulation(
+    scenario: Any,
+    profile_data: Dict[str, Any],
+    config: Dict[str, Any],
+    chunks: int = DEFAULT_PROGRESS_CHUNKS
+) -> AsyncIterator[SimulationUpdate]:
+    """
+    Run scenario.run_simulation on a worker thread, yielding a progress update
+    after every chunk of paths and then the result.
+
+    Closing the iterator early stops the simulation at its next chunk.
+    """
+    loop = asyncio.get_running_loop()
+    updates: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def on_chunk(snapshot: Dict[str, Any]) -> None:
+        if cancelled.is_set():
+            raise SimulationCancelled()
+        loop.call_soon_threadsafe(updates.put_nowait, snapshot)
+
+    def run() -> Dict[str, Any]:
+        try:
+            with report_progress(on_chunk, chunks):
+                return scenario.run_simulation(profile_data, config)
+        finally:
+            loop.call_soon_threadsafe(updates.put_nowait, None)
+
+    simulation = asyncio.ensure_future(asyncio.to_thread(run))
+    try:
+        while (snapshot := await updates.get()) is not None:
+            yield SimulationUpdate(progress=snapshot)
+        yield SimulationUpdate(result=await simulation)
+    finally:
+        if not simulation.done():
+            cancelled.set()
+            # The worker ends with SimulationCancelled; nobody is waiting for it
+            simulation.add_done_callback(lambda future: future.exception())
+            logger.info("Simulation stopped: progress listener closed")
@@ -0,0 +1,83 @@
+"""
+Sync/async bridge.
+Runs coroutines for synchronous callers on one long-lived background event loop,
+so async clients and background tasks outlive individual synchronous calls.
+"""
+
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Awaitable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class SyncBridge:
+    """Background event loop thread that synchronous code can submit coroutines to."""
+
+    def __init__(self, name: str = "sync-bridge"):
+        """
+        Args:
+            name: Name of the background thread
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The bridge's event loop, started on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name=self.name, daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def in_bridge_loop(self) -> bool:
+        """Whether the caller is running on the bridge loop itself."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return running is self._loop
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the bridge loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the bridge loop and block until it completes.
+
+        Raises:
+            RuntimeError: If called from the bridge loop itself, which would deadlock
+        """
+        if self.in_bridge_loop():
+            coro.close()
+            raise RuntimeError(f"Cannot block on {self.name} from its own event loop")
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro: Awaitable[T]) -> T:
+        """Await a coroutine that must execute on the bridge loop, from any loop."""
+        if self.in_bridge_loop():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self) -> None:
+        """Stop the background loop."""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread:
+                self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
@@ -3,7 +3,11 @@ Data loading and processing components.
 """
 
 from .csv_loader import CSVDataLoader
+from .sqlite_repository import SQLiteProfileRepository
+from .transaction_index import TransactionIndex
 
 __all__ = [
-    'CSVDataLoader'
+    'CSVDataLoader',
+    'SQLiteProfileRepository',
+    'TransactionIndex'
 ]
\ No newline at end of file
@@ -5,7 +5,8 @@ Loads and transforms CSV data into ProfileData models.
 
 import os
 import sys
-from typing import List, Dict, Any, Optional
+import logging
+from typing import List, Dict, Any, Optional, Iterable, NamedTuple
 from datetime import datetime
 import pandas as pd
 
@@ -20,6 +21,15 @@ from core.models import (
     Demographic
 )
 
+logger = logging.getLogger(__name__)
+
+
+class TransactionMetricRow(NamedTuple):
+    """The transaction attributes the income and expense metrics read."""
+    amount: float
+    description: str
+    timestamp: datetime
+
 
 class CSVDataLoader:
     """Load and process CSV data for financial profiles."""
@@ -110,9 +120,133 @@ class CSVDataLoader:
         # Load transactions
         transactions = self._load_transactions(customer_id, accounts)
         
+        return self._build_profile(customer_id, customer_data, accounts, transactions)
+    
+    def load_profile_summary(
+        self,
+        customer_id: int,
+        transactions: Optional[Iterable[Any]] = None
+    ) -> ProfileData:
+        """
+        Load a profile's accounts and metrics without materializing its transactions.
+        
+        Args:
+            customer_id: Customer ID to load
+            transactions: Records with amount, description and timestamp attributes
+                (e.g. TransactionIndex records) to compute the income and expense
+                metrics from. If None, reads them from transaction.csv.
+            
+        Returns:
+            ProfileData with an empty transaction list
+            
+        Raises:
+            ValueError: If customer not found
+        """
+        customer_df = pd.read_csv(os.path.join(self.data_dir, 'customer.csv'))
+        customer = customer_df[customer_df['customer_id'] == customer_id]
+        
+        if customer.empty:
+            raise ValueError(f"Customer {customer_id} not found")
+        
+        accounts = self._load_accounts(customer_id)
+        
+        if transactions is None:
+            transactions_df = pd.read_csv(os.path.join(self.data_dir, 'transaction.csv'))
+            account_ids = [int(acc.account_id) for acc in accounts]
+            customer_transactions = transactions_df[transactions_df['account_id'].isin(account_ids)]
+            transactions = [
+                TransactionMetricRow(
+                    amount=float(row.amount),
+                    description=row.description,
+                    timestamp=self._parse_timestamp(row.timestamp)
+                )
+                for row in customer_transactions.itertuples(index=False)
+            ]
+        
+        return self._build_profile(
+            customer_id, customer.iloc[0], accounts, [], metric_records=list(transactions)
+        )
+    
+    def load_profiles(self, customer_ids: Optional[List[int]] = None) -> Dict[int, ProfileData]:
+        """
+        Load several profiles with a single pass over each CSV file.
+        
+        Args:
+            customer_ids: Customer IDs to load. If None, loads every customer.
+            
+        Returns:
+            Mapping of customer ID to ProfileData. Customers that are missing
+            or fail validation are omitted.
+        """
+        customer_df = pd.read_csv(os.path.join(self.data_dir, 'customer.csv'))
+        accounts_df = pd.read_csv(os.path.join(self.data_dir, 'account.csv'))
+        transactions_df = pd.read_csv(os.path.join(self.data_dir, 'transaction.csv'))
+        
+        if customer_ids is None:
+            customer_ids = customer_df['customer_id'].tolist()
+        
+        customers_by_id = customer_df.set_index('customer_id', drop=False)
+        transactions_by_account = {
+            account_id: group for account_id, group in transactions_df.groupby('account_id')
+        }
+        
+        profiles = {}
+        for customer_id in customer_ids:
+            if customer_id not in customers_by_id.index:
+                continue
+            
+            try:
+                accounts = self._load_accounts(
+                    customer_id,
+                    accounts_df[accounts_df['customer_id'] == customer_id]
+                )
+                account_frames = [
+                    transactions_by_account[int(acc.account_id)]
+                    for acc in accounts
+                    if int(acc.account_id) in transactions_by_account
+                ]
+                customer_transactions = (
+                    pd.concat(account_frames) if account_frames else transactions_df.iloc[0:0]
+                )
+                transactions = self._load_transactions(
+                    customer_id, accounts, customer_transactions
+                )
+                profiles[customer_id] = self._build_profile(
+                    customer_id, customers_by_id.loc[customer_id], accounts, transactions
+                )
+            except ValueError as e:
+                logger.warning(f"Skipping profile {customer_id}: {e}")
+        
+        return profiles
+    
+    def _build_profile(
+        self,
+        customer_id: int,
+        customer_data: pd.Series,
+        accounts: List[Account],
+        transactions: List[Transaction],
+        metric_records: Optional[List[Any]] = None
+    ) -> ProfileData:
+        """
+        Build a ProfileData model from loaded accounts and transactions.
+        
+        Args:
+            customer_id: Customer ID
+            customer_data: Customer row from customer.csv
+            accounts: Customer accounts
+            transactions: Customer transactions
+            metric_records: Records to compute the income and expense metrics
+                from instead of transactions
+            
+        Returns:
+            Complete ProfileData model
+        """
+        if metric_records is None:
+            metric_records = transactions
+        
         # Calculate financial metrics
-        monthly_income = self._calculate_monthly_income(transactions)
-        monthly_expenses = self._calculate_monthly_expenses(transactions)
+        monthly_income = self._calculate_monthly_income(metric_records)
+        monthly_expenses = self._calculate_monthly_expenses(metric_records)
         
         # Determine demographic
         demographic = self._determine_demographic(customer_data['age'])
@@ -134,18 +268,24 @@ class CSVDataLoader:
     
     # Mock profile function removed - no mocks allowed
     
-    def _load_accounts(self, customer_id: int) -> List[Account]:
+    def _load_accounts(
+        self,
+        customer_id: int,
+        customer_accounts: Optional[pd.DataFrame] = None
+    ) -> List[Account]:
         """
         Load accounts for a customer.
         
         Args:
             customer_id: Customer ID
+            customer_accounts: Pre-filtered account rows. If None, reads account.csv.
             
         Returns:
             List of Account models
         """
-        accounts_df = pd.read_csv(os.path.join(self.data_dir, 'account.csv'))
-        customer_accounts = accounts_df[accounts_df['customer_id'] == customer_id]
+        if customer_accounts is None:
+            accounts_df = pd.read_csv(os.path.join(self.data_dir, 'account.csv'))
+            customer_accounts = accounts_df[accounts_df['customer_id'] == customer_id]
         
         accounts = []
         for _, row in customer_accounts.iterrows():
@@ -173,7 +313,8 @@ class CSVDataLoader:
     def _load_transactions(
         self, 
         customer_id: int, 
-        accounts: List[Account]
+        accounts: List[Account],
+        customer_transactions: Optional[pd.DataFrame] = None
     ) -> List[Transaction]:
         """
         Load transactions for customer accounts.
@@ -181,19 +322,21 @@ class CSVDataLoader:
         Args:
             customer_id: Customer ID
             accounts: List of customer accounts
+            customer_transactions: Pre-filtered transaction rows. If None, reads transaction.csv.
             
         Returns:
             List of Transaction models
         """
-        transactions_df = pd.read_csv(os.path.join(self.data_dir, 'transaction.csv'))
-        
-        # Get account IDs for this customer
-        account_ids = [int(acc.account_id) for acc in accounts]
-        
-        # Filter transactions
-        customer_transactions = transactions_df[
-            transactions_df['account_id'].isin(account_ids)
-        ]
+        if customer_transactions is None:
+            transactions_df = pd.read_csv(os.path.join(self.data_dir, 'transaction.csv'))
+            
+            # Get account IDs for this customer
+            account_ids = [int(acc.account_id) for acc in accounts]
+            
+            # Filter transactions
+            customer_transactions = transactions_df[
+                transactions_df['account_id'].isin(account_ids)
+            ]
         
         transactions = []
         for _, row in customer_transactions.iterrows():
@@ -0,0 +1,500 @@
+"""
+SQLite-backed profile repository.
+Builds an embedded SQLite database from the CSV files following the
+schema.sql model and serves ProfileData through the CSVDataLoader interface.
+"""
+
+import os
+import csv
+import sqlite3
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Union, Iterable
+from datetime import datetime, date
+
+from .csv_loader import CSVDataLoader
+from core.models import ProfileData, Account, Transaction, AccountType
+
+logger = logging.getLogger(__name__)
+
+
+# Tables and indexes mirror schema.sql. Accounts and transactions carry the
+# few extra columns ProfileData needs (account type, limits, owning account).
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS profiles (
+  id INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  age INTEGER NOT NULL,
+  location TEXT NOT NULL,
+  net_worth REAL NOT NULL,
+  monthly_income REAL NOT NULL,
+  monthly_spending REAL NOT NULL,
+  credit_score INTEGER NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS accounts (
+  id INTEGER PRIMARY KEY,
+  profile_id INTEGER NOT NULL,
+  name TEXT NOT NULL,
+  institution TEXT NOT NULL,
+  balance REAL NOT NULL,
+  type TEXT CHECK(type IN ('asset', 'liability')) NOT NULL,
+  account_type TEXT NOT NULL,
+  credit_limit REAL,
+  interest_rate REAL,
+  minimum_payment REAL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (profile_id) REFERENCES profiles(id)
+);
+
+CREATE TABLE IF NOT EXISTS spending_categories (
+  id INTEGER PRIMARY KEY,
+  profile_id INTEGER NOT NULL,
+  name TEXT NOT NULL,
+  amount REAL NOT NULL,
+  percentage REAL NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (profile_id) REFERENCES profiles(id)
+);
+
+CREATE TABLE IF NOT EXISTS transactions (
+  id INTEGER PRIMARY KEY,
+  profile_id INTEGER NOT NULL,
+  account_id INTEGER NOT NULL,
+  description TEXT NOT NULL,
+  amount REAL NOT NULL,
+  category TEXT NOT NULL,
+  date TEXT NOT NULL,
+  is_recurring INTEGER NOT NULL DEFAULT 0,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (profile_id) REFERENCES profiles(id)
+);
+"""
+
+INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_profiles_id ON profiles(id);
+CREATE INDEX IF NOT EXISTS idx_accounts_profile_id ON accounts(profile_id);
+CREATE INDEX IF NOT EXISTS idx_spending_categories_profile_id ON spending_categories(profile_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_profile_id ON transactions(profile_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date DESC);
+"""
+
+DateLike = Union[str, date, datetime]
+
+
+class SQLiteProfileRepository(CSVDataLoader):
+    """Profile repository backed by an embedded SQLite database built from CSVs."""
+
+    # Rows inserted per executemany call while importing transactions
+    INSERT_BATCH_SIZE = 5000
+
+    def __init__(self, data_dir: str = None, db_path: str = ":memory:"):
+        """
+        Initialize the repository and build the database if needed.
+
+        Args:
+            data_dir: Directory containing CSV files. If None, tries multiple locations.
+            db_path: SQLite database path. ":memory:" keeps the database in-process;
+                a file path persists it and is only rebuilt when a CSV is newer.
+        """
+        super().__init__(data_dir)
+        self.db_path = db_path
+        self._lock = threading.RLock()
+
+        needs_build = self._is_stale()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        if needs_build:
+            self.rebuild()
+        else:
+            logger.info(f"Using existing profile database at {db_path}")
+
+    def _is_stale(self) -> bool:
+        """Check whether the database must be (re)built from the CSV files."""
+        if self.db_path == ":memory:" or not os.path.exists(self.db_path):
+            return True
+
+        db_mtime = os.path.getmtime(self.db_path)
+        for filename in ('customer.csv', 'account.csv', 'transaction.csv', 'category.csv'):
+            filepath = os.path.join(self.data_dir, filename)
+            if os.path.exists(filepath) and os.path.getmtime(filepath) > db_mtime:
+                return True
+        return False
+
+    def rebuild(self) -> None:
+        """Drop and rebuild all tables from the CSV files."""
+        start_time = datetime.now()
+
+        with self._lock:
+            self._conn.executescript("""
+                DROP TABLE IF EXISTS transactions;
+                DROP TABLE IF EXISTS spending_categories;
+                DROP TABLE IF EXISTS accounts;
+                DROP TABLE IF EXISTS profiles;
+            """)
+            self._conn.executescript(SCHEMA_SQL)
+
+            customers = self._read_csv_rows('customer.csv')
+            account_owners = self._import_accounts()
+            transaction_count = self._import_transactions(account_owners)
+
+            # Indexes are created after the bulk load to keep inserts cheap
+            self._conn.executescript(INDEX_SQL)
+
+            for customer in customers:
+                self._import_profile(customer)
+
+            self._conn.commit()
+
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.info(
+            f"Built profile database with {len(customers)} profiles and "
+            f"{transaction_count} transactions in {elapsed:.2f}s"
+        )
+
+    def _read_csv_rows(self, filename: str) -> List[Dict[str, Any]]:
+        """Read a small CSV file into a list of row dictionaries."""
+        filepath = os.path.join(self.data_dir, filename)
+        if not os.path.exists(filepath):
+            return []
+        with open(filepath, newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def _import_accounts(self) -> Dict[int, int]:
+        """
+        Import account.csv into the accounts table.
+
+        Returns:
+            Mapping of account ID to owning customer ID
+        """
+        account_owners = {}
+        rows = []
+
+        for raw in self._read_csv_rows('account.csv'):
+            row = self._clean_row(raw)
+            account_id = int(row['account_id'])
+            customer_id = int(row['customer_id'])
+            balance = float(row['balance'])
+            account_type = self._map_account_type(row['account_type'])
+
+            account_owners[account_id] = customer_id
+            rows.append((
+                account_id,
+                customer_id,
+                self._generate_account_name(row),
+                row['institution_name'],
+                balance,
+                'liability' if balance < 0 else 'asset',
+                account_type.value,
+                float(row['credit_limit']) if row.get('credit_limit') is not None else None,
+                self._get_interest_rate(account_type, row),
+                self._calculate_minimum_payment(row)
+            ))
+
+        self._conn.executemany(
+            "INSERT INTO accounts (id, profile_id, name, institution, balance, type, "
+            "account_type, credit_limit, interest_rate, minimum_payment) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        return account_owners
+
+    def _import_transactions(self, account_owners: Dict[int, int]) -> int:
+        """
+        Stream transaction.csv into the transactions table in batches.
+
+        Args:
+            account_owners: Mapping of account ID to owning customer ID
+
+        Returns:
+            Number of imported transactions
+        """
+        categories = {
+            row['category_id']: row['name']
+            for row in self._read_csv_rows('category.csv')
+        }
+        filepath = os.path.join(self.data_dir, 'transaction.csv')
+        insert_sql = (
+            "INSERT INTO transactions (id, profile_id, account_id, description, "
+            "amount, category, date, is_recurring) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+
+        count = 0
+        batch = []
+        with open(filepath, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                account_id = int(row['account_id'])
+                customer_id = account_owners.get(account_id)
+                if customer_id is None:
+                    continue
+
+                category = row.get('category') or categories.get(row.get('category_id'), 'uncategorized')
+                timestamp = self._parse_timestamp(row['timestamp'])
+                batch.append((
+                    int(row['transaction_id']),
+                    customer_id,
+                    account_id,
+                    row.get('description') or 'Unknown',
+                    float(row['amount']),
+                    category,
+                    timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                    1 if str(row.get('is_recurring', '')).lower() == 'true' else 0
+                ))
+
+                if len(batch) >= self.INSERT_BATCH_SIZE:
+                    self._conn.executemany(insert_sql, batch)
+                    count += len(batch)
+                    batch = []
+
+        if batch:
+            self._conn.executemany(insert_sql, batch)
+            count += len(batch)
+
+        return count
+
+    def _import_profile(self, customer: Dict[str, Any]) -> None:
+        """Compute and store precomputed profile metrics for one customer."""
+        customer_id = int(customer['customer_id'])
+        accounts = self._fetch_accounts(customer_id)
+        transactions = self.get_transactions(customer_id)
+
+        monthly_income = self._calculate_monthly_income(transactions)
+        monthly_expenses = self._calculate_monthly_expenses(transactions)
+
+        self._conn.execute(
+            "INSERT INTO profiles (id, name, age, location, net_worth, monthly_income, "
+            "monthly_spending, credit_score) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                customer_id,
+                f"Profile {customer_id}",
+                int(customer['age']),
+                customer.get('location') or 'Unknown',
+                sum(a.balance for a in accounts),
+                monthly_income,
+                monthly_expenses,
+                self._estimate_credit_score(customer_id, accounts)
+            )
+        )
+
+        # Pre-compute spending by category (expenses only)
+        spending = self._conn.execute(
+            "SELECT category, SUM(-amount) AS total FROM transactions "
+            "WHERE profile_id = ? AND amount < 0 GROUP BY category ORDER BY total DESC",
+            (customer_id,)
+        ).fetchall()
+        total_spending = sum(row['total'] for row in spending)
+        self._conn.executemany(
+            "INSERT INTO spending_categories (profile_id, name, amount, percentage) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (
+                    customer_id,
+                    row['category'],
+                    row['total'],
+                    round(row['total'] / total_spending * 100, 1) if total_spending else 0.0
+                )
+                for row in spending
+            ]
+        )
+
+    @staticmethod
+    def _clean_row(row: Dict[str, str]) -> Dict[str, Any]:
+        """Convert empty CSV cells to None so loader helpers treat them as missing."""
+        return {key: (value if value != '' else None) for key, value in row.items()}
+
+    @staticmethod
+    def _format_date(value: DateLike) -> str:
+        """Normalize a date bound to the stored 'YYYY-MM-DD HH:MM:SS' format."""
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(value, date):
+            return value.strftime('%Y-%m-%d')
+        return str(value)
+
+    def _fetch_accounts(self, customer_id: int) -> List[Account]:
+        """Load Account models for a customer via idx_accounts_profile_id."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM accounts WHERE profile_id = ? ORDER BY id",
+                (customer_id,)
+            ).fetchall()
+
+        return [
+            Account(
+                account_id=str(row['id']),
+                customer_id=customer_id,
+                institution_name=row['institution'],
+                account_type=AccountType(row['account_type']),
+                account_name=row['name'],
+                balance=row['balance'],
+                credit_limit=row['credit_limit'],
+                interest_rate=row['interest_rate'],
+                minimum_payment=row['minimum_payment']
+            )
+            for row in rows
+        ]
+
+    def _row_to_transaction(self, row: sqlite3.Row) -> Transaction:
+        """Convert a transactions row into a Transaction model."""
+        return Transaction(
+            transaction_id=str(row['id']),
+            account_id=str(row['account_id']),
+            amount=row['amount'],
+            description=row['description'],
+            category=row['category'],
+            timestamp=datetime.strptime(row['date'], '%Y-%m-%d %H:%M:%S'),
+            is_recurring=bool(row['is_recurring']),
+            is_debit=row['amount'] < 0
+        )
+
+    def load_profile(self, customer_id: int) -> ProfileData:
+        """
+        Load complete profile data for a customer.
+
+        Args:
+            customer_id: Customer ID to load
+
+        Returns:
+            Complete ProfileData model
+
+        Raises:
+            ValueError: If customer not found
+        """
+        profile = self.load_profile_summary(customer_id)
+        return profile.model_copy(update={'transactions': self.get_transactions(customer_id)})
+
+    def load_profile_summary(
+        self,
+        customer_id: int,
+        transactions: Optional[Iterable[Any]] = None
+    ) -> ProfileData:
+        """
+        Load a profile's accounts and metrics without materializing its transactions.
+
+        Args:
+            customer_id: Customer ID to load
+            transactions: Ignored; the income and expense metrics are precomputed
+                on the profiles table
+
+        Returns:
+            ProfileData with an empty transaction list
+
+        Raises:
+            ValueError: If customer not found
+        """
+        with self._lock:
+            profile = self._conn.execute(
+                "SELECT * FROM profiles WHERE id = ?", (customer_id,)
+            ).fetchone()
+
+        if profile is None:
+            raise ValueError(f"Customer {customer_id} not found")
+
+        return ProfileData(
+            customer_id=customer_id,
+            demographic=self._determine_demographic(profile['age']),
+            accounts=self._fetch_accounts(customer_id),
+            transactions=[],
+            monthly_income=profile['monthly_income'],
+            monthly_expenses=profile['monthly_spending'],
+            credit_score=profile['credit_score'],
+            age=profile['age'],
+            location=profile['location']
+        )
+
+    def load_profiles(self, customer_ids: Optional[List[int]] = None) -> Dict[int, ProfileData]:
+        """
+        Load several profiles using the indexed per-profile queries.
+
+        Args:
+            customer_ids: Customer IDs to load. If None, loads every customer.
+
+        Returns:
+            Mapping of customer ID to ProfileData. Missing customers are omitted.
+        """
+        if customer_ids is None:
+            customer_ids = self.get_available_profiles()
+
+        profiles = {}
+        for customer_id in customer_ids:
+            try:
+                profiles[customer_id] = self.load_profile(customer_id)
+            except ValueError as e:
+                logger.warning(f"Skipping profile {customer_id}: {e}")
+        return profiles
+
+    def get_transactions(
+        self,
+        customer_id: int,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        limit: Optional[int] = None
+    ) -> List[Transaction]:
+        """
+        Get transactions for a customer, optionally restricted to a date range.
+
+        Args:
+            customer_id: Customer ID
+            start_date: Inclusive lower bound on the transaction date
+            end_date: Exclusive upper bound on the transaction date
+            limit: Maximum number of transactions to return (most recent first)
+
+        Returns:
+            List of Transaction models ordered by date
+        """
+        sql = "SELECT * FROM transactions WHERE profile_id = ?"
+        params: List[Any] = [customer_id]
+
+        if start_date is not None:
+            sql += " AND date >= ?"
+            params.append(self._format_date(start_date))
+        if end_date is not None:
+            sql += " AND date < ?"
+            params.append(self._format_date(end_date))
+
+        if limit is not None:
+            sql += " ORDER BY date DESC, id DESC LIMIT ?"
+            params.append(int(limit))
+        else:
+            sql += " ORDER BY date, id"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [self._row_to_transaction(row) for row in rows]
+
+    def get_spending_categories(self, customer_id: int) -> List[Dict[str, Any]]:
+        """
+        Get pre-computed spending by category for a customer.
+
+        Args:
+            customer_id: Customer ID
+
+        Returns:
+            List of category dictionaries ordered by amount
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, amount, percentage FROM spending_categories "
+                "WHERE profile_id = ? ORDER BY amount DESC",
+                (customer_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_available_profiles(self) -> List[int]:
+        """
+        Get list of available customer IDs.
+
+        Returns:
+            List of customer IDs
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM profiles ORDER BY id").fetchall()
+        return [row['id'] for row in rows]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,268 @@
+"""
+Sorted per-account transaction index.
+Serves cursor-paginated and streamed transaction queries with date-range and
+category filters without materializing a customer's full history.
+"""
+
+import os
+import csv
+import heapq
+import base64
+import logging
+import threading
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Iterator, NamedTuple, Tuple, Union
+from datetime import datetime, date, timezone
+
+from .csv_loader import CSVDataLoader
+from core.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+DateLike = Union[datetime, date, str]
+
+
+class IndexedTransaction(NamedTuple):
+    """Compact transaction record stored in the index."""
+    timestamp: datetime
+    transaction_id: int
+    account_id: int
+    amount: float
+    description: str
+    category: Optional[str]
+    is_recurring: bool
+
+    @property
+    def sort_key(self) -> Tuple[datetime, int]:
+        return (self.timestamp, self.transaction_id)
+
+    def to_model(self) -> Transaction:
+        """Materialize the record as a Transaction model."""
+        return Transaction(
+            transaction_id=str(self.transaction_id),
+            account_id=str(self.account_id),
+            amount=self.amount,
+            description=self.description,
+            category=self.category,
+            timestamp=self.timestamp,
+            is_recurring=self.is_recurring,
+            is_debit=self.amount < 0
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the record for API responses."""
+        return {
+            "transaction_id": str(self.transaction_id),
+            "account_id": str(self.account_id),
+            "amount": self.amount,
+            "description": self.description,
+            "category": self.category or "uncategorized",
+            "date": self.timestamp.isoformat(),
+            "is_recurring": self.is_recurring,
+            "is_debit": self.amount < 0
+        }
+
+
+class TransactionPage(NamedTuple):
+    """One page of transactions plus the cursor for the next page."""
+    transactions: List[IndexedTransaction]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(record: IndexedTransaction) -> str:
+    """Encode the position after a record as an opaque cursor."""
+    raw = f"{record.timestamp.isoformat()}|{record.transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, transaction_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(transaction_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class TransactionIndex:
+    """In-memory transaction index keyed by account and sorted by timestamp."""
+
+    def __init__(self, data_dir: str = None):
+        """
+        Initialize and build the index.
+
+        Args:
+            data_dir: Directory containing CSV files. If None, uses the CSVDataLoader lookup.
+        """
+        self._loader = CSVDataLoader(data_dir)
+        self.data_dir = self._loader.data_dir
+        self._lock = threading.RLock()
+        self._by_account: Dict[int, List[IndexedTransaction]] = {}
+        self._keys_by_account: Dict[int, List[Tuple[datetime, int]]] = {}
+        self._accounts_by_customer: Dict[int, List[int]] = {}
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """(Re)build the index from account.csv, category.csv and transaction.csv."""
+        categories = {
+            row['category_id']: row['name']
+            for row in self._read_csv('category.csv')
+        }
+
+        accounts_by_customer: Dict[int, List[int]] = {}
+        for row in self._read_csv('account.csv'):
+            accounts_by_customer.setdefault(int(row['customer_id']), []).append(int(row['account_id']))
+
+        by_account: Dict[int, List[IndexedTransaction]] = {}
+        for row in self._read_csv('transaction.csv'):
+            record = IndexedTransaction(
+                timestamp=self._loader._parse_timestamp(row['timestamp']),
+                transaction_id=int(row['transaction_id']),
+                account_id=int(row['account_id']),
+                amount=float(row['amount']),
+                description=row.get('description') or 'Unknown',
+                category=categories.get(row.get('category_id')),
+                is_recurring=row.get('is_recurring', 'False') == 'True'
+            )
+            by_account.setdefault(record.account_id, []).append(record)
+
+        for records in by_account.values():
+            records.sort(key=lambda r: r.sort_key)
+
+        with self._lock:
+            self._accounts_by_customer = accounts_by_customer
+            self._by_account = by_account
+            self._keys_by_account = {
+                account_id: [r.sort_key for r in records]
+                for account_id, records in by_account.items()
+            }
+
+        logger.info(
+            f"Indexed {sum(len(r) for r in by_account.values())} transactions "
+            f"across {len(by_account)} accounts"
+        )
+
+    def _read_csv(self, filename: str) -> List[Dict[str, str]]:
+        """Read a CSV file from the data directory as dictionaries."""
+        with open(os.path.join(self.data_dir, filename), newline='') as f:
+            return list(csv.DictReader(f))
+
+    @staticmethod
+    def _to_datetime(value: Optional[DateLike]) -> Optional[datetime]:
+        """
+        Normalize a date bound to a naive datetime comparable with the index keys.
+
+        Timezone-aware bounds are converted to UTC before dropping the offset.
+
+        Raises:
+            ValueError: If a string bound is not an ISO date or datetime
+        """
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            parsed = value
+        elif isinstance(value, date):
+            return datetime(value.year, value.month, value.day)
+        else:
+            parsed = datetime.fromisoformat(str(value))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    def iter_transactions(
+        self,
+        customer_id: int,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        categories: Optional[List[str]] = None,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> Iterator[IndexedTransaction]:
+        """
+        Iterate a customer's transactions in (timestamp, id) order.
+
+        Args:
+            customer_id: Customer ID
+            start_date: Inclusive lower bound on the transaction timestamp
+            end_date: Exclusive upper bound on the transaction timestamp
+            categories: Only include transactions in these categories
+            after: Only include transactions strictly after this sort key
+
+        Yields:
+            IndexedTransaction records
+        """
+        start = self._to_datetime(start_date)
+        end = self._to_datetime(end_date)
+        category_filter = set(categories) if categories else None
+
+        with self._lock:
+            account_ids = self._accounts_by_customer.get(customer_id, [])
+            slices = []
+            for account_id in account_ids:
+                records = self._by_account.get(account_id, [])
+                keys = self._keys_by_account.get(account_id, [])
+                lo = 0
+                if start is not None:
+                    lo = bisect_left(keys, (start, -1))
+                if after is not None:
+                    lo = max(lo, bisect_left(keys, (after[0], after[1] + 1)))
+                hi = len(keys) if end is None else bisect_left(keys, (end, -1))
+                if lo < hi:
+                    slices.append(records[lo:hi])
+
+        for record in heapq.merge(*slices, key=lambda r: r.sort_key):
+            if category_filter is None or record.category in category_filter:
+                yield record
+
+    def get_page(
+        self,
+        customer_id: int,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        categories: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> TransactionPage:
+        """
+        Get one page of a customer's transactions.
+
+        Args:
+            customer_id: Customer ID
+            start_date: Inclusive lower bound on the transaction timestamp
+            end_date: Exclusive upper bound on the transaction timestamp
+            categories: Only include transactions in these categories
+            cursor: Cursor returned by the previous page
+            limit: Page size (capped at MAX_PAGE_SIZE)
+
+        Returns:
+            TransactionPage with next_cursor set when more results remain
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        after = decode_cursor(cursor) if cursor else None
+
+        page = []
+        has_more = False
+        for record in self.iter_transactions(customer_id, start_date, end_date, categories, after):
+            if len(page) == limit:
+                has_more = True
+                break
+            page.append(record)
+
+        next_cursor = encode_cursor(page[-1]) if has_more else None
+        return TransactionPage(transactions=page, next_cursor=next_cursor)
+
+    def has_customer(self, customer_id: int) -> bool:
+        """Check whether the customer has any indexed accounts."""
+        with self._lock:
+            return customer_id in self._accounts_by_customer
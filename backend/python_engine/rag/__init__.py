@@ -5,11 +5,13 @@ RAG (Retrieval-Augmented Generation) System for Profile-Specific Financial Data
 from .profile_rag_system import (
     ProfileRAGSystem,
     ProfileRAGManager,
+    SharedProfileIndex,
     get_rag_manager
 )
 
 __all__ = [
     'ProfileRAGSystem',
     'ProfileRAGManager', 
+    'SharedProfileIndex',
     'get_rag_manager'
 ]
\ No newline at end of file
@@ -4,11 +4,11 @@ Implements efficient batched query execution with proper separation of concerns
 """
 
 import asyncio
+import hashlib
 import time
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor
 
 from .abstractions import (
     IRAGBatchExecutor,
@@ -22,9 +22,26 @@ from .abstractions import (
     RAGResult,
     QueryType
 )
+from .semantic_cache import SemanticRAGCache
 
 logger = logging.getLogger(__name__)
 
+# Seconds a successful query result stays cached
+RESULT_CACHE_TTL = 300
+
+
+def rag_cache_key(profile_id: int, query: RAGQuery, data_version: str = "") -> str:
+    """
+    Deterministic cache key for a query result.
+    
+    The same in every process (unlike hash(), which is salted per process), and
+    includes the profile's data version so results computed from older data are
+    never served. Keys start with '<profile_id>:' so a profile's entries can be
+    invalidated with a '<profile_id>:*' pattern.
+    """
+    digest = hashlib.sha256(query.query_text.strip().encode("utf-8")).hexdigest()[:32]
+    return f"{profile_id}:{query.query_type.value}:{data_version}:{digest}"
+
 
 class BatchedRAGService(IRAGBatchExecutor):
     """
@@ -38,17 +55,33 @@ class BatchedRAGService(IRAGBatchExecutor):
         cache: Optional[IRAGCache] = None,
         metrics: Optional[IRAGMetrics] = None,
         error_handler: Optional[IRAGErrorHandler] = None,
-        max_parallel_queries: int = 6
+        max_parallel_queries: int = 6,
+        query_timeout_seconds: Optional[float] = 30.0,
+        data_version: Optional[Callable[[int], Any]] = None,
+        semantic_cache: Optional[SemanticRAGCache] = None
     ):
         """
         Dependency Injection for loose coupling (DIP)
+        
+        Args:
+            max_parallel_queries: Queries in flight at once across all batches
+            query_timeout_seconds: Per-query limit; a query that exceeds it fails
+                without holding up the rest of the batch. None disables it.
+            data_version: Returns a profile's current data version for cache keys,
+                e.g. DataVersionService.profile_fingerprint
+            semantic_cache: Answers reworded repeats of earlier queries after an
+                exact-key cache miss
         """
         self._query_executor = query_executor
         self._cache = cache
         self._metrics = metrics
         self._error_handler = error_handler
         self._max_parallel_queries = max_parallel_queries
-        self._executor = ThreadPoolExecutor(max_workers=max_parallel_queries)
+        self._query_timeout_seconds = query_timeout_seconds
+        self._data_version = data_version
+        self._semantic_cache = semantic_cache
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
     
     async def execute_batch(self, request: BatchedRAGRequest) -> BatchedRAGResponse:
         """
@@ -135,19 +168,45 @@ class BatchedRAGService(IRAGBatchExecutor):
         """
         logger.info(f"🔍 _execute_single_query_with_cache: profile_id={profile_id}, query_type={query.query_type}")
         
+        data_version = self._data_version(profile_id) if self._data_version else ""
+        
         # Check cache first
+        cache_key = None
         if self._cache:
-            cache_key = f"{profile_id}:{query.query_type.value}:{hash(query.query_text)}"
-            cached_result = self._cache.get(cache_key)
+            cache_key = rag_cache_key(profile_id, query, data_version)
+            cached_result = await self._cache.get(cache_key)
             if cached_result:
                 logger.debug(f"Cache hit for query: {query.query_type.value}")
                 return cached_result
         
-        # Execute query
+        # Then earlier queries worded differently
+        query_vector = None
+        if self._semantic_cache and self._semantic_cache.accepts(query):
+            try:
+                query_vector = await self._semantic_cache.embed(query.query_text)
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup skipped, could not embed query: {e}")
+            if query_vector is not None:
+                cached_result = self._semantic_cache.lookup(profile_id, query, query_vector, data_version)
+                if cached_result:
+                    if self._cache:
+                        await self._cache.set(cache_key, cached_result, RESULT_CACHE_TTL)
+                    return cached_result
+        
+        # Execute query, bounded by the shared concurrency limit and per-query timeout
         start_time = time.time()
         logger.info(f"🔍 _execute_single_query_with_cache: Calling query executor")
         try:
-            result = await self._query_executor.execute_query(profile_id, query)
+            async with self._concurrency_limit():
+                try:
+                    result = await asyncio.wait_for(
+                        self._query_executor.execute_query(profile_id, query),
+                        timeout=self._query_timeout_seconds
+                    )
+                except asyncio.TimeoutError:
+                    raise TimeoutError(
+                        f"{query.query_type.value} query timed out after {self._query_timeout_seconds}s"
+                    ) from None
             logger.info(f"🔍 _execute_single_query_with_cache: Got result success={result.success}, length={len(result.result)}")
             
             # Record metrics
@@ -161,8 +220,9 @@ class BatchedRAGService(IRAGBatchExecutor):
             
             # Cache successful result
             if self._cache and result.success:
-                cache_key = f"{profile_id}:{query.query_type.value}:{hash(query.query_text)}"
-                self._cache.set(cache_key, result, ttl=300)
+                await self._cache.set(cache_key, result, RESULT_CACHE_TTL)
+            if query_vector is not None and result.success:
+                self._semantic_cache.store(profile_id, query, query_vector, result, data_version, RESULT_CACHE_TTL)
             
             return result
             
@@ -177,7 +237,10 @@ class BatchedRAGService(IRAGBatchExecutor):
                 )
             raise
     
-    def __del__(self):
-        """Cleanup executor on deletion"""
-        if hasattr(self, '_executor'):
-            self._executor.shutdown(wait=False)
\ No newline at end of file
+    def _concurrency_limit(self) -> asyncio.Semaphore:
+        """Semaphore bounding in-flight queries, created on the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_parallel_queries)
+            self._semaphore_loop = loop
+        return self._semaphore
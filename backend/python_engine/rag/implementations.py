@@ -6,8 +6,10 @@ Bridges the gap between abstract interfaces and existing RAG manager
 import asyncio
 import time
 import logging
-from typing import Dict, List, Any, Optional
-from collections import defaultdict
+import fnmatch
+from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from .abstractions import (
     IRAGQueryExecutor,
@@ -23,12 +25,27 @@ logger = logging.getLogger(__name__)
 
 
 class SimpleRAGQueryExecutor(IRAGQueryExecutor):
-    """Simple query executor that wraps the existing RAG manager"""
+    """
+    Simple query executor that wraps the existing RAG manager.
+    Profile queries are synchronous (embedding, vector search, LLM analysis), so
+    they run on a thread pool instead of blocking the event loop.
+    """
     
-    def __init__(self, rag_manager):
+    def __init__(self, rag_manager, max_workers: int = 6):
+        """
+        Args:
+            rag_manager: ProfileRAGManager serving the queries
+            max_workers: Queries that can run at the same time
+        """
         self.rag_manager = rag_manager
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-query")
     
     async def execute_query(self, profile_id: int, query: RAGQuery) -> RAGResult:
+        """Execute a single RAG query on the thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._execute_query_sync, profile_id, query)
+    
+    def _execute_query_sync(self, profile_id: int, query: RAGQuery) -> RAGResult:
         """Execute a single RAG query using the existing RAG manager"""
         start_time = time.time()
         logger.info(f"🔍 SimpleRAGQueryExecutor: profile_id={profile_id}, query_type={query.query_type}")
@@ -72,44 +89,40 @@ class SimpleRAGQueryExecutor(IRAGQueryExecutor):
 
 
 class SimpleRAGCache(IRAGCache):
-    """Simple in-memory cache implementation"""
+    """Simple in-memory LRU cache with per-entry TTL; every operation is O(1) except invalidate"""
     
     def __init__(self, max_size: int = 1000, default_ttl: int = 300):
-        self._cache: Dict[str, Any] = {}
-        self._timestamps: Dict[str, float] = {}
-        self._ttls: Dict[str, float] = {}
+        # key -> (value, expires_at), least recently used first
+        self._cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
         self.max_size = max_size
         self.default_ttl = default_ttl
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
     
-    def get(self, key: str) -> Optional[Any]:
+    async def get(self, key: str) -> Optional[Any]:
         """Get cached value"""
-        if key in self._cache:
-            # Check if cache is still valid (TTL check)
-            if key in self._timestamps:
-                ttl = self._ttls.get(key, self.default_ttl)
-                age = time.time() - self._timestamps[key]
-                if age > ttl:
-                    self._remove_key(key)
-                    self._misses += 1
-                    return None
-            self._hits += 1
-            return self._cache[key]
-        self._misses += 1
-        return None
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        value, expires_at = entry
+        if time.time() > expires_at:
+            del self._cache[key]
+            self._misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self._hits += 1
+        return value
     
-    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
-        """Set cached value with TTL"""
-        # Enforce max size
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            # Remove oldest entry
-            oldest_key = min(self._timestamps.keys(), key=lambda k: self._timestamps[k])
-            self._remove_key(oldest_key)
-        
-        self._cache[key] = value
-        self._timestamps[key] = time.time()
-        self._ttls[key] = ttl or self.default_ttl
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Set cached value with TTL, evicting the least recently used entry when full"""
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        elif len(self._cache) >= self.max_size:
+            self._cache.popitem(last=False)
+            self._evictions += 1
+        self._cache[key] = (value, time.time() + (ttl_seconds or self.default_ttl))
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -117,44 +130,111 @@ class SimpleRAGCache(IRAGCache):
         hit_rate = self._hits / total_requests if total_requests > 0 else 0
         
         return {
+            'backend': 'memory',
             'hits': self._hits,
             'misses': self._misses,
             'hit_rate': hit_rate,
+            'evictions': self._evictions,
             'total_entries': len(self._cache),
             'max_size': self.max_size
         }
     
-    def _remove_key(self, key: str) -> None:
-        """Remove key from all internal dictionaries"""
-        if key in self._cache:
-            del self._cache[key]
-        if key in self._timestamps:
-            del self._timestamps[key]
-        if key in self._ttls:
-            del self._ttls[key]
-    
     async def delete(self, key: str) -> None:
         """Delete cached value"""
-        self._remove_key(key)
+        self._cache.pop(key, None)
     
     async def clear(self) -> None:
         """Clear all cached values"""
         self._cache.clear()
-        self._timestamps.clear()
-        self._ttls.clear()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
     
-    async def invalidate(self, pattern: str = None) -> None:
-        """Invalidate cache entries matching pattern"""
+    async def invalidate(self, pattern: str = None) -> int:
+        """Invalidate cache entries matching pattern (glob if it contains '*', else substring)"""
         if pattern is None:
             # Clear all cache if no pattern specified
+            count = len(self._cache)
             await self.clear()
+            return count
+        
+        # Remove entries matching the pattern
+        if '*' in pattern:
+            keys_to_remove = [key for key in self._cache.keys() if fnmatch.fnmatchcase(key, pattern)]
         else:
-            # Remove entries matching the pattern
             keys_to_remove = [key for key in self._cache.keys() if pattern in key]
-            for key in keys_to_remove:
-                await self.delete(key)
+        for key in keys_to_remove:
+            await self.delete(key)
+        return len(keys_to_remove)
+
+
+class SharedRAGCache(IRAGCache):
+    """
+    RAG result cache backed by the shared cache manager (Redis with a per-process L1),
+    so every worker process serves the others' results
+    """
+    
+    KEY_PREFIX = "rag:"
+    
+    def __init__(self, cache_manager, default_ttl: int = 300):
+        """
+        Args:
+            cache_manager: core.cache_manager.CacheManager instance
+            default_ttl: Seconds a result stays cached when set() is not given a TTL
+        """
+        self._cache_manager = cache_manager
+        self.default_ttl = default_ttl
+        self._hits = 0
+        self._misses = 0
+    
+    async def get(self, key: str) -> Optional[RAGResult]:
+        """Get cached result"""
+        data = await self._cache_manager.get(self.KEY_PREFIX + key)
+        if not data:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return RAGResult(
+            query=RAGQuery(
+                query_text=data['query_text'],
+                query_type=QueryType(data['query_type']),
+                metadata=data.get('metadata')
+            ),
+            result=data['result'],
+            success=data['success'],
+            error=data.get('error'),
+            execution_time_ms=data.get('execution_time_ms')
+        )
+    
+    async def set(self, key: str, result: RAGResult, ttl_seconds: Optional[int] = None) -> None:
+        """Cache result with TTL"""
+        await self._cache_manager.set(
+            self.KEY_PREFIX + key,
+            {
+                'query_text': result.query.query_text,
+                'query_type': result.query.query_type.value,
+                'metadata': result.query.metadata,
+                'result': result.result,
+                'success': result.success,
+                'error': result.error,
+                'execution_time_ms': result.execution_time_ms
+            },
+            int(ttl_seconds or self.default_ttl)
+        )
+    
+    async def invalidate(self, pattern: str = None) -> int:
+        """Invalidate cache entries matching a glob pattern (all RAG entries if None)"""
+        return await self._cache_manager.clear_pattern(self.KEY_PREFIX + (pattern or "*"))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics for this process"""
+        total_requests = self._hits + self._misses
+        return {
+            'backend': 'shared',
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / total_requests if total_requests > 0 else 0
+        }
 
 
 class SimpleRAGMetrics(IRAGMetrics):
@@ -0,0 +1,116 @@
+"""
+BM25 inverted index for profile RAG documents.
+Merchant names, categories and amounts are matched as exact tokens, which
+embeddings rank poorly, and scoring needs no embedding calls. Postings are
+numpy arrays of row indices and term frequencies, extended in place as
+documents are added, so rows line up with PartitionedVectorIndex rows.
+"""
+
+import re
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Common question words that carry no signal for financial records
+STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from had has have how i in is it me "
+    "my of on or show tell that the this to was what when where which with you your".split()
+)
+
+_THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d)")
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word and number tokens without stopwords.
+    Amounts keep their decimals and lose thousands separators: '$4,499.91' -> '4499.91'.
+    """
+    text = _THOUSANDS_SEPARATOR.sub("", text.lower())
+    return [token for token in _TOKEN.findall(text) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over an append-only list of documents."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.doc_lengths = np.empty(0, dtype=np.float32)
+        # token -> (row indices, term frequencies)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add_documents(self, texts: Iterable[str]) -> None:
+        """Index texts as the next rows."""
+        start = len(self.doc_lengths)
+        lengths: List[int] = []
+        new_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for offset, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                rows, tfs = new_postings.setdefault(token, ([], []))
+                rows.append(start + offset)
+                tfs.append(tf)
+        if not lengths:
+            return
+
+        self.doc_lengths = np.concatenate([self.doc_lengths, np.asarray(lengths, dtype=np.float32)])
+        for token, (rows, tfs) in new_postings.items():
+            rows = np.asarray(rows, dtype=np.int64)
+            tfs = np.asarray(tfs, dtype=np.float32)
+            existing = self.postings.get(token)
+            if existing is not None:
+                rows = np.concatenate([existing[0], rows])
+                tfs = np.concatenate([existing[1], tfs])
+            self.postings[token] = (rows, tfs)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every row for the query; rows sharing no terms score 0."""
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float32)
+        if len(scores) == 0:
+            return scores
+        avg_length = float(self.doc_lengths.mean()) or 1.0
+        total = len(scores)
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            rows, tfs = posting
+            idf = math.log(1 + (total - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[rows] / avg_length)
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        return scores
+
+    def search(self, query: str, k: int = 5, rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Top-k rows by BM25 score.
+
+        Args:
+            query: Query text
+            k: Number of rows to return
+            rows: Only rank these rows; all rows if None
+
+        Returns:
+            (row, score) pairs with positive scores, best first
+        """
+        scores = self.scores(query)
+        candidates = np.arange(len(scores)) if rows is None else np.asarray(rows, dtype=np.int64)
+        candidates = candidates[scores[candidates] > 0]
+        if len(candidates) == 0 or k <= 0:
+            return []
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        # Best first, earlier rows first among equal scores
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(int(row), float(scores[row])) for row in candidates]
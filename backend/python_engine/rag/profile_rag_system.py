@@ -4,10 +4,14 @@ Loads CSV data into vector databases per profile with query tools
 """
 
 import os
+import hashlib
+import numpy as np
 import pandas as pd
 import logging
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from concurrent.futures import Future
+from typing import Dict, List, Any, Optional, Iterable
 from pathlib import Path
 import json
 
@@ -17,7 +21,6 @@ load_dotenv()
 
 # LangChain imports for RAG
 from langchain_core.documents import Document
-from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_chroma import Chroma
 from langchain_core.retrievers import BaseRetriever
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -26,6 +29,8 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.api_cache import CacheAwareEmbeddings, api_cache
+from .vector_index import PartitionedVectorIndex
+from .structured_queries import StructuredQueryPlanner, load_category_names
 
 # DSPy for structured queries
 import dspy
@@ -42,6 +47,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# data_type -> CSV file in the data directory
+CSV_FILES = {
+    'accounts': 'account.csv',
+    'transactions': 'transaction.csv',
+    'demographics': 'demographics.csv',
+    'goals': 'goal.csv',
+    'investments': 'investment.csv'
+}
+
+# customer_id tag for rows from files without a customer_id column; visible to every profile
+SHARED_RECORDS = None
+
+# Bumped whenever the way rows become documents changes, so persisted indexes are rebuilt
+INDEX_FORMAT_VERSION = 3
+
+# Directory name for the persisted shared index, inside the CSV data directory unless RAG_INDEX_DIR is set
+INDEX_DIR_NAME = ".rag_index"
+
 
 class FinancialDataAnalysisSignature(Signature):
     """Analyze financial data and extract insights"""
@@ -50,128 +73,266 @@ class FinancialDataAnalysisSignature(Signature):
     analysis_result = OutputField(desc="Detailed financial analysis and insights")
 
 
+def create_embeddings():
+    """ENFORCED: Use unified cached embeddings - no more duplicates."""
+    try:
+        # Use unified cache-aware embeddings
+        embeddings = CacheAwareEmbeddings()
+        logger.info(f"Using cached embeddings with provider: {embeddings.provider.value}")
+        return embeddings
+    except ValueError as e:
+        # Final fallback to in-memory embeddings for testing
+        logger.warning(f"No API keys found: {e}, using basic embeddings")
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=384)
+    except Exception as e:
+        logger.error(f"Failed to setup embeddings: {e}")
+        raise
+
+
+def create_dspy_analyzer() -> Optional[Module]:
+    """Setup DSPy analyzer for structured financial analysis"""
+    try:
+        # Configure DSPy if API keys are available
+        if os.getenv("ANTHROPIC_API_KEY"):
+            lm = dspy.LM("anthropic/claude-3-5-sonnet-20241022", api_key=os.getenv("ANTHROPIC_API_KEY"))
+            provider = "Anthropic"
+        elif os.getenv("OPENAI_API_KEY"):
+            lm = dspy.LM("openai/gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"))
+            provider = "OpenAI"
+        else:
+            logger.warning("DSPy analyzer not configured - no API key")
+            return None
+        
+        # The LM is scoped to each call: dspy.configure() may only be called from one
+        # thread, and the index can be built on a background thread
+        class FinancialAnalyzer(Module):
+            def __init__(self):
+                super().__init__()
+                self.analyzer = dspy.ChainOfThought(FinancialDataAnalysisSignature)
+            
+            def forward(self, query: str, context_data: str) -> str:
+                with dspy.context(lm=lm):
+                    result = self.analyzer(query=query, context_data=context_data)
+                return result.analysis_result
+        
+        logger.info(f"DSPy financial analyzer configured with {provider}")
+        return FinancialAnalyzer()
+        
+    except Exception as e:
+        logger.error(f"Failed to setup DSPy analyzer: {e}")
+        return None
+
+
+def create_documents(
+    data: Dict[str, pd.DataFrame],
+    default_customer_id: Optional[int] = SHARED_RECORDS,
+    category_names: Optional[Dict[int, str]] = None
+) -> List[Document]:
+    """
+    Convert CSV data into LangChain documents for vector storage
+    
+    Args:
+        data: data_type -> DataFrame of records
+        default_customer_id: customer_id tag for rows without a customer_id column
+        category_names: category_id -> name, for transactions that only carry an id
+        
+    Returns:
+        One document per record, tagged with data_type and customer_id
+    """
+    formatters = {
+        'accounts': ProfileRAGSystem._format_account_record,
+        'transactions': ProfileRAGSystem._format_transaction_record,
+        'demographics': ProfileRAGSystem._format_demographic_record,
+        'goals': ProfileRAGSystem._format_goal_record,
+        'investments': ProfileRAGSystem._format_investment_record
+    }
+    documents = []
+    
+    for data_type, df in data.items():
+        if df.empty:
+            continue
+        formatter = formatters.get(data_type)
+        
+        for idx, row in zip(df.index, df.to_dict('records')):
+            if category_names and pd.isna(row.get('category')) and pd.notna(row.get('category_id')):
+                row['category'] = category_names.get(int(row['category_id']))
+            customer_id = row.get('customer_id', default_customer_id)
+            metadata = {
+                'data_type': data_type,
+                'record_id': str(idx),
+                'customer_id': default_customer_id if pd.isna(customer_id) else customer_id
+            }
+            
+            # Create natural language description based on data type
+            if formatter is not None:
+                content = formatter(row)
+            else:
+                # Generic formatting
+                content = f"{data_type.title()} record: "
+                content += ", ".join([f"{col}: {val}" for col, val in row.items() if pd.notna(val)])
+            
+            # Add financial context metadata
+            if 'balance' in row:
+                metadata['balance'] = float(row['balance'])
+            if 'amount' in row:
+                metadata['amount'] = float(row['amount'])
+            if 'account_type' in row:
+                metadata['account_type'] = str(row['account_type'])
+            
+            documents.append(Document(
+                page_content=content,
+                metadata=metadata
+            ))
+    
+    return documents
+
+
+def attribute_to_customers(frames: Dict[str, pd.DataFrame]) -> None:
+    """
+    Add customer_id to frames that only reference an account (e.g. transactions),
+    using the owners in the accounts frame. Rows whose account is unknown are
+    dropped rather than shared with every profile.
+    """
+    accounts = frames.get('accounts')
+    if accounts is None or not {'account_id', 'customer_id'} <= set(accounts.columns):
+        return
+    owners = accounts.drop_duplicates('account_id').set_index('account_id')['customer_id']
+    
+    for data_type, df in frames.items():
+        if 'customer_id' in df.columns or 'account_id' not in df.columns:
+            continue
+        customer_ids = df['account_id'].map(owners)
+        known = customer_ids.notna()
+        if not known.all():
+            logger.warning(f"Dropping {int((~known).sum())} {data_type} records for unknown accounts")
+        frames[data_type] = df[known].assign(customer_id=customer_ids[known].astype(int))
+
+
+def embedding_identity(embeddings) -> str:
+    """Identify an embedding model so vectors from different models are never mixed"""
+    provider = getattr(embeddings, 'provider', None)
+    model = getattr(embeddings, 'model', None) or getattr(embeddings, 'size', '')
+    return f"{type(embeddings).__name__}:{getattr(provider, 'value', provider)}:{model}"
+
+
+def data_fingerprint(csv_data_dir: str, embeddings) -> str:
+    """Hash of the indexed CSV contents and embedding model; changes whenever the index must be rebuilt"""
+    digest = hashlib.sha256(f"{INDEX_FORMAT_VERSION}:{embedding_identity(embeddings)}".encode())
+    for filename in CSV_FILES.values():
+        digest.update(f"\x00{filename}\x00".encode())
+        csv_path = Path(csv_data_dir) / filename
+        if csv_path.exists():
+            with open(csv_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        else:
+            digest.update(b'missing')
+    return digest.hexdigest()
+
+
+def split_documents(documents: List[Document]) -> List[Document]:
+    """Split documents if they're too long"""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=500,
+        chunk_overlap=50
+    )
+    return text_splitter.split_documents(documents)
+
+
 class ProfileRAGSystem:
     """RAG system for individual user profiles with financial data"""
     
-    def __init__(self, profile_id: int, csv_data_dir: str):
+    def __init__(self, profile_id: int, csv_data_dir: str, shared_index: Optional["SharedProfileIndex"] = None):
+        """
+        Args:
+            profile_id: Customer whose data this system answers questions about
+            csv_data_dir: Directory containing the CSV data files
+            shared_index: Multi-profile index to serve from; without one the
+                profile's own data is loaded and indexed
+        """
         self.profile_id = profile_id
         self.csv_data_dir = csv_data_dir
+        self.shared_index = shared_index
         self.vector_store = None
         self.retriever = None
         self.embeddings = None
         self.profile_data = {}
         self.tools_registry = {}
+        # Restricts shared-index searches to this profile's rows plus shared records
+        self._search_filter: Dict[str, Any] = {}
         
-        # Configure embeddings
-        self._setup_embeddings()
-        
-        # Load and process CSV data
-        self._load_profile_data()
-        
-        # Create vector store and retriever
-        self._setup_vector_store()
+        if shared_index is not None:
+            self._attach_shared_index(shared_index)
+        else:
+            self.category_names = load_category_names(csv_data_dir)
+            
+            # Configure embeddings
+            self._setup_embeddings()
+            
+            # Load and process CSV data
+            self._load_profile_data()
+            
+            # Create vector store and retriever
+            self._setup_vector_store()
+            
+            # Setup DSPy analyzer
+            self._setup_dspy_analyzer()
+            
+            # Aggregate questions are answered from the records directly, before retrieval
+            self.query_planner = StructuredQueryPlanner(self.profile_data, self.category_names)
         
         # Register query tools
         self._register_tools()
-        
-        # Setup DSPy analyzer
-        self._setup_dspy_analyzer()
+    
+    def _attach_shared_index(self, shared_index: "SharedProfileIndex"):
+        """Serve this profile from the shared index without loading or embedding anything"""
+        self.shared_index = shared_index
+        self.category_names = shared_index.category_names
+        self.embeddings = shared_index.embeddings
+        self.profile_data = shared_index.profile_frames(self.profile_id)
+        self.vector_store = shared_index.vector_index
+        self._search_filter = {'customer_id': [self.profile_id, SHARED_RECORDS]}
+        self.retriever = self.vector_store.as_retriever(k=5, filter=self._search_filter)
+        self.dspy_analyzer = shared_index.dspy_analyzer
+        self.query_planner = StructuredQueryPlanner(self.profile_data, self.category_names)
     
     def _setup_embeddings(self):
         """ENFORCED: Use unified cached embeddings - no more duplicates."""
-        try:
-            # Use unified cache-aware embeddings
-            self.embeddings = CacheAwareEmbeddings()
-            logger.info(f"Using cached embeddings with provider: {self.embeddings.provider.value}")
-        except ValueError as e:
-            # Final fallback to in-memory embeddings for testing
-            logger.warning(f"No API keys found: {e}, using basic embeddings")
-            from langchain_core.embeddings import DeterministicFakeEmbedding
-            self.embeddings = DeterministicFakeEmbedding(size=384)
-        except Exception as e:
-            logger.error(f"Failed to setup embeddings: {e}")
-            raise
+        self.embeddings = create_embeddings()
     
     def _load_profile_data(self):
         """Load all CSV data for the specific profile"""
         try:
-            csv_files = {
-                'accounts': 'account.csv',
-                'transactions': 'transaction.csv', 
-                'demographics': 'demographics.csv',
-                'goals': 'goal.csv',
-                'investments': 'investment.csv'
-            }
-            
-            for data_type, filename in csv_files.items():
+            for data_type, filename in CSV_FILES.items():
                 csv_path = Path(self.csv_data_dir) / filename
                 if csv_path.exists():
-                    df = pd.read_csv(csv_path)
-                    
-                    # Filter by customer_id (assuming it exists in all files)
-                    if 'customer_id' in df.columns:
-                        profile_df = df[df['customer_id'] == self.profile_id]
-                        self.profile_data[data_type] = profile_df
-                        logger.info(f"Loaded {len(profile_df)} {data_type} records for profile {self.profile_id}")
-                    else:
-                        # For files without customer_id, load all data
-                        self.profile_data[data_type] = df
-                        logger.info(f"Loaded {len(df)} {data_type} records (no customer filter)")
+                    self.profile_data[data_type] = pd.read_csv(csv_path)
                 else:
                     logger.warning(f"CSV file not found: {csv_path}")
                     self.profile_data[data_type] = pd.DataFrame()
             
+            # Account-level files (transactions) are attributed through account.csv
+            attribute_to_customers(self.profile_data)
+            
+            for data_type, df in self.profile_data.items():
+                if 'customer_id' in df.columns:
+                    self.profile_data[data_type] = df[df['customer_id'] == self.profile_id]
+                    logger.info(f"Loaded {len(self.profile_data[data_type])} {data_type} records for profile {self.profile_id}")
+                elif not df.empty:
+                    # For files without customer_id, load all data
+                    logger.info(f"Loaded {len(df)} {data_type} records (no customer filter)")
+            
         except Exception as e:
             logger.error(f"Failed to load profile data: {e}")
             raise
     
     def _create_documents_from_data(self) -> List[Document]:
         """Convert CSV data into LangChain documents for vector storage"""
-        documents = []
-        
         try:
-            for data_type, df in self.profile_data.items():
-                if df.empty:
-                    continue
-                    
-                for idx, row in df.iterrows():
-                    # Convert row to readable text
-                    content_parts = []
-                    metadata = {
-                        'data_type': data_type,
-                        'record_id': str(idx),
-                        'customer_id': self.profile_id
-                    }
-                    
-                    # Create natural language description based on data type
-                    if data_type == 'accounts':
-                        content = self._format_account_record(row)
-                    elif data_type == 'transactions':
-                        content = self._format_transaction_record(row)
-                    elif data_type == 'demographics':
-                        content = self._format_demographic_record(row)
-                    elif data_type == 'goals':
-                        content = self._format_goal_record(row)
-                    elif data_type == 'investments':
-                        content = self._format_investment_record(row)
-                    else:
-                        # Generic formatting
-                        content = f"{data_type.title()} record: "
-                        content += ", ".join([f"{col}: {val}" for col, val in row.items() if pd.notna(val)])
-                    
-                    # Add financial context metadata
-                    if 'balance' in row:
-                        metadata['balance'] = float(row['balance'])
-                    if 'amount' in row:
-                        metadata['amount'] = float(row['amount'])
-                    if 'account_type' in row:
-                        metadata['account_type'] = str(row['account_type'])
-                    
-                    documents.append(Document(
-                        page_content=content,
-                        metadata=metadata
-                    ))
-            
+            documents = create_documents(
+                self.profile_data, default_customer_id=self.profile_id, category_names=self.category_names
+            )
             logger.info(f"Created {len(documents)} documents for profile {self.profile_id}")
             return documents
             
@@ -179,7 +340,8 @@ class ProfileRAGSystem:
             logger.error(f"Failed to create documents: {e}")
             return []
     
-    def _format_account_record(self, row) -> str:
+    @staticmethod
+    def _format_account_record(row) -> str:
         """Format account record into natural language"""
         account_type = row.get('account_type', 'account')
         balance = float(row.get('balance', 0))
@@ -196,19 +358,23 @@ class ProfileRAGSystem:
         else:
             return f"{account_type.title()} account {account_num} at {institution} has balance of ${balance:,.2f}"
     
-    def _format_transaction_record(self, row) -> str:
+    @staticmethod
+    def _format_transaction_record(row) -> str:
         """Format transaction record into natural language"""
         amount = float(row.get('amount', 0))
-        category = row.get('category', 'transaction')
+        category = row.get('category')
+        category = str(category).replace('_', ' ') if pd.notna(category) else 'transaction'
         description = row.get('description', 'Unknown transaction')
-        date = row.get('date', 'Unknown date')
+        # transaction.csv records a timestamp; older extracts a date
+        date = next((row[key] for key in ('date', 'timestamp') if pd.notna(row.get(key))), 'Unknown date')
         
         if amount < 0:
             return f"Expense of ${abs(amount):,.2f} on {date} for {category}: {description}"
         else:
             return f"Income of ${amount:,.2f} on {date} for {category}: {description}"
     
-    def _format_demographic_record(self, row) -> str:
+    @staticmethod
+    def _format_demographic_record(row) -> str:
         """Format demographic record into natural language"""
         parts = []
         
@@ -225,7 +391,8 @@ class ProfileRAGSystem:
             
         return f"User demographics - {', '.join(parts)}"
     
-    def _format_goal_record(self, row) -> str:
+    @staticmethod
+    def _format_goal_record(row) -> str:
         """Format financial goal record into natural language"""
         goal_type = row.get('goal_type', 'financial goal')
         target_amount = float(row.get('target_amount', 0))
@@ -236,7 +403,8 @@ class ProfileRAGSystem:
         
         return f"{goal_type.title()} goal: Save ${target_amount:,.2f} by {target_date}. Current progress: ${current_amount:,.2f} ({progress:.1f}%)"
     
-    def _format_investment_record(self, row) -> str:
+    @staticmethod
+    def _format_investment_record(row) -> str:
         """Format investment record into natural language"""
         symbol = row.get('symbol', 'Unknown')
         shares = float(row.get('shares', 0))
@@ -249,32 +417,25 @@ class ProfileRAGSystem:
         return f"Investment in {symbol}: {shares} shares worth ${current_value:,.2f}. Gain/Loss: ${gain_loss:,.2f} ({gain_loss_pct:+.2f}%)"
     
     def _setup_vector_store(self):
-        """Setup vector store with profile documents"""
+        """Setup the data_type-partitioned vector index with profile documents"""
         try:
             documents = self._create_documents_from_data()
             
             if not documents:
                 logger.warning(f"No documents created for profile {self.profile_id}")
-                # Create empty vector store
-                self.vector_store = InMemoryVectorStore(self.embeddings)
+                # Create empty vector index
+                self.vector_store = PartitionedVectorIndex(self.embeddings)
                 self.retriever = self.vector_store.as_retriever()
                 return
             
-            # Split documents if they're too long
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=50
-            )
-            split_docs = text_splitter.split_documents(documents)
+            split_docs = split_documents(documents)
             
-            # Use InMemoryVectorStore for simplicity and speed
-            self.vector_store = InMemoryVectorStore(self.embeddings)
+            # Contiguous embedding matrix with per-data_type row partitions
+            self.vector_store = PartitionedVectorIndex(self.embeddings)
             self.vector_store.add_documents(split_docs)
             
-            # Create retriever
-            self.retriever = self.vector_store.as_retriever(
-                search_kwargs={"k": 5}  # Return top 5 relevant documents
-            )
+            # Create retriever over all data types
+            self.retriever = self.vector_store.as_retriever(k=5)  # Return top 5 relevant documents
             
             logger.info(f"Vector store created with {len(split_docs)} document chunks for profile {self.profile_id}")
             
@@ -284,45 +445,24 @@ class ProfileRAGSystem:
     
     def _setup_dspy_analyzer(self):
         """Setup DSPy analyzer for structured financial analysis"""
-        try:
-            # Configure DSPy if API keys are available
-            if os.getenv("ANTHROPIC_API_KEY"):
-                lm = dspy.LM("anthropic/claude-3-5-sonnet-20241022", api_key=os.getenv("ANTHROPIC_API_KEY"))
-                dspy.configure(lm=lm)
-                
-                class FinancialAnalyzer(Module):
-                    def __init__(self):
-                        super().__init__()
-                        self.analyzer = dspy.ChainOfThought(FinancialDataAnalysisSignature)
-                    
-                    def forward(self, query: str, context_data: str) -> str:
-                        result = self.analyzer(query=query, context_data=context_data)
-                        return result.analysis_result
-                
-                self.dspy_analyzer = FinancialAnalyzer()
-                logger.info("DSPy financial analyzer configured with Anthropic")
-            elif os.getenv("OPENAI_API_KEY"):
-                lm = dspy.LM("openai/gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"))
-                dspy.configure(lm=lm)
-                
-                class FinancialAnalyzer(Module):
-                    def __init__(self):
-                        super().__init__()
-                        self.analyzer = dspy.ChainOfThought(FinancialDataAnalysisSignature)
-                    
-                    def forward(self, query: str, context_data: str) -> str:
-                        result = self.analyzer(query=query, context_data=context_data)
-                        return result.analysis_result
-                
-                self.dspy_analyzer = FinancialAnalyzer()
-                logger.info("DSPy financial analyzer configured with OpenAI")
-            else:
-                self.dspy_analyzer = None
-                logger.warning("DSPy analyzer not configured - no API key")
-                
-        except Exception as e:
-            logger.error(f"Failed to setup DSPy analyzer: {e}")
-            self.dspy_analyzer = None
+        self.dspy_analyzer = create_dspy_analyzer()
+    
+    def _search(self, query: str, data_type: Optional[str] = None, k: int = 5) -> List[Document]:
+        """
+        Hybrid BM25 and vector search, restricted to one data type's partition if given
+        
+        Args:
+            query: The question or query string
+            data_type: Partition to search ('accounts', 'transactions', ...); None searches all
+            k: Number of documents to return
+            
+        Returns:
+            Most relevant documents, best first
+        """
+        data_filter = dict(self._search_filter)
+        if data_type:
+            data_filter['data_type'] = data_type
+        return self.vector_store.hybrid_search(query, k=k, filter=data_filter or None)
     
     def _register_tools(self):
         """Register query tools for this profile's RAG system"""
@@ -335,12 +475,17 @@ class ProfileRAGSystem:
                 if accounts_df.empty:
                     return "No account information found for this profile."
                 
-                # Use retriever to find relevant account info
-                docs = self.retriever.invoke(f"accounts {query}")
+                # Exact answer for totals, balances and filters; no retrieval or LLM call
+                answer = self.query_planner.answer(query, 'accounts')
+                if answer:
+                    return answer
+                
+                # Search only the accounts partition
+                docs = self._search(query, 'accounts', k=3)
                 if not docs:
                     return "No relevant account information found."
                 
-                context = "\n".join([doc.page_content for doc in docs[:3]])
+                context = "\n".join([doc.page_content for doc in docs])
                 
                 # Use DSPy analyzer if available
                 if self.dspy_analyzer:
@@ -364,12 +509,17 @@ class ProfileRAGSystem:
                 if transactions_df.empty:
                     return "No transaction history found for this profile."
                 
-                # Use retriever to find relevant transactions
-                docs = self.retriever.invoke(f"transactions {query}")
+                # Exact answer for totals, balances and filters; no retrieval or LLM call
+                answer = self.query_planner.answer(query, 'transactions')
+                if answer:
+                    return answer
+                
+                # Search only the transactions partition
+                docs = self._search(query, 'transactions', k=5)
                 if not docs:
                     return "No relevant transactions found."
                 
-                context = "\n".join([doc.page_content for doc in docs[:5]])
+                context = "\n".join([doc.page_content for doc in docs])
                 
                 # Use DSPy analyzer if available
                 if self.dspy_analyzer:
@@ -392,11 +542,11 @@ class ProfileRAGSystem:
                 if demographics_df.empty:
                     return "No demographic information found for this profile."
                 
-                docs = self.retriever.invoke(f"demographics {query}")
+                docs = self._search(query, 'demographics', k=2)
                 if not docs:
                     return "No relevant demographic information found."
                 
-                context = "\n".join([doc.page_content for doc in docs[:2]])
+                context = "\n".join([doc.page_content for doc in docs])
                 return f"Profile information: {context}"
                 
             except Exception as e:
@@ -410,11 +560,16 @@ class ProfileRAGSystem:
                 if goals_df.empty:
                     return "No financial goals found for this profile."
                 
-                docs = self.retriever.invoke(f"goals {query}")
+                # Exact answer for totals, balances and filters; no retrieval or LLM call
+                answer = self.query_planner.answer(query, 'goals')
+                if answer:
+                    return answer
+                
+                docs = self._search(query, 'goals', k=3)
                 if not docs:
                     return "No relevant goals found."
                 
-                context = "\n".join([doc.page_content for doc in docs[:3]])
+                context = "\n".join([doc.page_content for doc in docs])
                 
                 if self.dspy_analyzer:
                     try:
@@ -436,11 +591,16 @@ class ProfileRAGSystem:
                 if investments_df.empty:
                     return "No investment information found for this profile."
                 
-                docs = self.retriever.invoke(f"investments {query}")
+                # Exact answer for totals, balances and filters; no retrieval or LLM call
+                answer = self.query_planner.answer(query, 'investments')
+                if answer:
+                    return answer
+                
+                docs = self._search(query, 'investments', k=3)
                 if not docs:
                     return "No relevant investment information found."
                 
-                context = "\n".join([doc.page_content for doc in docs[:3]])
+                context = "\n".join([doc.page_content for doc in docs])
                 
                 if self.dspy_analyzer:
                     try:
@@ -458,11 +618,11 @@ class ProfileRAGSystem:
         def query_all_data(query: str) -> str:
             """Query across all financial data for this profile"""
             try:
-                docs = self.retriever.invoke(query)
+                docs = self._search(query, k=5)
                 if not docs:
                     return "No relevant financial information found."
                 
-                context = "\n".join([doc.page_content for doc in docs[:5]])
+                context = "\n".join([doc.page_content for doc in docs])
                 
                 if self.dspy_analyzer:
                     try:
@@ -574,23 +734,158 @@ class ProfileRAGSystem:
             }
         
         if self.vector_store:
-            # Count documents in vector store
-            try:
-                # This is an approximation since InMemoryVectorStore doesn't expose count directly
-                test_docs = self.retriever.invoke("test", k=1000)  # Try to get many docs
-                summary['total_documents'] = len(test_docs)
-            except:
-                summary['total_documents'] = 0
+            rows = self.vector_store.rows_matching(self._search_filter)
+            summary['total_documents'] = len(self.vector_store) if rows is None else len(rows)
         
         return summary
 
 
+class SharedProfileIndex:
+    """
+    One vector index over every profile's data, built from a single parse of each CSV.
+    Rows are tagged with customer_id and data_type and filtered at query time.
+    
+    The index is saved to index_dir and, while the CSVs and embedding model are
+    unchanged, later instances load it (memory-mapped) instead of re-embedding.
+    When only some customers' data changed, the rest are copied from the previous index.
+    """
+    
+    def __init__(
+        self,
+        csv_data_dir: str,
+        index_dir: Optional[str] = None,
+        previous: Optional["SharedProfileIndex"] = None,
+        changed_profiles: Optional[Iterable[int]] = None
+    ):
+        """
+        Args:
+            csv_data_dir: Directory containing the CSV data files
+            index_dir: Where the built index is persisted; None keeps it in memory only
+            previous: Index built from earlier data, reused for customers not in changed_profiles
+            changed_profiles: Customers whose rows changed since previous. If None, every row is re-embedded.
+        """
+        self.csv_data_dir = csv_data_dir
+        self.index_dir = index_dir
+        self.frames: Dict[str, pd.DataFrame] = {}
+        # data_type -> customer_id -> that customer's rows
+        self._frames_by_customer: Dict[str, Dict[Any, pd.DataFrame]] = {}
+        self.loaded_from_disk = False
+        
+        start_time = time.time()
+        self.embeddings = create_embeddings() if previous is None else previous.embeddings
+        self._load_data()
+        self.category_names = load_category_names(csv_data_dir)
+        self.fingerprint = data_fingerprint(csv_data_dir, self.embeddings)
+        
+        if changed_profiles is None:
+            previous = None
+        self.vector_index = self._load_or_build_index(previous, changed_profiles)
+        self.dspy_analyzer = create_dspy_analyzer() if previous is None else previous.dspy_analyzer
+        
+        logger.info(
+            f"Shared RAG index {'loaded' if self.loaded_from_disk else 'built'} with "
+            f"{len(self.vector_index)} document chunks in {time.time() - start_time:.2f}s"
+        )
+    
+    def _load_or_build_index(
+        self,
+        previous: Optional["SharedProfileIndex"] = None,
+        changed_profiles: Optional[Iterable[int]] = None
+    ) -> PartitionedVectorIndex:
+        """Load the persisted index if it matches the current data, otherwise embed and save it"""
+        if self.index_dir:
+            index = PartitionedVectorIndex.load(self.index_dir, self.embeddings, fingerprint=self.fingerprint)
+            if index is not None:
+                self.loaded_from_disk = True
+                return index
+        
+        index = PartitionedVectorIndex(self.embeddings, partition_fields=('customer_id', 'data_type'))
+        if previous is not None:
+            self._add_from_previous(index, previous, sorted(changed_profiles))
+        else:
+            index.add_documents(split_documents(create_documents(self.frames, category_names=self.category_names)))
+        
+        if self.index_dir:
+            try:
+                index.save(self.index_dir, fingerprint=self.fingerprint)
+                logger.info(f"Saved shared RAG index to {self.index_dir}")
+            except OSError as e:
+                logger.warning(f"Could not persist shared RAG index to {self.index_dir}: {e}")
+        return index
+    
+    def _add_from_previous(self, index: PartitionedVectorIndex, previous: "SharedProfileIndex", changed: List[int]):
+        """Copy unchanged rows and their vectors from previous; embed only the changed customers' records"""
+        old = previous.vector_index
+        stale = old.rows_matching({'customer_id': changed})
+        kept = np.setdiff1d(np.arange(len(old)), stale, assume_unique=True)
+        index.add_documents([old.documents[row] for row in kept], vectors=old.matrix[kept])
+        
+        changed_frames = {
+            data_type: df[df['customer_id'].isin(changed)]
+            for data_type, df in self.frames.items()
+            if 'customer_id' in df.columns
+        }
+        added = split_documents(create_documents(changed_frames, category_names=self.category_names))
+        index.add_documents(added)
+        logger.info(f"Reused {len(kept)} indexed chunks; embedded {len(added)} for profiles {changed}")
+    
+    def _load_data(self):
+        """Parse each CSV once for all profiles"""
+        for data_type, filename in CSV_FILES.items():
+            csv_path = Path(self.csv_data_dir) / filename
+            if not csv_path.exists():
+                logger.warning(f"CSV file not found: {csv_path}")
+                self.frames[data_type] = pd.DataFrame()
+                continue
+            
+            self.frames[data_type] = pd.read_csv(csv_path)
+            logger.info(f"Loaded {len(self.frames[data_type])} {data_type} records for all profiles")
+        
+        # transaction.csv has no customer_id; attribute rows through account.csv
+        # so they aren't tagged SHARED_RECORDS and visible to every profile
+        attribute_to_customers(self.frames)
+        
+        for data_type, df in self.frames.items():
+            if 'customer_id' in df.columns:
+                self._frames_by_customer[data_type] = {
+                    customer_id: group for customer_id, group in df.groupby('customer_id')
+                }
+    
+    def profile_frames(self, profile_id: int) -> Dict[str, pd.DataFrame]:
+        """Each data type's rows for a profile; files without customer_id are shared by all"""
+        frames = {}
+        for data_type, df in self.frames.items():
+            by_customer = self._frames_by_customer.get(data_type)
+            if by_customer is None:
+                frames[data_type] = df
+            else:
+                frames[data_type] = by_customer.get(profile_id, df.iloc[0:0])
+        return frames
+
+
 class ProfileRAGManager:
     """Manager for multiple profile RAG systems"""
     
-    def __init__(self, csv_data_dir: str):
+    def __init__(self, csv_data_dir: str, index_dir: Optional[str] = None):
+        """
+        Args:
+            csv_data_dir: Directory containing the CSV data files
+            index_dir: Where the shared index is persisted; defaults to RAG_INDEX_DIR
+                or a .rag_index directory inside csv_data_dir
+        """
         self.csv_data_dir = csv_data_dir
+        self.index_dir = index_dir or os.getenv("RAG_INDEX_DIR") or str(Path(csv_data_dir) / INDEX_DIR_NAME)
         self.profile_systems: Dict[int, ProfileRAGSystem] = {}
+        self.shared_index: Optional[SharedProfileIndex] = None
+        # Last index built and the customers changed since; None means rebuild everything
+        self._previous_index: Optional[SharedProfileIndex] = None
+        self._changed_profiles: Optional[set] = None
+        # Bumped by every invalidation; a build started under an older generation is discarded
+        self._generation = 0
+        self._build: Optional[Future] = None
+        self._build_generation = -1
+        self._lock = threading.Lock()
+        self._build_thread: Optional[threading.Thread] = None
         
         # Load available profile IDs from CSV data
         self._discover_profiles()
@@ -613,13 +908,123 @@ class ProfileRAGManager:
             logger.error(f"Error discovering profiles: {e}")
             return [1, 2, 3]
     
+    def get_shared_index(self) -> SharedProfileIndex:
+        """Get the index shared by every profile, loading or building it on first use.
+        
+        The build runs outside the lock so invalidations and profiles served from an
+        existing index never wait for it; concurrent callers share one build.
+        """
+        while True:
+            with self._lock:
+                if self.shared_index is not None:
+                    return self.shared_index
+                build = self._build
+                owner = build is None or self._build_generation != self._generation
+                if owner:
+                    build = self._build = Future()
+                    generation = self._build_generation = self._generation
+                    previous, changed_profiles = self._previous_index, self._changed_profiles
+            
+            if not owner:
+                build.result()
+                continue
+            
+            try:
+                index = SharedProfileIndex(
+                    self.csv_data_dir,
+                    index_dir=self.index_dir,
+                    previous=previous,
+                    changed_profiles=changed_profiles
+                )
+            except Exception as e:
+                with self._lock:
+                    if self._build is build:
+                        self._build = None
+                build.set_exception(e)
+                raise
+            
+            with self._lock:
+                if self._generation == generation:
+                    self.shared_index = index
+                    self._previous_index = None
+                    self._changed_profiles = None
+                    # Systems kept through an invalidation move to the new index
+                    for system in self.profile_systems.values():
+                        system._attach_shared_index(index)
+                if self._build is build:
+                    self._build = None
+            build.set_result(index)
+    
+    def start_background_build(self) -> threading.Thread:
+        """Load or build the shared index in a background thread so the first query does not pay for it"""
+        with self._lock:
+            if self._build_thread is None or not self._build_thread.is_alive():
+                self._build_thread = threading.Thread(
+                    target=self._build_in_background, name="rag-index-build", daemon=True
+                )
+                self._build_thread.start()
+            return self._build_thread
+    
+    def _build_in_background(self):
+        try:
+            self.get_shared_index()
+        except Exception as e:
+            logger.error(f"Background RAG index build failed: {e}")
+    
+    def is_index_ready(self) -> bool:
+        """Whether the shared index is loaded and queries will not wait for a build"""
+        return self.shared_index is not None
+    
     def get_profile_system(self, profile_id: int) -> ProfileRAGSystem:
         """Get or create RAG system for a profile"""
-        if profile_id not in self.profile_systems:
-            logger.info(f"Creating RAG system for profile {profile_id}")
-            self.profile_systems[profile_id] = ProfileRAGSystem(profile_id, self.csv_data_dir)
+        system = self.profile_systems.get(profile_id)
+        while system is None:
+            shared_index = self.get_shared_index()
+            with self._lock:
+                system = self.profile_systems.get(profile_id)
+                # Only cache systems on the current index; if it was invalidated meanwhile, wait for the next
+                if system is None and self.shared_index is shared_index:
+                    logger.info(f"Creating RAG system for profile {profile_id}")
+                    system = ProfileRAGSystem(profile_id, self.csv_data_dir, shared_index=shared_index)
+                    self.profile_systems[profile_id] = system
         
-        return self.profile_systems[profile_id]
+        return system
+    
+    def invalidate_profiles(self, profile_ids: Optional[Iterable[int]] = None) -> List[int]:
+        """Drop the RAG systems of changed profiles and mark the shared index for rebuilding.
+        
+        The next build re-embeds only the changed profiles' records and copies every
+        other row from the current index. Unchanged profiles keep answering from the
+        current index until then.
+        
+        Args:
+            profile_ids: Profiles whose data changed. If None, every profile.
+            
+        Returns:
+            IDs of the RAG systems that were dropped
+        """
+        with self._lock:
+            if profile_ids is None:
+                dropped = list(self.profile_systems.keys())
+                self.profile_systems.clear()
+                self._previous_index = None
+                self._changed_profiles = None
+            else:
+                profile_ids = set(profile_ids)
+                dropped = [profile_id for profile_id in self.profile_systems if profile_id in profile_ids]
+                for profile_id in dropped:
+                    del self.profile_systems[profile_id]
+                if self.shared_index is not None:
+                    # Changes since the last build accumulate until the next one
+                    self._previous_index = self.shared_index
+                    self._changed_profiles = set()
+                if self._previous_index is not None:
+                    self._changed_profiles |= profile_ids
+            self.shared_index = None
+            self._generation += 1
+        if dropped:
+            logger.info(f"Invalidated RAG systems for profiles {dropped}")
+        return dropped
     
     def query_profile(self, profile_id: int, query: str, tool_name: Optional[str] = None) -> str:
         """Query a specific profile's RAG system"""
@@ -0,0 +1,189 @@
+"""
+Semantic cache for RAG query results.
+Reworded questions ("what are my balances" / "show account balances") miss
+exact-key caches. Each profile and query type keeps a small matrix of the
+normalized embeddings of previously answered queries; a new query is
+answered from the most similar entry when its cosine similarity clears the
+threshold. Entries are tied to the profile's data version and dropped as
+soon as it changes.
+
+Aggregate questions the structured planner answers exactly are never cached
+here: "spending in July" and "spending in June" embed almost identically but
+have different answers.
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .abstractions import RAGQuery, RAGResult, QueryType
+from .structured_queries import StructuredQueryPlanner
+from .vector_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+DEFAULT_ENTRIES_PER_PROFILE = 256
+
+
+@dataclass
+class _QueryBucket:
+    """Previously answered queries for one profile and query type"""
+    data_version: Any
+    matrix: np.ndarray
+    results: List[Optional[RAGResult]]
+    expires_at: np.ndarray
+    count: int = 0
+    cursor: int = 0
+
+    @classmethod
+    def empty(cls, data_version: Any, capacity: int, dimensions: int) -> "_QueryBucket":
+        return cls(
+            data_version=data_version,
+            matrix=np.zeros((capacity, dimensions), dtype=np.float32),
+            results=[None] * capacity,
+            expires_at=np.zeros(capacity, dtype=np.float64)
+        )
+
+
+class SemanticRAGCache:
+    """Nearest-neighbour cache of RAG results keyed by query embedding."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        similarity_threshold: Optional[float] = None,
+        max_entries_per_profile: int = DEFAULT_ENTRIES_PER_PROFILE,
+        default_ttl: int = 300
+    ):
+        """
+        Args:
+            embeddings: Embedding model for query texts; the RAG retriever embeds the
+                same text, so with a caching embedding model the lookup costs no extra call
+            similarity_threshold: Minimum cosine similarity for a hit (env
+                RAG_SEMANTIC_CACHE_THRESHOLD, default 0.92)
+            max_entries_per_profile: Queries kept per profile and query type; the
+                oldest is overwritten when full
+            default_ttl: Seconds an entry can be served
+        """
+        if similarity_threshold is None:
+            similarity_threshold = float(os.getenv("RAG_SEMANTIC_CACHE_THRESHOLD", DEFAULT_SIMILARITY_THRESHOLD))
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_profile = max_entries_per_profile
+        self.default_ttl = default_ttl
+        self._buckets: Dict[Tuple[int, QueryType], _QueryBucket] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def accepts(query: RAGQuery) -> bool:
+        """Whether a query may be answered from, and stored in, the cache."""
+        data_type = query.query_type.value.replace('query_', '', 1)
+        return not StructuredQueryPlanner.is_aggregate(query.query_text, data_type)
+
+    async def embed(self, query_text: str) -> np.ndarray:
+        """Normalized embedding of a query text."""
+        vector = await self.embeddings.aembed_query(query_text.strip())
+        return normalize_rows(vector)[0]
+
+    def lookup(
+        self,
+        profile_id: int,
+        query: RAGQuery,
+        vector: np.ndarray,
+        data_version: Any = ""
+    ) -> Optional[RAGResult]:
+        """
+        Cached result of the most similar earlier query, if similar enough.
+
+        Args:
+            profile_id: Profile the query is for
+            query: The query; only earlier queries of the same type are considered
+            vector: Output of embed() for the query text
+            data_version: The profile's current data version
+
+        Returns:
+            The cached result re-labelled with this query, or None
+        """
+        with self._lock:
+            key = (profile_id, query.query_type)
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket.data_version != data_version:
+                # Answers computed from the profile's previous data
+                del self._buckets[key]
+                bucket = None
+            if bucket is None:
+                self._misses += 1
+                return None
+
+            scores = bucket.matrix[:bucket.count] @ vector
+            scores[bucket.expires_at[:bucket.count] < time.time()] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            cached = bucket.results[best]
+        logger.debug(f"Semantic cache hit for {query.query_type.value} (similarity {scores[best]:.3f})")
+        return replace(cached, query=query)
+
+    def store(
+        self,
+        profile_id: int,
+        query: RAGQuery,
+        vector: np.ndarray,
+        result: RAGResult,
+        data_version: Any = "",
+        ttl_seconds: Optional[int] = None
+    ) -> None:
+        """Remember a successful result for later similar queries."""
+        expires_at = time.time() + (ttl_seconds or self.default_ttl)
+        key = (profile_id, query.query_type)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.data_version != data_version or bucket.matrix.shape[1] != len(vector):
+                # First entry, or the profile's data changed since the bucket was filled
+                bucket = _QueryBucket.empty(data_version, self.max_entries_per_profile, len(vector))
+                self._buckets[key] = bucket
+
+            slot = bucket.cursor
+            bucket.matrix[slot] = vector
+            bucket.results[slot] = result
+            bucket.expires_at[slot] = expires_at
+            bucket.cursor = (slot + 1) % self.max_entries_per_profile
+            bucket.count = min(bucket.count + 1, self.max_entries_per_profile)
+
+    def invalidate(self, profile_id: Optional[int] = None) -> int:
+        """
+        Drop cached queries for one profile, or for all profiles if None.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._buckets if profile_id is None or key[0] == profile_id]
+            removed = sum(self._buckets.pop(key).count for key in keys)
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total_requests = self._hits + self._misses
+        with self._lock:
+            entries = sum(bucket.count for bucket in self._buckets.values())
+        return {
+            'backend': 'semantic',
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / total_requests if total_requests > 0 else 0,
+            'total_entries': entries,
+            'similarity_threshold': self.similarity_threshold
+        }
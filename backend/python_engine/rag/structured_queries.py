@@ -0,0 +1,302 @@
+"""
+Structured fast path for aggregate questions in RAG tools.
+Balances, spending totals, goal targets and portfolio values are exact
+columnar computations over the profile's DataFrames; answering them with
+group-bys and sums takes milliseconds, where top-k retrieval plus an LLM
+call takes seconds and can only see a handful of records. The planner only
+accepts questions it recognizes as aggregates or filters and returns None
+for open-ended ones, which go through retrieval as before.
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_FILE = "category.csv"
+
+# Account types whose balances are owed rather than held
+LIABILITY_ACCOUNT_TYPES = {'credit_card', 'mortgage', 'loan', 'student_loan', 'auto_loan'}
+
+# Questions asking for judgement rather than numbers
+OPEN_ENDED = re.compile(
+    r"\b(why|should|recommend\w*|advice|advise|suggest\w*|afford|improve|optimi[sz]e|"
+    r"strategy|plan|better|worse|compare|explain|analy[sz]e|tips?)\b"
+)
+ACCOUNT_AGGREGATE = re.compile(r"\b(balances?|how much|total|net worth|list|all (my )?accounts|what accounts)\b")
+TRANSACTION_AGGREGATE = re.compile(
+    r"\b(total|sum|how much|spent|spend|spending|expenses?|income|earn\w*|how many|count|"
+    r"average|avg|biggest|largest|top categor\w*|by category|breakdown)\b"
+)
+GOAL_AGGREGATE = re.compile(r"\b(goals?|targets?|progress|how much)\b")
+INVESTMENT_AGGREGATE = re.compile(r"\b(portfolio|total|worth|value|holdings?|how much|gains?|loss(es)?)\b")
+AGGREGATE_PATTERNS = {
+    'accounts': ACCOUNT_AGGREGATE,
+    'transactions': TRANSACTION_AGGREGATE,
+    'goals': GOAL_AGGREGATE,
+    'investments': INVESTMENT_AGGREGATE
+}
+
+# Money moved between the customer's own accounts, or a starting balance; neither
+# is income or spending, so aggregates skip them unless the question names them
+NON_FLOW_CATEGORIES = {
+    'opening_balance', 'transfer', 'brokerage_transfer', 'credit_card_payment',
+    'mortgage_principal', 'student_loan_principal', 'auto_loan_principal'
+}
+
+MONTHS = {
+    name: number for number, name in enumerate(
+        ["january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"], start=1
+    )
+}
+
+
+def load_category_names(csv_data_dir: str) -> Dict[int, str]:
+    """category_id -> category name from category.csv, empty if it is missing"""
+    path = Path(csv_data_dir) / CATEGORY_FILE
+    if not path.exists():
+        return {}
+    try:
+        df = pd.read_csv(path)
+        return dict(zip(df['category_id'].astype(int), df['name'].astype(str)))
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Could not read category names from {path}: {e}")
+        return {}
+
+
+def _money(value: float) -> str:
+    return f"-${abs(value):,.2f}" if value < 0 else f"${value:,.2f}"
+
+
+@dataclass
+class DateRange:
+    """Inclusive start, exclusive end"""
+    start: pd.Timestamp
+    end: pd.Timestamp
+    label: str
+
+
+class StructuredQueryPlanner:
+    """Answers aggregate questions about one profile with DataFrame operations."""
+
+    def __init__(
+        self,
+        profile_data: Dict[str, pd.DataFrame],
+        category_names: Optional[Dict[int, str]] = None,
+        reference_date: Optional[pd.Timestamp] = None
+    ):
+        """
+        Args:
+            profile_data: data_type -> the profile's records, as in ProfileRAGSystem.profile_data
+            category_names: category_id -> name, for transactions that only carry an id
+            reference_date: What "this month" and "last 30 days" are relative to;
+                defaults to the latest transaction, since the data is a snapshot
+        """
+        self.accounts = profile_data.get('accounts', pd.DataFrame())
+        self.goals = profile_data.get('goals', pd.DataFrame())
+        self.investments = profile_data.get('investments', pd.DataFrame())
+        self.transactions = self._prepare_transactions(profile_data.get('transactions', pd.DataFrame()), category_names or {})
+        # Every known category, so a question naming one this profile never used isn't read as unfiltered
+        self.category_vocabulary = {name.lower() for name in (category_names or {}).values()}
+        if not self.transactions.empty:
+            self.category_vocabulary.update(self.transactions['_category'].unique())
+        if reference_date is None and not self.transactions.empty:
+            reference_date = self.transactions['_date'].max()
+        self.reference_date = pd.Timestamp(reference_date) if reference_date is not None else pd.Timestamp.now()
+
+    def _prepare_transactions(self, df: pd.DataFrame, category_names: Dict[int, str]) -> pd.DataFrame:
+        """The profile's transactions with parsed dates and category names"""
+        if df.empty or 'amount' not in df.columns:
+            return pd.DataFrame()
+        # Transaction files without customer_id are shared; keep rows for this profile's accounts
+        if 'customer_id' not in df.columns and 'account_id' in df.columns and 'account_id' in self.accounts.columns:
+            df = df[df['account_id'].isin(self.accounts['account_id'])]
+
+        if 'category' in df.columns:
+            categories = df['category'].astype(str)
+        elif 'category_id' in df.columns:
+            categories = df['category_id'].map(category_names).fillna('uncategorized')
+        else:
+            categories = pd.Series('uncategorized', index=df.index)
+        date_column = next((c for c in ('timestamp', 'date') if c in df.columns), None)
+        return df.assign(
+            _date=pd.to_datetime(df[date_column], errors='coerce') if date_column else pd.NaT,
+            _category=categories.str.lower(),
+            _amount=pd.to_numeric(df['amount'], errors='coerce').fillna(0.0)
+        )
+
+    def answer(self, query: str, data_type: Optional[str]) -> Optional[str]:
+        """
+        Exact answer to an aggregate question about one data type.
+
+        Args:
+            query: The user's question
+            data_type: The tool's data type ('accounts', 'transactions', 'goals', 'investments')
+
+        Returns:
+            The answer, or None if the question needs retrieval
+        """
+        if not self.is_aggregate(query, data_type):
+            return None
+        text = query.lower()
+        handler = {
+            'accounts': self._answer_accounts,
+            'transactions': self._answer_transactions,
+            'goals': self._answer_goals,
+            'investments': self._answer_investments
+        }[data_type]
+        try:
+            return handler(text)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Structured answer for {data_type} failed, falling back to retrieval: {e}")
+            return None
+
+    @staticmethod
+    def is_aggregate(query: str, data_type: Optional[str]) -> bool:
+        """Whether a question is one answer() computes exactly rather than leaving to retrieval"""
+        text = query.lower()
+        pattern = AGGREGATE_PATTERNS.get(data_type)
+        return pattern is not None and not OPEN_ENDED.search(text) and pattern.search(text) is not None
+
+    def _answer_accounts(self, text: str) -> Optional[str]:
+        df = self.accounts
+        if df.empty or 'balance' not in df.columns:
+            return None
+        if 'account_type' in df.columns:
+            mentioned = [t for t in df['account_type'].dropna().unique() if self.mentions(text, str(t).replace('_', ' '))]
+            if mentioned:
+                df = df[df['account_type'].isin(mentioned)]
+
+        balances = pd.to_numeric(df['balance'], errors='coerce').fillna(0.0)
+        lines = []
+        for row, balance in zip(df.to_dict('records'), balances):
+            account_type = str(row.get('account_type', 'account')).replace('_', ' ').title()
+            lines.append(f"- {account_type} {row.get('account_number', '')} at {row.get('institution_name', 'Unknown')}: {_money(balance)}")
+
+        if 'account_type' in df.columns:
+            liability = df['account_type'].isin(LIABILITY_ACCOUNT_TYPES)
+        else:
+            liability = pd.Series(False, index=df.index)
+        assets = balances[~liability].sum()
+        debts = balances[liability].abs().sum()
+        lines.append(f"Total assets: {_money(assets)}; total debts: {_money(debts)}; net: {_money(assets - debts)}")
+        return f"Account balances ({len(df)} accounts):\n" + "\n".join(lines)
+
+    def _answer_transactions(self, text: str) -> Optional[str]:
+        df = self.transactions
+        if df.empty:
+            return None
+
+        categories = sorted(c for c in self.category_vocabulary if self.mentions(text, c.replace('_', ' ')))
+        if categories:
+            df = df[df['_category'].isin(categories)]
+        else:
+            df = df[~df['_category'].isin(NON_FLOW_CATEGORIES)]
+        date_range = self.date_range(text)
+        if date_range is not None:
+            df = df[(df['_date'] >= date_range.start) & (df['_date'] < date_range.end)]
+
+        scope = " on " + ", ".join(categories) if categories else ""
+        scope += f" {date_range.label}" if date_range is not None else ""
+        wants_income = re.search(r"\b(income|earn\w*|deposits?|paid me)\b", text) is not None
+        if categories and not df.empty and (df['_amount'] > 0).all():
+            # Income categories such as salary or dividend
+            wants_income = True
+        flows = df[df['_amount'] > 0] if wants_income else df[df['_amount'] < 0]
+        amounts = flows['_amount'].abs()
+        kind = "income" if wants_income else "spending"
+
+        if flows.empty:
+            return f"No {kind}{scope} found."
+        if re.search(r"\b(how many|count)\b", text):
+            return f"{len(flows)} {kind} transactions{scope}, totalling {_money(amounts.sum())}."
+        if re.search(r"\b(biggest|largest)\b", text):
+            top = flows.loc[amounts.nlargest(3).index]
+            lines = [f"- {_money(abs(r['_amount']))} on {r['_date']:%Y-%m-%d}: {r.get('description', '')} ({r['_category']})" for r in top.to_dict('records')]
+            return f"Largest {kind}{scope}:\n" + "\n".join(lines)
+        if re.search(r"\b(average|avg)\b", text):
+            return f"Average {kind} transaction{scope}: {_money(amounts.mean())} over {len(flows)} transactions."
+
+        answer = f"Total {kind}{scope}: {_money(amounts.sum())} across {len(flows)} transactions."
+        if not categories:
+            by_category = amounts.groupby(flows['_category']).sum().nlargest(5)
+            answer += "\nBy category: " + ", ".join(f"{name} {_money(total)}" for name, total in by_category.items())
+        return answer
+
+    def _answer_goals(self, text: str) -> Optional[str]:
+        df = self.goals
+        if df.empty or 'target_amount' not in df.columns:
+            return None
+        lines = []
+        for row in df.to_dict('records'):
+            name = row.get('name') or str(row.get('goal_type', 'Goal')).title()
+            target = float(row['target_amount'])
+            line = f"- {name}: target {_money(target)} by {row.get('target_date', 'no deadline')}"
+            if pd.notna(row.get('current_amount')):
+                current = float(row['current_amount'])
+                progress = current / target * 100 if target > 0 else 0
+                line += f", saved {_money(current)} ({progress:.1f}%)"
+            lines.append(line)
+        total = pd.to_numeric(df['target_amount'], errors='coerce').sum()
+        return f"Financial goals ({len(df)}, {_money(total)} in total targets):\n" + "\n".join(lines)
+
+    def _answer_investments(self, text: str) -> Optional[str]:
+        df = self.investments
+        if df.empty or 'current_value' not in df.columns:
+            return None
+        value = pd.to_numeric(df['current_value'], errors='coerce').fillna(0.0)
+        answer = f"Portfolio value: {_money(value.sum())} across {len(df)} holdings."
+        if 'purchase_price' in df.columns:
+            cost = pd.to_numeric(df['purchase_price'], errors='coerce').fillna(0.0).sum()
+            gain = value.sum() - cost
+            answer += f" Gain/loss: {_money(gain)} ({gain / cost * 100 if cost else 0:+.2f}%)."
+        if 'symbol' in df.columns:
+            top = value.groupby(df['symbol']).sum().nlargest(5)
+            answer += "\nLargest holdings: " + ", ".join(f"{symbol} {_money(v)}" for symbol, v in top.items())
+        return answer
+
+    def date_range(self, text: str) -> Optional[DateRange]:
+        """Date filter named in the question, relative to the reference date"""
+        today = self.reference_date.normalize()
+        month_start = today.replace(day=1)
+
+        if "last month" in text or "previous month" in text:
+            start = month_start - pd.DateOffset(months=1)
+            return DateRange(start, month_start, f"in {start:%B %Y}")
+        if "this month" in text:
+            return DateRange(month_start, today + pd.Timedelta(days=1), f"in {month_start:%B %Y}")
+        match = re.search(r"\b(?:last|past) (\d+) days\b", text)
+        if match:
+            days = int(match.group(1))
+            return DateRange(today - pd.Timedelta(days=days - 1), today + pd.Timedelta(days=1), f"in the last {days} days")
+        if "last week" in text or "past week" in text:
+            return DateRange(today - pd.Timedelta(days=6), today + pd.Timedelta(days=1), "in the last 7 days")
+        if "this year" in text:
+            start = today.replace(month=1, day=1)
+            return DateRange(start, today + pd.Timedelta(days=1), f"in {start.year}")
+        if "last year" in text:
+            start = today.replace(year=today.year - 1, month=1, day=1)
+            return DateRange(start, start + pd.DateOffset(years=1), f"in {start.year}")
+
+        match = re.search(r"\b(" + "|".join(MONTHS) + r")\b(?:\s+(\d{4}))?", text)
+        if match and not (match.group(1) == "may" and match.group(2) is None):
+            month = MONTHS[match.group(1)]
+            year = int(match.group(2)) if match.group(2) else (today.year if month <= today.month else today.year - 1)
+            start = pd.Timestamp(year=year, month=month, day=1)
+            return DateRange(start, start + pd.DateOffset(months=1), f"in {start:%B %Y}")
+        return None
+
+    @staticmethod
+    def mentions(text: str, name: str) -> bool:
+        """Whether the question names a category or account type, allowing plurals ('groceries')"""
+        name = name.lower().strip()
+        if not name:
+            return False
+        stem = name[:-1] if name.endswith('y') else name
+        return re.search(r"\b" + re.escape(stem), text) is not None
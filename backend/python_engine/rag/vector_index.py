@@ -0,0 +1,373 @@
+"""
+Matrix-backed vector index for profile RAG.
+Normalized float32 embeddings live in one contiguous matrix; metadata fields
+such as data_type are indexed into row partitions so a search only scores
+the rows that match its filter, with one matrix-vector product and an
+argpartition top-k. A BM25 index over the same rows backs hybrid search,
+which fuses lexical and vector rankings. Indexes can be saved to a
+directory and loaded back with the embedding matrix memory-mapped.
+"""
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from .lexical_index import BM25Index
+
+logger = logging.getLogger(__name__)
+
+# Metadata fields indexed into row partitions by default
+DEFAULT_PARTITION_FIELDS = ("data_type",)
+
+# On-disk layout of a saved index
+INDEX_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+DOCUMENTS_FILE = "documents.jsonl"
+
+# Reciprocal rank fusion damping constant; 60 is the value from the original RRF paper
+RRF_K = 60
+# Each ranking contributes this many candidates per requested result to fusion
+FUSION_DEPTH_FACTOR = 4
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class PartitionedVectorIndex:
+    """Exact cosine-similarity index with metadata prefiltering."""
+
+    def __init__(self, embeddings: Embeddings, partition_fields: Sequence[str] = DEFAULT_PARTITION_FIELDS):
+        """
+        Args:
+            embeddings: Embedding model for documents and queries
+            partition_fields: Metadata fields that searches can filter on
+        """
+        self.embeddings = embeddings
+        self.partition_fields = tuple(partition_fields)
+        self.documents: List[Document] = []
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        # field -> value -> sorted row indices
+        self.partitions: Dict[str, Dict[Any, np.ndarray]] = {field: {} for field in self.partition_fields}
+        # Lexical index over the same rows, for hybrid search
+        self.lexical = BM25Index()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def add_documents(self, documents: List[Document], vectors: Optional[np.ndarray] = None) -> None:
+        """
+        Embed and append documents.
+
+        Args:
+            documents: Documents to index
+            vectors: Precomputed embeddings, one row per document; embedded if omitted
+        """
+        if not documents:
+            return
+        if vectors is None:
+            vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        vectors = normalize_rows(vectors)
+        if len(vectors) != len(documents):
+            raise ValueError(f"Got {len(vectors)} embeddings for {len(documents)} documents")
+
+        start = len(self.documents)
+        self.matrix = vectors if start == 0 else np.vstack([self.matrix, vectors])
+        self.documents.extend(documents)
+
+        self._index_partitions(documents, start)
+        self.lexical.add_documents(doc.page_content for doc in documents)
+
+    def _index_partitions(self, documents: List[Document], start: int) -> None:
+        """Add rows start.. for documents to the metadata partitions."""
+        for field in self.partition_fields:
+            new_rows: Dict[Any, List[int]] = {}
+            for offset, doc in enumerate(documents):
+                if field in doc.metadata:
+                    new_rows.setdefault(doc.metadata[field], []).append(start + offset)
+            for value, rows in new_rows.items():
+                existing = self.partitions[field].get(value)
+                rows = np.asarray(rows, dtype=np.int64)
+                self.partitions[field][value] = rows if existing is None else np.concatenate([existing, rows])
+
+    def rows_matching(self, filter: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+        """
+        Row indices matching every filter field, or None for all rows.
+        A list of values for a field matches any of them.
+
+        Raises:
+            ValueError: If filtering on a field that is not partitioned
+        """
+        if not filter:
+            return None
+        rows = None
+        for field, value in filter.items():
+            if field not in self.partitions:
+                raise ValueError(f"Cannot filter on unindexed metadata field '{field}'")
+            matches = self._partition_rows(field, value)
+            rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+            if len(rows) == 0:
+                break
+        return rows
+
+    def _partition_rows(self, field: str, value: Any) -> np.ndarray:
+        empty = np.empty(0, dtype=np.int64)
+        if isinstance(value, (list, tuple, set)):
+            parts = [self.partitions[field].get(v, empty) for v in value]
+            return np.unique(np.concatenate(parts)) if parts else empty
+        return self.partitions[field].get(value, empty)
+
+    def search_by_vector(
+        self,
+        query_vector: Iterable[float],
+        k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Top-k documents by cosine similarity among rows matching the filter."""
+        rows = self.rows_matching(filter)
+        if len(self.documents) == 0 or (rows is not None and len(rows) == 0) or k <= 0:
+            return []
+
+        positions, scores = self._top_rows(query_vector, k, rows)
+        return [(self.documents[pos], float(score)) for pos, score in zip(positions, scores)]
+
+    def _top_rows(self, query_vector: Iterable[float], k: int, rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Row positions and scores of the k most similar rows among rows (all if None), best first."""
+        query = normalize_rows(np.asarray(list(query_vector), dtype=np.float32))[0]
+        candidates = self.matrix if rows is None else self.matrix[rows]
+        scores = candidates @ query
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        positions = top if rows is None else rows[top]
+        return positions, scores[top]
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Embed the query and search."""
+        if len(self.documents) == 0:
+            return []
+        return self.search_by_vector(self.embeddings.embed_query(query), k=k, filter=filter)
+
+    def similarity_search(self, query: str, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        rrf_k: int = RRF_K
+    ) -> List[Document]:
+        """
+        Fuse BM25 and vector rankings of the rows matching the filter with
+        reciprocal rank fusion: each row scores sum(1 / (rrf_k + rank)).
+        
+        Falls back to the lexical ranking alone when the query can't be embedded
+        or every candidate gets the same vector score (e.g. placeholder embeddings).
+        """
+        rows = self.rows_matching(filter)
+        if len(self.documents) == 0 or (rows is not None and len(rows) == 0) or k <= 0:
+            return []
+        depth = max(k * FUSION_DEPTH_FACTOR, 20)
+
+        rankings = [[row for row, _ in self.lexical.search(query, k=depth, rows=rows)]]
+        try:
+            positions, scores = self._top_rows(self.embeddings.embed_query(query), depth, rows)
+            if len(scores) < 2 or scores[0] - scores[-1] > 1e-6 or not rankings[0]:
+                rankings.append(positions.tolist())
+        except Exception as e:
+            logger.warning(f"Vector ranking unavailable, using lexical results only: {e}")
+
+        fused: Dict[int, float] = {}
+        for ranking in rankings:
+            for rank, row in enumerate(ranking, start=1):
+                fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank)
+        best = sorted(fused, key=lambda row: (-fused[row], row))[:k]
+        return [self.documents[row] for row in best]
+
+    def as_retriever(self, k: int = 5, filter: Optional[Dict[str, Any]] = None) -> "PartitionedIndexRetriever":
+        return PartitionedIndexRetriever(index=self, k=k, filter=filter or {})
+
+    def save(self, directory: str, fingerprint: str = "") -> None:
+        """
+        Write vectors, document texts and metadata to a directory, replacing any previous index.
+
+        The directory is a symlink to a versioned sibling directory; saving writes a
+        new version and atomically repoints the link, so concurrent load() calls
+        always find a complete index.
+
+        Args:
+            directory: Target directory
+            fingerprint: Identifies the source data and embedding model; load() only
+                accepts an index saved with the same fingerprint
+        """
+        target = Path(directory)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        version_dir = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}-v-"))
+        link = None
+        try:
+            np.save(version_dir / VECTORS_FILE, self.matrix)
+            with open(version_dir / DOCUMENTS_FILE, "w") as f:
+                for doc in self.documents:
+                    f.write(json.dumps({"page_content": doc.page_content, "metadata": doc.metadata}) + "\n")
+            # The manifest is written last; a directory without one is incomplete
+            with open(version_dir / MANIFEST_FILE, "w") as f:
+                json.dump({
+                    "format_version": INDEX_FORMAT_VERSION,
+                    "fingerprint": fingerprint,
+                    "count": len(self.documents),
+                    "dimensions": int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0,
+                    "partition_fields": list(self.partition_fields)
+                }, f)
+
+            previous = target.resolve() if target.is_symlink() else None
+            if target.exists() and not target.is_symlink():
+                # Index saved as a plain directory by an older version; replaced once
+                legacy = target.with_name(f".{target.name}-old-{os.getpid()}")
+                os.replace(target, legacy)
+                shutil.rmtree(legacy, ignore_errors=True)
+
+            # Renaming a fresh link over the old one swaps versions in a single step
+            link = target.with_name(f".{target.name}-link-{os.getpid()}")
+            if link.is_symlink():
+                link.unlink()
+            os.symlink(version_dir.name, link, target_is_directory=True)
+            os.replace(link, target)
+            link = None
+            if previous is not None and previous != version_dir:
+                shutil.rmtree(previous, ignore_errors=True)
+        except BaseException:
+            if link is not None and link.is_symlink():
+                link.unlink()
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        embeddings: Embeddings,
+        fingerprint: Optional[str] = None,
+        mmap: bool = True
+    ) -> Optional["PartitionedVectorIndex"]:
+        """
+        Load a saved index.
+
+        Args:
+            directory: Directory written by save()
+            embeddings: Embedding model used for queries
+            fingerprint: If given, the saved index must have been built with it
+            mmap: Memory-map the embedding matrix instead of reading it into memory
+
+        Returns:
+            The index, or None if it is missing, incomplete, outdated or unreadable
+        """
+        path = Path(directory)
+        for attempt in range(2):
+            # Resolve the link once so every file comes from the same saved version
+            version_dir = path.resolve()
+            try:
+                return cls._load_version(version_dir, embeddings, fingerprint, mmap)
+            except FileNotFoundError:
+                # A concurrent save() can remove the version resolved above; retry the new one
+                if path.resolve() == version_dir:
+                    return None
+        return None
+
+    @classmethod
+    def _load_version(
+        cls,
+        path: Path,
+        embeddings: Embeddings,
+        fingerprint: Optional[str],
+        mmap: bool
+    ) -> Optional["PartitionedVectorIndex"]:
+        """
+        Load one saved version directory.
+
+        Raises:
+            FileNotFoundError: If the directory or one of its files is missing
+        """
+        try:
+            with open(path / MANIFEST_FILE) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable vector index {path}: {e}")
+            return None
+
+        if manifest.get("format_version") != INDEX_FORMAT_VERSION:
+            logger.info(f"Vector index {path} has format {manifest.get('format_version')}; rebuilding")
+            return None
+        if fingerprint is not None and manifest.get("fingerprint") != fingerprint:
+            logger.info(f"Vector index {path} was built from different data; rebuilding")
+            return None
+
+        try:
+            matrix = np.load(path / VECTORS_FILE, mmap_mode="r" if mmap else None)
+            with open(path / DOCUMENTS_FILE) as f:
+                documents = [Document(**json.loads(line)) for line in f]
+        except FileNotFoundError:
+            raise
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable vector index {path}: {e}")
+            return None
+        if len(documents) != manifest.get("count") or (documents and len(matrix) != len(documents)):
+            logger.warning(f"Ignoring inconsistent vector index {path}")
+            return None
+
+        index = cls(embeddings, partition_fields=manifest.get("partition_fields", DEFAULT_PARTITION_FIELDS))
+        index.documents = documents
+        if documents:
+            index.matrix = matrix
+        index._index_partitions(documents, 0)
+        # Rebuilt rather than persisted: tokenizing is fast and needs no embedding calls
+        index.lexical.add_documents(doc.page_content for doc in documents)
+        return index
+
+
+class PartitionedIndexRetriever(BaseRetriever):
+    """LangChain hybrid retriever over a PartitionedVectorIndex with a fixed filter."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    index: PartitionedVectorIndex
+    k: int = 5
+    filter: Dict[str, Any] = {}
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+        **kwargs: Any
+    ) -> List[Document]:
+        return self.index.hybrid_search(query, k=kwargs.get("k", self.k), filter=self.filter)
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class VehicleType(str, Enum):
     """Types of vehicles."""
@@ -485,6 +486,7 @@ class ComprehensiveAutoRepairSimulator:
         total_costs = []
         transportation_crises = []
         affordability_scores = []
+        progress = SimulationProgress(iterations, 'total_cost')
         
         for _ in range(iterations):
             # Select repair scenarios based on vehicle reliability
@@ -499,6 +501,8 @@ class ComprehensiveAutoRepairSimulator:
             total_costs.append(path_results['total_cost'])
             transportation_crises.append(path_results['transportation_crises'])
             affordability_scores.append(path_results['average_affordability_score'])
+            # Success: no transportation crisis
+            progress.record(path_results['total_cost'], path_results['transportation_crises'] == 0)
         
         # Calculate statistics
         return {
@@ -708,6 +712,9 @@ class ComprehensiveAutoRepairSimulator:
 class AutoRepairScenario(ComprehensiveAutoRepairSimulator):
     """Auto repair scenario for the simulation engine."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('age', 'credit_score', 'emergency_fund')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Auto Repair Crisis"
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class EmergencyType(str, Enum):
     """Types of financial emergencies."""
@@ -117,6 +118,9 @@ class ComprehensiveEmergencySimulator:
     def _get_market_data_for_simulation(self) -> Dict[str, float]:
         """Get real market data for emergency fund simulation."""
         
+        # Fetch both histories in one batch; later lookups are cache reads
+        market_data_service.prefetch_historical_series(['BND', '^GSPC'])
+        
         # Get real bond yields (conservative option)
         bond_yield = market_data_service.get_historical_return('BND', years=3) / 12  # Monthly return
         
@@ -191,6 +195,8 @@ class ComprehensiveEmergencySimulator:
         months = holder.time_horizon_months
         
         # Simulate multiple paths
+        target_emergency_fund = holder.monthly_expenses * holder.target_months_coverage
+        progress = SimulationProgress(simulations, 'final_emergency_fund')
         paths = []
         for _ in range(simulations):
             path = self._simulate_emergency_path(
@@ -201,6 +207,7 @@ class ComprehensiveEmergencySimulator:
                 volatility=0.02  # 2% monthly volatility
             )
             paths.append(path)
+            progress.record(path[-1], path[-1] >= target_emergency_fund)
         
         # Calculate statistics
         final_amounts = [path[-1] for path in paths]
@@ -342,6 +349,9 @@ class ComprehensiveEmergencySimulator:
 class EmergencyFundScenario(ComprehensiveEmergencySimulator):
     """Emergency fund simulation with real market data integration."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('accounts', 'emergency_fund', 'monthly_expenses', 'monthly_income', 'risk_tolerance')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Emergency Fund Strategy"
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class PlatformType(str, Enum):
     """Types of gig economy platforms."""
@@ -338,6 +339,7 @@ class ComprehensiveGigEconomySimulator:
         total_incomes = []
         monthly_volatilities = []
         platform_performances = {platform['platform']: [] for platform in income_scenarios}
+        progress = SimulationProgress(iterations, 'total_income')
         
         for _ in range(iterations):
             path_monthly_incomes = []
@@ -393,6 +395,8 @@ class ComprehensiveGigEconomySimulator:
             
             total_incomes.append(sum(path_monthly_incomes))
             monthly_volatilities.append(np.std(path_monthly_incomes))
+            # Success: income covered expenses over the whole period
+            progress.record(total_incomes[-1], total_incomes[-1] >= worker.monthly_expenses * simulation_months)
             
             # Track platform performance
             for platform_name in platform_performances:
@@ -560,6 +564,9 @@ class ComprehensiveGigEconomySimulator:
 class GigEconomyScenario(ComprehensiveGigEconomySimulator):
     """Gig economy scenario for the simulation engine."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('age', 'location', 'monthly_expenses')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Gig Economy Income Volatility"
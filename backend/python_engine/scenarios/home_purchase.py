@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class PropertyType(str, Enum):
     """Types of properties."""
@@ -585,6 +586,7 @@ class ComprehensiveHomePurchaseSimulator:
         total_costs = []
         equity_build_up = []
         affordability_scores = []
+        progress = SimulationProgress(iterations, 'total_cost')
         
         for _ in range(iterations):
             # Select a purchase scenario
@@ -599,6 +601,8 @@ class ComprehensiveHomePurchaseSimulator:
             total_costs.append(path_results['total_cost'])
             equity_build_up.append(path_results['equity_build_up'])
             affordability_scores.append(path_results['affordability_score'])
+            # Success: affordability grade B or better
+            progress.record(path_results['total_cost'], path_results['affordability_score'] >= 60)
         
         # Calculate statistics
         return {
@@ -810,6 +814,9 @@ class ComprehensiveHomePurchaseSimulator:
 class HomePurchaseScenario(ComprehensiveHomePurchaseSimulator):
     """Home purchase scenario for the simulation engine."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('age', 'credit_score', 'income', 'location')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Home Purchase Planning"
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class AssetClass(str, Enum):
     """Types of asset classes."""
@@ -339,6 +340,8 @@ class ComprehensiveMarketCrashSimulator:
         portfolio_values = []
         max_drawdowns = []
         recovery_times = []
+        survival_threshold = self._survival_threshold(investor)
+        progress = SimulationProgress(iterations, 'portfolio_value')
         
         for _ in range(iterations):
             # Select a crash scenario based on probability
@@ -353,6 +356,8 @@ class ComprehensiveMarketCrashSimulator:
             portfolio_values.append(path_results['final_value'])
             max_drawdowns.append(path_results['max_drawdown'])
             recovery_times.append(path_results['recovery_time'])
+            # Success: the portfolio stays above the survival threshold
+            progress.record(path_results['final_value'], path_results['final_value'] > survival_threshold)
         
         # Calculate statistics
         return {
@@ -514,6 +519,11 @@ class ComprehensiveMarketCrashSimulator:
             # Pre-crash period
             return 0
     
+    def _survival_threshold(self, investor: InvestorProfile) -> float:
+        """Portfolio value needed to survive a crash: 2x the emergency fund."""
+        monthly_expenses = investor.monthly_contribution * 3  # Estimate from contribution
+        return monthly_expenses * investor.emergency_fund_months * 2
+    
     def _calculate_resilience_metrics(
         self,
         simulation_results: Dict[str, Any],
@@ -527,11 +537,10 @@ class ComprehensiveMarketCrashSimulator:
         recovery_stats = simulation_results['recovery_times']
         
         # Calculate emergency fund adequacy
-        monthly_expenses = investor.monthly_contribution * 3  # Estimate from contribution
-        emergency_fund_needed = monthly_expenses * investor.emergency_fund_months
+        survival_threshold = self._survival_threshold(investor)
+        emergency_fund_needed = survival_threshold / 2
         
         # Calculate portfolio survival probability
-        survival_threshold = emergency_fund_needed * 2  # Need 2x emergency fund to survive
         survival_probability = sum(1 for value in simulation_results['all_paths'] 
                                  if value['final_value'] > survival_threshold) / len(simulation_results['all_paths'])
         
@@ -632,6 +641,9 @@ class ComprehensiveMarketCrashSimulator:
 class MarketCrashScenario(ComprehensiveMarketCrashSimulator):
     """Market crash scenario for the simulation engine."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('age', 'risk_tolerance')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Market Crash Impact"
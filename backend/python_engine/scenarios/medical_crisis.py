@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class MedicalEventType(str, Enum):
     """Types of medical events."""
@@ -491,6 +492,9 @@ class ComprehensiveMedicalCrisisSimulator:
 class MedicalCrisisScenario(ComprehensiveMedicalCrisisSimulator):
     """Medical crisis scenario for the simulation engine."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('age', 'emergency_fund', 'monthly_expenses', 'monthly_income')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Medical Crisis Simulation"
@@ -544,6 +548,7 @@ class MedicalCrisisScenario(ComprehensiveMedicalCrisisSimulator):
         medical_events = []
         total_costs = []
         out_of_pocket_costs = []
+        progress = SimulationProgress(num_simulations, 'out_of_pocket_cost')
         
         for _ in range(num_simulations):
             if np.random.random() < event_probability:
@@ -564,6 +569,8 @@ class MedicalCrisisScenario(ComprehensiveMedicalCrisisSimulator):
             else:
                 total_costs.append(0)
                 out_of_pocket_costs.append(0)
+            # Success: the emergency fund covers the out-of-pocket cost
+            progress.record(out_of_pocket_costs[-1], out_of_pocket_costs[-1] <= emergency_fund)
         
         # Calculate statistics
         avg_medical_cost = np.mean(total_costs) if total_costs else 0
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class RentalMarketType(str, Enum):
     """Types of rental markets."""
@@ -426,6 +427,7 @@ class ComprehensiveRentHikeSimulator:
         total_costs = []
         affordability_scores = []
         moving_frequencies = []
+        progress = SimulationProgress(iterations, 'total_cost')
         
         for _ in range(iterations):
             # Select a rent hike scenario
@@ -440,6 +442,8 @@ class ComprehensiveRentHikeSimulator:
             total_costs.append(path_results['total_cost'])
             affordability_scores.append(path_results['average_affordability_score'])
             moving_frequencies.append(path_results['moving_frequency'])
+            # Success: affordability grade B or better
+            progress.record(path_results['total_cost'], path_results['average_affordability_score'] >= 60)
         
         # Calculate statistics
         return {
@@ -651,6 +655,9 @@ class ComprehensiveRentHikeSimulator:
 class RentHikeScenario(ComprehensiveRentHikeSimulator):
     """Rent hike scenario for the simulation engine."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('age', 'credit_score', 'income', 'location')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Rent Hike Stress Test"
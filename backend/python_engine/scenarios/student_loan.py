@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
 from core.market_data import market_data_service
+from core.simulation_progress import SimulationProgress
 
 class LoanType(str, Enum):
     """Types of student loans."""
@@ -112,7 +113,8 @@ class ComprehensiveStudentLoanSimulator:
     def _get_market_data_for_simulation(self) -> Dict[str, float]:
         """Get real market data for student loan simulation."""
         
-        # Get real investment returns
+        # Get real investment returns (both histories fetched in one batch)
+        market_data_service.prefetch_historical_series(['^GSPC', 'BND'])
         investment_return = market_data_service.get_historical_return('^GSPC', years=5) / 12  # Monthly return
         bond_return = market_data_service.get_historical_return('BND', years=3) / 12  # Monthly return
         
@@ -190,6 +192,7 @@ class ComprehensiveStudentLoanSimulator:
             payoff_paths.append(path)
         
         # Simulate investment strategy
+        progress = SimulationProgress(simulations, 'final_investment_value')
         investment_paths = []
         for _ in range(simulations):
             path = self._simulate_investment_strategy(
@@ -200,6 +203,9 @@ class ComprehensiveStudentLoanSimulator:
                 volatility=0.03  # 3% monthly volatility
             )
             investment_paths.append(path)
+            final_balance = path[-1]['investment_balance'] if path else 0
+            # Success: the invested payments could clear the loans
+            progress.record(final_balance, final_balance >= total_loan_balance)
         
         return {
             'payoff_paths': payoff_paths,
@@ -477,6 +483,9 @@ class ComprehensiveStudentLoanSimulator:
 class StudentLoanScenario(ComprehensiveStudentLoanSimulator):
     """Student loan simulation with real market data integration."""
     
+    # Profile fields read by this scenario (see core.profile_projection)
+    profile_fields = ('monthly_expenses', 'monthly_income', 'risk_tolerance', 'student_loan_balance')
+    
     def __init__(self):
         super().__init__()
         self.scenario_name = "Student Loan Strategy"
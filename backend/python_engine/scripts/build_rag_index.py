@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Offline RAG Index Build
+Builds the shared profile RAG index from the CSV data and saves it to disk,
+so servers load it instead of embedding every record on first query
+"""
+
+import sys
+import time
+import argparse
+import logging
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag.profile_rag_system import ProfileRAGManager
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = str(Path(__file__).parent.parent.parent.parent / "data")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and persist the shared RAG index")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory containing the CSV data files")
+    parser.add_argument("--index-dir", default=None,
+                        help="Where to save the index (default: RAG_INDEX_DIR or <data-dir>/.rag_index)")
+    args = parser.parse_args()
+
+    logger.info(f"🔨 Building RAG index from {args.data_dir}...")
+    start = time.time()
+    manager = ProfileRAGManager(args.data_dir, index_dir=args.index_dir)
+    index = manager.get_shared_index()
+
+    action = "Loaded up-to-date" if index.loaded_from_disk else "Built"
+    logger.info(f"✅ {action} index with {len(index.vector_index)} documents at {manager.index_dir} "
+                f"in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
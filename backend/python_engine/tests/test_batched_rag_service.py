@@ -0,0 +1,197 @@
+"""
+Unit tests for concurrent execution in BatchedRAGService
+"""
+
+import asyncio
+import os
+import subprocess
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag.abstractions import RAGQuery, RAGResult, QueryType, BatchedRAGRequest
+from rag.batched_service import BatchedRAGService, rag_cache_key
+from rag.implementations import SimpleRAGQueryExecutor, SimpleRAGMetrics, SimpleRAGCache, SharedRAGCache
+from core.cache_manager import CacheManager
+
+
+class SlowProfileSystem:
+    """Profile system whose blocking queries take a fixed time"""
+
+    def __init__(self, delay: float, slow_tools=None):
+        self.delay = delay
+        self.slow_tools = slow_tools or {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def query(self, query_text, tool_name=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.slow_tools.get(tool_name, self.delay))
+            return f"{tool_name}: {query_text}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _service(profile_system, **kwargs):
+    rag_manager = Mock()
+    rag_manager.get_profile_system.return_value = profile_system
+    return BatchedRAGService(
+        query_executor=SimpleRAGQueryExecutor(rag_manager),
+        metrics=SimpleRAGMetrics(),
+        **kwargs
+    )
+
+
+def _request(query_types):
+    return BatchedRAGRequest(
+        profile_id=1,
+        queries=[RAGQuery(f"question {i}", query_type) for i, query_type in enumerate(query_types)]
+    )
+
+
+class TestConcurrentBatchExecution:
+    """Test cases for parallel, bounded, time-limited batches"""
+
+    @pytest.mark.asyncio
+    async def test_batch_latency_is_max_not_sum(self):
+        service = _service(SlowProfileSystem(delay=0.2))
+        query_types = [QueryType.ACCOUNTS, QueryType.TRANSACTIONS, QueryType.GOALS, QueryType.INVESTMENTS]
+
+        start = time.monotonic()
+        response = await service.execute_batch(_request(query_types))
+        elapsed = time.monotonic() - start
+
+        assert response.success_rate == 1.0
+        assert elapsed < 0.5  # Serial execution would take 0.8s
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        service = _service(SlowProfileSystem(delay=0.2))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.ensure_future(ticker())
+        await service.execute_batch(_request([QueryType.ACCOUNTS, QueryType.GOALS]))
+        ticker_task.cancel()
+
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        profile_system = SlowProfileSystem(delay=0.05)
+        service = _service(profile_system, max_parallel_queries=2)
+
+        response = await service.execute_batch(_request([QueryType.ACCOUNTS] * 3 + [QueryType.GOALS] * 3))
+
+        assert response.success_rate == 1.0
+        assert profile_system.max_active == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_query_times_out_without_failing_batch(self):
+        profile_system = SlowProfileSystem(delay=0.01, slow_tools={QueryType.GOALS.value: 1.0})
+        service = _service(profile_system, query_timeout_seconds=0.2)
+
+        start = time.monotonic()
+        response = await service.execute_batch(_request([QueryType.ACCOUNTS, QueryType.GOALS]))
+
+        assert time.monotonic() - start < 0.8
+        assert response.get_result(QueryType.ACCOUNTS).success
+        goals = response.get_result(QueryType.GOALS)
+        assert not goals.success
+        assert "timed out" in goals.error
+
+
+class TestRAGResultCache:
+    """Test cases for cache keys and RAG result caches"""
+
+    def test_cache_key_stable_across_processes(self):
+        query = RAGQuery("What is my balance?", QueryType.ACCOUNTS)
+        script = (
+            "from rag.abstractions import RAGQuery, QueryType; "
+            "from rag.batched_service import rag_cache_key; "
+            "print(rag_cache_key(1, RAGQuery('What is my balance?', QueryType.ACCOUNTS), 'v1'))"
+        )
+        env = dict(os.environ, PYTHONHASHSEED="12345")
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=str(Path(__file__).parent.parent), env=env, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        assert output == rag_cache_key(1, query, "v1")
+        assert output.startswith("1:query_accounts:v1:")
+
+    def test_cache_key_includes_data_version(self):
+        query = RAGQuery("What is my balance?", QueryType.ACCOUNTS)
+
+        assert rag_cache_key(1, query, "v1") != rag_cache_key(1, query, "v2")
+        assert rag_cache_key(1, query, "v1") != rag_cache_key(2, query, "v1")
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_least_recently_used(self):
+        cache = SimpleRAGCache(max_size=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_missed_and_invalidate_counts(self):
+        cache = SimpleRAGCache()
+        await cache.set("1:accounts:x", "old", ttl_seconds=0.01)
+        await cache.set("1:goals:x", "kept")
+        await cache.set("2:goals:x", "other")
+        await asyncio.sleep(0.02)
+
+        assert await cache.get("1:accounts:x") is None
+        assert await cache.invalidate("1:*") == 1
+        assert await cache.get("2:goals:x") == "other"
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_round_trip(self, monkeypatch):
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        cache = SharedRAGCache(CacheManager())
+        result = RAGResult(RAGQuery("question", QueryType.GOALS), result="answer", success=True, execution_time_ms=12.0)
+
+        await cache.set("1:goals:v1:abc", result)
+        cached = await cache.get("1:goals:v1:abc")
+
+        assert cached.result == "answer"
+        assert cached.query.query_type == QueryType.GOALS
+        assert await cache.invalidate("1:*") == 1
+        assert await cache.get("1:goals:v1:abc") is None
+
+    @pytest.mark.asyncio
+    async def test_batch_served_from_cache_until_data_version_changes(self):
+        profile_system = Mock()
+        profile_system.query.return_value = "answer"
+        data_version = {"value": "v1"}
+        service = _service(profile_system, cache=SimpleRAGCache(), data_version=lambda profile_id: data_version["value"])
+
+        await service.execute_batch(_request([QueryType.ACCOUNTS]))
+        await service.execute_batch(_request([QueryType.ACCOUNTS]))
+        assert profile_system.query.call_count == 1
+
+        data_version["value"] = "v2"
+        await service.execute_batch(_request([QueryType.ACCOUNTS]))
+        assert profile_system.query.call_count == 2
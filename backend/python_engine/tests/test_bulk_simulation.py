@@ -0,0 +1,118 @@
+"""
+Unit tests for bulk profile loading and the bulk simulation runner
+"""
+
+import json
+import pytest
+import numpy as np
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data.csv_loader import CSVDataLoader
+from core.bulk_simulation import BulkSimulationRunner, encode_ndjson_line
+
+DATA_DIR = str(Path(__file__).parent.parent / "data")
+
+
+class FakeScenario:
+    """Scenario stub that records the profile it was run for"""
+
+    def run_simulation(self, profile_data, config):
+        return {"customer_id": profile_data["customer_id"], "mean": np.float64(1.5)}
+
+
+class FailingScenario:
+    """Scenario stub that always raises"""
+
+    def run_simulation(self, profile_data, config):
+        raise RuntimeError("boom")
+
+
+class FakeMarketData:
+    """Market data stub tracking prefetch calls"""
+
+    def __init__(self):
+        self.prefetch_calls = 0
+
+    def prefetch_quotes(self, symbols):
+        self.prefetch_calls += 1
+        return {}
+
+
+class TestBulkProfileLoading:
+    """Test CSVDataLoader.load_profiles"""
+
+    @pytest.fixture
+    def loader(self):
+        return CSVDataLoader(DATA_DIR)
+
+    def test_matches_single_profile_loading(self, loader):
+        """Bulk loading yields the same profiles as load_profile"""
+        profiles = loader.load_profiles()
+
+        assert sorted(profiles.keys()) == sorted(loader.get_available_profiles())
+        for customer_id, profile in profiles.items():
+            single = loader.load_profile(customer_id)
+            assert profile.monthly_income == single.monthly_income
+            assert profile.monthly_expenses == single.monthly_expenses
+            assert len(profile.transactions) == len(single.transactions)
+            assert len(profile.accounts) == len(single.accounts)
+
+    def test_missing_profiles_are_omitted(self, loader):
+        """Unknown customer IDs are skipped rather than raising"""
+        profiles = loader.load_profiles([2, 9999])
+
+        assert list(profiles.keys()) == [2]
+
+
+class TestBulkSimulationRunner:
+    """Test BulkSimulationRunner"""
+
+    @pytest.fixture
+    def market_data(self):
+        return FakeMarketData()
+
+    @pytest.fixture
+    def runner(self, market_data):
+        return BulkSimulationRunner(
+            data_loader=CSVDataLoader(DATA_DIR),
+            scenarios={"fake": FakeScenario(), "failing": FailingScenario()},
+            profile_builder=lambda profile: {"customer_id": profile.customer_id},
+            config_builder=lambda profile_id, scenario_type, parameters: dict(parameters),
+            market_data=market_data,
+            max_workers=2
+        )
+
+    async def _collect(self, runner, profile_ids, jobs):
+        return [record async for record in runner.run(profile_ids, jobs)]
+
+    @pytest.mark.asyncio
+    async def test_runs_every_profile_scenario_pair(self, runner, market_data):
+        """Each profile is simulated once per job and market data is warmed once"""
+        records = await self._collect(runner, [1, 2, 3], [("fake", {}), ("fake", {"x": 1})])
+
+        assert len(records) == 6
+        assert all(r["success"] for r in records)
+        assert sorted(r["simulation_result"]["customer_id"] for r in records) == [1, 1, 2, 2, 3, 3]
+        assert market_data.prefetch_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_reported_per_record(self, runner):
+        """Missing profiles and failing simulations produce error records"""
+        records = await self._collect(runner, [1, 9999], [("failing", {}), ("unknown", {})])
+        errors = {(r["profile_id"], r["scenario_type"]): r["error"] for r in records}
+
+        assert not any(r["success"] for r in records)
+        assert "not found" in errors[(9999, None)]
+        assert errors[(1, "failing")] == "boom"
+        assert "Invalid scenario type" in errors[(1, "unknown")]
+
+    def test_ndjson_encoding_handles_numpy(self):
+        """NDJSON lines are single-line JSON with numpy values converted"""
+        line = encode_ndjson_line({"a": np.int64(3), "b": np.float64(np.inf), "c": np.arange(2)})
+
+        assert line.endswith("\n") and line.count("\n") == 1
+        assert json.loads(line) == {"a": 3, "b": None, "c": [0, 1]}
@@ -0,0 +1,111 @@
+"""
+Unit tests for DataVersionService
+"""
+
+import os
+import shutil
+import tempfile
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.data_version import DataVersionService
+
+DATA_DIR = str(Path(__file__).parent.parent / "data")
+
+
+def _rewrite(path, old, new):
+    """Replace text in a file and push its mtime forward so the change is visible"""
+    with open(path) as f:
+        content = f.read()
+    assert old in content
+    stat = os.stat(path)
+    with open(path, 'w') as f:
+        f.write(content.replace(old, new, 1))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestDataVersionService:
+    """Test cases for DataVersionService"""
+
+    @pytest.fixture
+    def data_dir(self):
+        """Copy the bundled CSV data into a temporary directory"""
+        temp_dir = tempfile.mkdtemp()
+        for filename in ('customer.csv', 'account.csv', 'transaction.csv', 'category.csv'):
+            shutil.copy(os.path.join(DATA_DIR, filename), temp_dir)
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def service(self, data_dir):
+        return DataVersionService(data_dir, poll_interval=0.1)
+
+    def test_no_change(self, service):
+        """Polling unchanged files does not bump the version"""
+        assert service.check() is None
+        assert service.version == 0
+
+    def test_transaction_change_affects_owner_only(self, service, data_dir):
+        """Editing a transaction only invalidates the account owner's profile"""
+        changes = []
+        service.subscribe(changes.append)
+
+        # Account 101 belongs to customer 1
+        _rewrite(os.path.join(data_dir, 'transaction.csv'), '4499.91', '4500.00')
+        change = service.check()
+
+        assert change.version == 1
+        assert change.changed_files == ['transaction.csv']
+        assert change.profile_ids == {1}
+        assert changes == [change]
+        assert service.profile_version(1) == 1
+        assert service.profile_version(2) == 0
+
+    def test_touch_without_content_change(self, service, data_dir):
+        """A newer mtime with identical rows is not treated as a change"""
+        path = os.path.join(data_dir, 'customer.csv')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert service.check() is None
+        assert service.version == 0
+
+    def test_unattributable_file_affects_all(self, service, data_dir):
+        """Changes to shared lookup files invalidate every profile"""
+        _rewrite(os.path.join(data_dir, 'category.csv'), 'grocery', 'groceries')
+        change = service.check()
+
+        assert change.profile_ids is None
+        assert change.affects(1) and change.affects(42)
+        assert service.profile_version(42) == change.version
+
+    def test_failing_subscriber_does_not_block_others(self, service, data_dir):
+        """Subscriber errors are logged and other subscribers still run"""
+        seen = []
+
+        def failing(change):
+            raise RuntimeError("boom")
+
+        service.subscribe(failing)
+        service.subscribe(seen.append)
+        _rewrite(os.path.join(data_dir, 'customer.csv'), '"New York, NY",34', '"New York, NY",35')
+
+        change = service.check()
+        assert seen == [change]
+        assert change.profile_ids == {1}
+
+    def test_profile_fingerprint_tracks_profile_data(self, service, data_dir):
+        """Fingerprints match across instances and change only for affected profiles"""
+        other = DataVersionService(data_dir, poll_interval=0.1)
+        before = {pid: service.profile_fingerprint(pid) for pid in (1, 2)}
+        assert before == {pid: other.profile_fingerprint(pid) for pid in (1, 2)}
+
+        _rewrite(os.path.join(data_dir, 'transaction.csv'), '4499.91', '4500.00')
+        service.check()
+
+        assert service.profile_fingerprint(1) != before[1]
+        assert service.profile_fingerprint(2) == before[2]
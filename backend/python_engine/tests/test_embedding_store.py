@@ -0,0 +1,74 @@
+"""
+Unit tests for the persistent embedding store
+"""
+
+import shutil
+import tempfile
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.embedding_store import EmbeddingStore, content_key, INDEX_FILE
+
+
+class TestEmbeddingStore:
+    """Test cases for EmbeddingStore"""
+
+    @pytest.fixture
+    def store_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def test_round_trip(self, store_dir):
+        store = EmbeddingStore(store_dir)
+        key = content_key("Checking account balance 1200", "text-embedding-3-small")
+
+        assert store.put(key, [0.1, 0.2, 0.3])
+        vector = store.get(key)
+
+        assert vector.dtype == np.float32
+        assert np.allclose(vector, [0.1, 0.2, 0.3])
+        assert store.get("missing") is None
+
+    def test_persists_across_instances(self, store_dir):
+        """Vectors written before a restart are served from disk afterwards"""
+        EmbeddingStore(store_dir).put_many({"a": [1.0, 2.0], "b": [3.0, 4.0, 5.0]})
+        reopened = EmbeddingStore(store_dir)
+
+        found = reopened.get_many(["a", "b", "c"])
+        assert set(found) == {"a", "b"}
+        assert np.allclose(found["b"], [3.0, 4.0, 5.0])
+
+    def test_existing_keys_not_rewritten(self, store_dir):
+        store = EmbeddingStore(store_dir)
+        store.put("a", [1.0])
+
+        assert store.put_many({"a": [9.0], "b": [2.0]}) == 1
+        assert np.allclose(store.get("a"), [1.0])
+
+    def test_sees_appends_from_other_writers(self, store_dir):
+        """A reader picks up vectors another process appended after it opened"""
+        reader = EmbeddingStore(store_dir)
+        reader.put("a", [1.0])
+        EmbeddingStore(store_dir).put("b", [2.0])
+
+        assert np.allclose(reader.get("b"), [2.0])
+
+    def test_ignores_partial_index_line(self, store_dir):
+        """An index line cut off mid-write is skipped until it is complete"""
+        EmbeddingStore(store_dir).put("a", [1.0])
+        with open(Path(store_dir) / INDEX_FILE, "a") as index_file:
+            index_file.write("b\t1")
+
+        store = EmbeddingStore(store_dir)
+        assert len(store) == 1
+        assert "b" not in store
+
+    def test_content_key_depends_on_model(self):
+        assert content_key("text", "model-a") != content_key("text", "model-b")
+        assert content_key("text", "model-a") == content_key("text", "model-a")
@@ -0,0 +1,83 @@
+"""
+Unit tests for the historical price series cache
+"""
+
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.historical_series import (
+    HistoricalSeriesCache,
+    PriceSeries,
+    compute_window_stats,
+    COMMON_WINDOWS,
+)
+
+
+def _fmp_rows(years, annual_growth, start=date(2015, 1, 2)):
+    """FMP-style rows, newest first, for a series growing at a constant annual rate"""
+    rows = []
+    for day in range(0, int(years * 365.25) + 1, 7):
+        current = start + timedelta(days=day)
+        rows.append({"date": current.isoformat(), "close": 100 * (1 + annual_growth) ** (day / 365.25)})
+    return list(reversed(rows))
+
+
+class TestWindowStats:
+    """Test cases for annualized window statistics"""
+
+    def test_constant_growth_return(self):
+        series = PriceSeries.from_fmp("SPY", _fmp_rows(10, 0.08))
+
+        assert set(series.stats) == set(COMMON_WINDOWS)
+        for years in COMMON_WINDOWS:
+            assert series.stats[years].annualized_return == pytest.approx(0.08, abs=1e-3)
+        assert series.stats[5].annualized_volatility < 1e-6
+
+    def test_short_series_annualized_over_actual_span(self):
+        """Two years of data are not reported as a 5-year return"""
+        series = PriceSeries.from_fmp("BND", _fmp_rows(2, 0.04))
+
+        assert series.window(5).annualized_return == pytest.approx(0.04, abs=1e-3)
+
+    def test_volatile_series_has_volatility(self):
+        dates = np.arange(np.datetime64('2020-01-01'), np.datetime64('2021-01-01'))
+        closes = 100 + 5 * np.sin(np.arange(len(dates)))
+
+        assert compute_window_stats(dates, closes, 1).annualized_volatility > 0.1
+
+    def test_insufficient_data(self):
+        assert PriceSeries.from_fmp("X", []) is None
+        assert compute_window_stats(np.array(['2024-01-01'], dtype='datetime64[D]'), np.array([1.0]), 1) is None
+
+
+class TestHistoricalSeriesCache:
+    """Test cases for HistoricalSeriesCache"""
+
+    def test_persists_across_instances(self, tmp_path):
+        HistoricalSeriesCache(str(tmp_path)).put(PriceSeries.from_fmp("^GSPC", _fmp_rows(5, 0.1)))
+
+        series = HistoricalSeriesCache(str(tmp_path)).get("^GSPC")
+        assert series is not None
+        assert series.is_current()
+        assert series.window(5).annualized_return == pytest.approx(0.1, abs=1e-3)
+
+    def test_outdated_series_needs_fetch(self, tmp_path):
+        cache = HistoricalSeriesCache(str(tmp_path))
+        series = PriceSeries.from_fmp("BND", _fmp_rows(3, 0.04))
+        series.fetched_on = date.today() - timedelta(days=2)
+        cache.put(series)
+
+        assert cache.missing_or_outdated(["BND", "VTI"]) == ["BND", "VTI"]
+        assert cache.get("BND") is series
+
+    def test_memory_only_cache(self):
+        cache = HistoricalSeriesCache(None)
+        cache.put(PriceSeries.from_fmp("VTI", _fmp_rows(1, 0.09)))
+
+        assert cache.missing_or_outdated(["VTI"]) == []
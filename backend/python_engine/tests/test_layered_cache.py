@@ -0,0 +1,214 @@
+"""
+Unit tests for the layered (L1 + Redis) CacheManager and binary serialization
+"""
+
+import json
+import asyncio
+import fnmatch
+import pytest
+from unittest.mock import patch
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.cache_manager import CacheManager
+from core.cache_serialization import CacheSerializer
+
+
+class FakeRedis:
+    """Minimal async stand-in for the redis.asyncio client used by CacheManager"""
+
+    def __init__(self):
+        self.store = {}
+        self.calls = []
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        self.calls.append(("mget", tuple(keys)))
+        return [self.store.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        assert isinstance(value, bytes)
+        self.store[key] = value
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.store.pop(key, None) is not None)
+
+    async def keys(self, pattern):
+        return [key for key in self.store if fnmatch.fnmatchcase(key, pattern)]
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.store)
+
+    async def eval(self, script, numkeys, key, token):
+        # Compare-and-delete, as done by the release script
+        if self.store.get(key) == token:
+            del self.store[key]
+            return 1
+        return 0
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Buffers setex calls until execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+
+    async def execute(self):
+        self.redis.calls.append(("pipeline", len(self.commands)))
+        for key, ttl, value in self.commands:
+            await self.redis.setex(key, ttl, value)
+
+
+class TestCacheSerializer:
+    """Test cases for CacheSerializer"""
+
+    def test_round_trip_small_value(self):
+        serializer = CacheSerializer()
+        data = serializer.dumps({"a": 1})
+
+        assert data[:1] == b'P'
+        assert serializer.loads(data) == {"a": 1}
+
+    def test_large_values_are_compressed(self):
+        serializer = CacheSerializer(compression_threshold=100)
+        value = {"text": "x" * 10_000}
+        data = serializer.dumps(value)
+
+        assert data[:1] in (b'Z', b'L')
+        assert len(data) < 10_000
+        assert serializer.loads(data) == value
+
+    def test_compression_can_be_disabled(self):
+        serializer = CacheSerializer(enable_compression=False, compression_threshold=1)
+
+        assert serializer.dumps("x" * 5_000)[:1] == b'P'
+
+    def test_reads_legacy_json_entries(self):
+        legacy = json.dumps({"data": {"a": 1}, "timestamp": "2024-01-01T00:00:00", "ttl": 60})
+
+        assert CacheSerializer().loads(legacy.encode()) == {"a": 1}
+
+
+class TestLayeredCacheManager:
+    """Test cases for CacheManager with Redis and an L1 tier"""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+        manager = CacheManager()
+        manager._redis_client = FakeRedis()
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_l1_serves_repeat_reads(self, manager):
+        """Reads after a write are served from L1 without a Redis round trip"""
+        await manager.set("k", {"v": 1})
+        manager._redis_client.calls.clear()
+
+        assert await manager.get("k") == {"v": 1}
+        assert manager._redis_client.calls == []
+
+    @pytest.mark.asyncio
+    async def test_l1_miss_populates_from_redis(self, manager):
+        """Values found in Redis are promoted to L1"""
+        await manager.set("k", {"v": 1})
+        manager._l1_cache.clear()
+
+        assert await manager.get("k") == {"v": 1}
+        assert await manager.get("k") == {"v": 1}
+        assert manager._redis_client.calls.count(("get", "k")) == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_invalidates_l1(self, manager):
+        await manager.set("k", {"v": 1})
+        await manager.delete("k")
+
+        assert await manager.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_clear_pattern_invalidates_l1(self, manager):
+        await manager.set("user_profile:1", {"v": 1})
+        await manager.set("market_data:1", {"v": 2})
+
+        assert await manager.clear_pattern("user_profile:*") == 1
+        assert await manager.get("user_profile:1") is None
+        assert await manager.get("market_data:1") == {"v": 2}
+
+    @pytest.mark.asyncio
+    async def test_pipelined_multi_get_and_set(self, manager):
+        """set_many uses one pipeline and get_many one MGET for L1 misses"""
+        assert await manager.set_many({"a": 1, "b": 2, "c": 3}, ttl=60)
+        assert ("pipeline", 3) in manager._redis_client.calls
+
+        manager._l1_cache.delete("b")
+        manager._l1_cache.delete("c")
+        manager._redis_client.calls.clear()
+
+        assert await manager.get_many(["a", "b", "c", "missing"]) == {"a": 1, "b": 2, "c": 3}
+        assert manager._redis_client.calls == [("mget", ("b", "c", "missing"))]
+
+    @pytest.mark.asyncio
+    async def test_each_event_loop_gets_its_own_redis_client(self, manager):
+        """A caller on another loop (e.g. a sync bridge thread) doesn't share connections"""
+        await manager.set("k", {"v": 1})
+        other_loop_client = FakeRedis()
+
+        def get_from_other_loop():
+            return asyncio.run(manager.get("k"))
+
+        with patch.object(CacheManager, '_connect_redis', return_value=other_loop_client):
+            manager._l1_cache.clear()
+            assert await asyncio.to_thread(get_from_other_loop) is None
+        assert other_loop_client.calls == [("get", "k")]
+        assert await manager.get("k") == {"v": 1}
+
+    @pytest.mark.asyncio
+    async def test_l1_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+        monkeypatch.setenv("CACHE_L1_ENABLED", "false")
+        manager = CacheManager()
+        manager._redis_client = FakeRedis()
+
+        await manager.set("k", {"v": 1})
+        assert await manager.get("k") == {"v": 1}
+        assert ("get", "k") in manager._redis_client.calls
+
+    @pytest.mark.asyncio
+    async def test_lock_is_exclusive_and_token_guarded(self, manager):
+        token = await manager.acquire_lock("lock:k", ttl_seconds=5)
+
+        assert token
+        assert await manager.acquire_lock("lock:k") is None
+        assert await manager.is_locked("lock:k")
+
+        # A stale token cannot release someone else's lock
+        await manager.release_lock("lock:k", "stale")
+        assert await manager.is_locked("lock:k")
+
+        await manager.release_lock("lock:k", token)
+        assert not await manager.is_locked("lock:k")
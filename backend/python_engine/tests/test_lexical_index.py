@@ -0,0 +1,52 @@
+"""
+Unit tests for the BM25 lexical index
+"""
+
+import numpy as np
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag.lexical_index import BM25Index, tokenize
+
+
+class TestBM25Index:
+    """Test cases for tokenize and BM25Index"""
+
+    def test_tokenize_keeps_amounts_and_drops_stopwords(self):
+        assert tokenize("What did I spend at Whole Foods? $4,499.91") == ["spend", "whole", "foods", "4499.91"]
+
+    def test_ranks_documents_by_term_matches(self):
+        index = BM25Index()
+        index.add_documents([
+            "Transaction: Starbucks coffee $5.20 category dining",
+            "Transaction: Whole Foods groceries $120.00 category groceries",
+            "Transaction: Shell fuel $45.00 category transport",
+        ])
+
+        results = index.search("how much at whole foods")
+        assert [row for row, _ in results] == [1]
+        assert index.search("45.00")[0][0] == 2
+        assert index.search("netflix") == []
+
+    def test_rare_terms_outweigh_common_ones(self):
+        index = BM25Index()
+        index.add_documents(["category dining starbucks", "category dining chipotle", "category dining chipotle"])
+
+        assert index.search("dining starbucks", k=1)[0][0] == 0
+
+    def test_search_restricted_to_rows(self):
+        index = BM25Index()
+        index.add_documents(["rent payment", "rent payment", "salary deposit"])
+
+        assert [row for row, _ in index.search("rent", rows=np.array([1, 2]))] == [1]
+
+    def test_incremental_add_extends_postings(self):
+        index = BM25Index()
+        index.add_documents(["coffee"])
+        index.add_documents(["tea", "coffee beans"])
+
+        assert len(index) == 3
+        assert sorted(row for row, _ in index.search("coffee")) == [0, 2]
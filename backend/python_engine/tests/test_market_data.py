@@ -0,0 +1,286 @@
+"""
+Unit tests for FMPMarketDataService caching behaviour
+"""
+
+import asyncio
+import time
+import numpy as np
+import pytest
+from unittest.mock import patch, AsyncMock
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.market_data import FMPMarketDataService, AsyncTokenBucket
+
+
+@pytest.fixture
+def cold_service(tmp_path):
+    """Market data service persisting to a temporary directory, not yet started"""
+    service = FMPMarketDataService(cache_dir=str(tmp_path))
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def service(cold_service):
+    """Market data service with an empty cache that skips the startup refresh"""
+    cold_service._ready.set()
+    return cold_service
+
+
+def _age_entry(service, symbol, seconds):
+    """Move a cached quote's timestamps into the past"""
+    entry = service.cache[symbol]
+    entry.timestamp -= seconds
+    entry.stale_at -= seconds
+
+
+def _wait_for_refreshes(service):
+    """Block until background quote refreshes on the service loop finish"""
+    async def drain():
+        while service._pending:
+            await asyncio.gather(*service._pending.values(), return_exceptions=True)
+    service._bridge.run(drain())
+
+
+class TestQuoteStaleWhileRevalidate:
+    """Test cases for soft/hard TTLs on cached quotes"""
+
+    def test_fresh_quote_served_from_cache(self, service):
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock,
+                          return_value=[{"price": 100.0}]) as fetch:
+            assert service.get_stock_price("SPY") == 100.0
+            assert service.get_stock_price("SPY") == 100.0
+            assert fetch.call_count == 1
+
+    def test_stale_quote_served_while_refreshing(self, service):
+        """Past the soft TTL the cached price is returned immediately and refreshed"""
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock,
+                          return_value=[{"price": 100.0}]):
+            service.get_stock_price("SPY")
+        _age_entry(service, "SPY", service.cache_duration + 1)
+
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock,
+                          return_value=[{"price": 101.0}]) as fetch:
+            assert service.get_stock_price("SPY") == 100.0
+            _wait_for_refreshes(service)
+
+            assert fetch.call_count == 1
+            assert service.get_stock_price("SPY") == 101.0
+            assert "SPY" not in service._pending
+
+    def test_quote_past_hard_ttl_fetched_synchronously(self, service):
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock,
+                          return_value=[{"price": 100.0}]):
+            service.get_stock_price("SPY")
+        _age_entry(service, "SPY", service.stale_duration + 1)
+
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock,
+                          return_value=[{"price": 102.0}]):
+            assert service.get_stock_price("SPY") == 102.0
+
+    def test_failed_refresh_keeps_stale_quote(self, service):
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock,
+                          return_value=[{"price": 100.0}]):
+            service.get_stock_price("SPY")
+        _age_entry(service, "SPY", service.cache_duration + 1)
+
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock, return_value=None):
+            assert service.get_stock_price("SPY") == 100.0
+            _wait_for_refreshes(service)
+
+        assert service.cache["SPY"].data["price"] == 100.0
+
+    def test_soft_expiry_is_jittered(self, service):
+        """Quotes loaded together get different soft expiries within the jitter window"""
+        now = time.time()
+        entries = [service._new_cache_entry({"price": 1.0}, {}) for _ in range(20)]
+        ttls = {round(entry.stale_at - entry.timestamp, 3) for entry in entries}
+
+        assert len(ttls) > 1
+        assert all(
+            service.cache_duration * (1 - service.cache_jitter) - 1 <= ttl <= service.cache_duration
+            for ttl in ttls
+        )
+        assert all(entry.timestamp >= now for entry in entries)
+
+
+class TestAsyncMarketData:
+    """Test cases for the async client and sync facade"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_request(self, service):
+        """Concurrent async lookups of an uncached symbol make a single API call"""
+        async def slow_quote(url):
+            await asyncio.sleep(0.05)
+            return [{"price": 250.0}]
+
+        with patch.object(service, '_make_api_call_async', side_effect=slow_quote) as fetch:
+            prices = await asyncio.gather(*[service.get_stock_price_async("VTI") for _ in range(5)])
+
+        assert prices == [250.0] * 5
+        assert fetch.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_fetch_does_not_block_caller_loop(self, service):
+        """A slow quote fetch runs off the caller's event loop"""
+        async def slow_quote(url):
+            await asyncio.sleep(0.2)
+            return [{"price": 250.0}]
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        with patch.object(service, '_make_api_call_async', side_effect=slow_quote):
+            ticker_task = asyncio.ensure_future(ticker())
+            await service.get_stock_price_async("VTI")
+            ticker_task.cancel()
+
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_falls_back_to_last_known_value(self, service):
+        service.last_known_values["VTI"] = {"price": 199.0}
+
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock, return_value=None):
+            assert await service.get_stock_price_async("VTI") == 199.0
+            with pytest.raises(ValueError):
+                await service.get_stock_price_async("UNKNOWN")
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_limits_rate(self):
+        """Bursts up to capacity pass immediately; further calls wait for refill"""
+        bucket = AsyncTokenBucket(rate=50, capacity=2)
+        start = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+
+        # Two tokens from the burst, two more at 50/s
+        assert time.monotonic() - start >= 0.035
+
+
+def _history_response(annual_growth):
+    """FMP historical-price-full payload for five years of weekly closes"""
+    rows = []
+    for day in range(0, 5 * 365, 7):
+        rows.append({
+            "date": str(np.datetime64('2020-01-01') + np.timedelta64(day, 'D')),
+            "close": 100 * (1 + annual_growth) ** (day / 365.25)
+        })
+    return {"historical": list(reversed(rows))}
+
+
+class TestHistoricalReturns:
+    """Test cases for cached and batched historical returns"""
+
+    def test_batch_fetches_each_series_once(self, service):
+        """Repeated lookups for any window reuse the series fetched today"""
+        responses = {"BND": _history_response(0.04), "^GSPC": _history_response(0.10)}
+
+        async def fetch(url):
+            symbol = url.split("/historical-price-full/")[1].split("?")[0]
+            return responses[symbol]
+
+        with patch.object(service, '_make_api_call_async', side_effect=fetch) as api:
+            returns = service.get_historical_returns(["BND", "^GSPC"], years=3)
+            assert returns["BND"] == pytest.approx(0.04, abs=2e-3)
+            assert returns["^GSPC"] == pytest.approx(0.10, abs=2e-3)
+
+            service.get_historical_return("^GSPC", years=5)
+            service.get_historical_return("BND", years=1)
+            assert service.get_historical_volatility("BND", years=3) == pytest.approx(0, abs=1e-6)
+
+        assert api.call_count == 2
+
+    def test_failed_fetch_uses_fallback_and_backs_off(self, service):
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock, return_value=None) as api:
+            assert service.get_historical_return("BND", years=3) == service.FALLBACK_RETURNS["BND"]
+            assert service.get_historical_return("BND", years=3) == service.FALLBACK_RETURNS["BND"]
+
+        assert api.call_count == 1
+
+    def test_persisted_series_survive_restart(self, service, tmp_path):
+        with patch.object(service, '_make_api_call_async', new_callable=AsyncMock,
+                          return_value=_history_response(0.07)):
+            service.get_historical_return("VTI")
+
+        restarted = FMPMarketDataService(cache_dir=str(tmp_path))
+        try:
+            with patch.object(restarted, '_make_api_call_async', new_callable=AsyncMock) as api:
+                assert restarted.get_historical_return("VTI") == pytest.approx(0.07, abs=2e-3)
+            assert api.call_count == 0
+        finally:
+            restarted.close()
+
+
+class TestDeferredInitialization:
+    """Test cases for background startup refresh and readiness"""
+
+    def test_construction_makes_no_network_calls(self, tmp_path):
+        with patch.object(FMPMarketDataService, '_make_api_call_async', new_callable=AsyncMock) as api:
+            service = FMPMarketDataService(cache_dir=str(tmp_path))
+        try:
+            assert api.call_count == 0
+            assert not service.is_ready()
+            assert service.get_readiness()["data_source"] == "none"
+        finally:
+            service.close()
+
+    def test_background_refresh_persists_quotes_for_next_start(self, cold_service, tmp_path):
+        quotes = [{"symbol": "SPY", "price": 512.0}, {"symbol": "BND", "price": 72.0}]
+        with patch.object(cold_service, '_make_api_call_async', new_callable=AsyncMock, return_value=quotes):
+            cold_service.start()
+            assert cold_service.wait_until_ready(timeout=5)
+
+        assert cold_service.get_readiness()["data_source"] == "live"
+
+        restarted = FMPMarketDataService(cache_dir=str(tmp_path))
+        try:
+            with patch.object(restarted, '_make_api_call_async', new_callable=AsyncMock) as api:
+                assert restarted.is_ready()
+                assert restarted.get_readiness()["data_source"] == "persisted"
+                assert restarted.get_stock_price("SPY") == 512.0
+            assert api.call_count == 0
+        finally:
+            restarted.close()
+
+    def test_failed_refresh_becomes_ready_with_fallbacks(self, cold_service):
+        with patch.object(cold_service, '_make_api_call_async', new_callable=AsyncMock, return_value=None):
+            assert cold_service.wait_until_ready(timeout=5)
+
+        assert cold_service.get_readiness()["data_source"] == "fallback"
+        assert cold_service.get_stock_price("^GSPC") == 4500.0
+
+    def test_slow_initial_refresh_does_not_block_lookup(self, cold_service):
+        """A lookup waits briefly for the initial refresh, then fetches the symbol itself"""
+        async def slow_refresh():
+            await asyncio.sleep(10)
+
+        with patch('core.market_data.READY_WAIT_SECONDS', 0.1), \
+                patch.object(cold_service, '_initialize_cache_async', side_effect=slow_refresh), \
+                patch.object(cold_service, '_make_api_call_async', new_callable=AsyncMock,
+                             return_value=[{"price": 512.0}]):
+            start = time.time()
+            assert cold_service.get_stock_price("SPY") == 512.0
+            assert time.time() - start < 5
+            assert cold_service._bridge.run(cold_service.get_stock_price_async("VTI")) == 512.0
+
+        assert not cold_service.is_ready()
+
+    def test_first_lookup_initializes_lazily(self, cold_service):
+        """Using the service before start() runs the initial batch load once"""
+        quotes = [{"symbol": "SPY", "price": 512.0}]
+        with patch.object(cold_service, '_make_api_call_async', new_callable=AsyncMock, return_value=quotes) as api:
+            assert cold_service.get_stock_price("SPY") == 512.0
+            assert cold_service.get_stock_price("SPY") == 512.0
+
+        assert api.call_count == 1
+        assert cold_service.is_ready()
@@ -0,0 +1,136 @@
+"""
+Unit tests for market data snapshots and the replay/record modes
+"""
+
+import json
+import pytest
+from unittest.mock import patch, AsyncMock
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.market_data import FMPMarketDataService
+from core.market_snapshot import MarketDataSnapshot, SnapshotRecorder, SNAPSHOT_FORMAT_VERSION
+
+
+def _history_rows(annual_growth, years=3):
+    """FMP historical rows, newest first, growing at a constant annual rate"""
+    rows = [
+        {"date": f"{2020 + year}-01-02", "close": 100 * (1 + annual_growth) ** year}
+        for year in range(years + 1)
+    ]
+    return list(reversed(rows))
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    path = tmp_path / "market.json.gz"
+    MarketDataSnapshot(
+        quotes={"SPY": {"symbol": "SPY", "price": 500.0}, "^GSPC": {"symbol": "^GSPC", "price": 5000.0}},
+        historical={"BND": _history_rows(0.04)}
+    ).save(str(path))
+    return str(path)
+
+
+class TestMarketDataSnapshot:
+    """Test cases for the snapshot file format"""
+
+    @pytest.mark.parametrize("name", ["market.json", "market.json.gz"])
+    def test_round_trip(self, tmp_path, name):
+        path = str(tmp_path / name)
+        MarketDataSnapshot(quotes={"SPY": {"symbol": "SPY", "price": 1.0}}).save(path)
+
+        snapshot = MarketDataSnapshot.load(path)
+        assert snapshot.quotes_for(["SPY", "VTI"]) == [{"symbol": "SPY", "price": 1.0}]
+        assert snapshot.historical_for("SPY") is None
+
+    def test_rejects_unknown_format_version(self, tmp_path):
+        path = tmp_path / "market.json"
+        path.write_text(json.dumps({"format_version": SNAPSHOT_FORMAT_VERSION + 1, "created_at": "x"}))
+
+        with pytest.raises(ValueError):
+            MarketDataSnapshot.load(str(path))
+
+    def test_recorder_extends_existing_snapshot(self, snapshot_file):
+        SnapshotRecorder(snapshot_file).record_quotes([{"symbol": "VTI", "price": 250.0}])
+
+        snapshot = MarketDataSnapshot.load(snapshot_file)
+        assert set(snapshot.quotes) == {"SPY", "^GSPC", "VTI"}
+        assert snapshot.updated_at is not None
+
+
+class TestReplayMode:
+    """Test cases for serving market data from a snapshot"""
+
+    @pytest.fixture
+    def replay_service(self, snapshot_file, tmp_path):
+        service = FMPMarketDataService(cache_dir=str(tmp_path / "cache"), mode="replay", snapshot_path=snapshot_file)
+        yield service
+        service.close()
+
+    def test_serves_snapshot_without_network(self, replay_service):
+        with patch.object(replay_service, '_make_api_call_async', new_callable=AsyncMock) as api:
+            assert replay_service.is_ready()
+            assert replay_service.get_stock_price("SPY") == 500.0
+            assert replay_service.get_historical_return("BND", years=3) == pytest.approx(0.04, abs=1e-3)
+            # Symbols missing from the snapshot use the usual fallbacks
+            assert replay_service.get_historical_return("VTI") == replay_service.FALLBACK_RETURNS["VTI"]
+            with pytest.raises(ValueError):
+                replay_service.get_stock_price("TSLA")
+
+        assert api.call_count == 0
+        readiness = replay_service.get_readiness()
+        assert readiness["data_source"] == "snapshot"
+        assert readiness["mode"] == "replay"
+
+    def test_replay_does_not_write_live_cache(self, replay_service, tmp_path):
+        replay_service.get_historical_return("BND")
+
+        assert not list((tmp_path / "cache").glob("*"))
+
+    def test_configuration_errors(self, tmp_path):
+        with pytest.raises(ValueError):
+            FMPMarketDataService(cache_dir=None, mode="bogus")
+        with pytest.raises(ValueError):
+            FMPMarketDataService(cache_dir=None, mode="replay")
+
+    def test_mode_selected_from_environment(self, snapshot_file, monkeypatch):
+        monkeypatch.setenv("MARKET_DATA_MODE", "replay")
+        monkeypatch.setenv("MARKET_DATA_SNAPSHOT", snapshot_file)
+
+        service = FMPMarketDataService(cache_dir=None)
+        try:
+            assert service.mode == "replay"
+            assert service.get_stock_price("^GSPC") == 5000.0
+        finally:
+            service.close()
+
+
+class TestRecordMode:
+    """Test cases for recording live responses into a snapshot"""
+
+    def test_recorded_snapshot_replays_same_data(self, tmp_path):
+        path = str(tmp_path / "recorded.json")
+        recording = FMPMarketDataService(cache_dir=None, mode="record", snapshot_path=path)
+        recording._ready.set()
+
+        async def fetch(url):
+            if "historical-price-full" in url:
+                return {"symbol": "BND", "historical": _history_rows(0.05)}
+            return [{"symbol": "SPY", "price": 512.0}]
+
+        try:
+            with patch.object(recording, '_make_api_call_async', side_effect=fetch):
+                assert recording.get_stock_price("SPY") == 512.0
+                live_return = recording.get_historical_return("BND", years=3)
+        finally:
+            recording.close()
+
+        replay = FMPMarketDataService(cache_dir=None, mode="replay", snapshot_path=path)
+        try:
+            assert replay.get_stock_price("SPY") == 512.0
+            assert replay.get_historical_return("BND", years=3) == pytest.approx(live_return)
+        finally:
+            replay.close()
@@ -0,0 +1,163 @@
+"""
+Unit tests for the bounded in-memory cache tier
+"""
+
+import time
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.memory_cache import MemoryCacheTier, estimate_size
+from core.cache_manager import CacheManager
+
+
+class TestMemoryCacheTier:
+    """Test cases for MemoryCacheTier"""
+
+    @pytest.fixture
+    def tier(self):
+        tier = MemoryCacheTier(max_bytes=10_000, default_ttl=60, sweep_interval=0)
+        yield tier
+        tier.stop_sweeper()
+
+    def test_get_and_set(self, tier):
+        """Values round-trip and misses return None"""
+        assert tier.set("a", {"x": 1})
+        assert tier.get("a") == {"x": 1}
+        assert tier.get("missing") is None
+
+    def test_lru_eviction_within_budget(self):
+        """Least recently used entries are evicted once the byte budget is hit"""
+        value = "v" * 100
+        entry_size = estimate_size("k0", value)
+        tier = MemoryCacheTier(max_bytes=entry_size * 3, sweep_interval=0)
+
+        tier.set("k0", value)
+        tier.set("k1", value)
+        tier.set("k2", value)
+        tier.get("k0")  # k1 becomes least recently used
+        tier.set("k3", value)
+
+        assert "k1" not in tier
+        assert all(key in tier for key in ("k0", "k2", "k3"))
+        assert tier.size_bytes <= tier.max_bytes
+        assert tier.get_stats()["evictions"] == 1
+
+    def test_lowering_budget_evicts_immediately(self):
+        """Shrinking the budget evicts down to it without waiting for the next set"""
+        value = "v" * 100
+        entry_size = estimate_size("k0", value)
+        tier = MemoryCacheTier(max_bytes=entry_size * 3, sweep_interval=0)
+        for key in ("k0", "k1", "k2"):
+            tier.set(key, value)
+
+        assert tier.set_max_bytes(entry_size) == 2
+        assert "k2" in tier and len(tier) == 1
+        assert tier.size_bytes <= tier.max_bytes
+
+    def test_oversized_value_rejected(self, tier):
+        """A value larger than the whole budget is not cached"""
+        assert not tier.set("big", "x" * 20_000)
+        assert tier.get("big") is None
+        assert tier.size_bytes == 0
+
+    def test_overwrite_updates_accounting(self, tier):
+        """Replacing a key does not double count its size"""
+        tier.set("a", "x" * 100)
+        tier.set("a", "y" * 10)
+
+        assert tier.size_bytes == estimate_size("a", "y" * 10)
+
+    def test_ttl_expiry_on_get(self, tier):
+        """Expired entries are not returned"""
+        tier.set("short", 1, ttl=0.01)
+        time.sleep(0.02)
+
+        assert tier.get("short") is None
+        assert len(tier) == 0
+
+    def test_zero_ttl_expires_immediately(self, tier):
+        """ttl=0 is an explicit TTL, not a request for the default"""
+        tier.set("now", 1, ttl=0)
+
+        assert tier.get("now") is None
+
+    def test_sweep_removes_expired(self, tier):
+        """Sweeping removes expired entries without touching live ones"""
+        tier.set("short", 1, ttl=0.01)
+        tier.set("long", 2, ttl=60)
+        time.sleep(0.02)
+
+        assert tier.sweep_expired() == 1
+        assert "long" in tier and "short" not in tier
+
+    def test_sweep_ignores_superseded_expiry(self, tier):
+        """Re-setting a key with a longer TTL keeps it alive past the old deadline"""
+        tier.set("key", 1, ttl=0.01)
+        tier.set("key", 2, ttl=60)
+        time.sleep(0.02)
+
+        assert tier.sweep_expired() == 0
+        assert tier.get("key") == 2
+
+    def test_background_sweeper(self):
+        """The background sweeper removes expired entries on its own"""
+        tier = MemoryCacheTier(sweep_interval=0.01)
+        tier.set("short", 1, ttl=0.01)
+        time.sleep(0.1)
+        tier.stop_sweeper()
+
+        assert len(tier) == 0
+
+    def test_glob_pattern_uses_namespace(self, tier):
+        """Namespace globs only delete keys in that namespace"""
+        tier.set("user_profile:1", 1)
+        tier.set("user_profile:2", 2)
+        tier.set("market_data:1", 3)
+
+        assert tier.clear_pattern("user_profile:*") == 2
+        assert "market_data:1" in tier
+
+    def test_substring_pattern(self, tier):
+        """Patterns without wildcards keep substring semantics"""
+        tier.set("a:profile_1:x", 1)
+        tier.set("b:profile_2:x", 2)
+
+        assert tier.clear_pattern("profile_1") == 1
+        assert len(tier) == 1
+
+
+class TestCacheManagerMemoryTier:
+    """CacheManager uses the bounded tier when Redis is not configured"""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        return CacheManager()
+
+    @pytest.mark.asyncio
+    async def test_round_trip_and_pattern_clear(self, manager):
+        await manager.set("workflow_status:1", {"status": "ok"}, ttl=60)
+        assert await manager.get("workflow_status:1") == {"status": "ok"}
+
+        assert await manager.clear_pattern("workflow_status:*") == 1
+        assert await manager.get("workflow_status:1") is None
+
+    @pytest.mark.asyncio
+    async def test_stats_report_memory_usage(self, manager):
+        await manager.set("k", {"v": 1})
+        stats = await manager.get_stats()
+
+        assert stats["type"] == "memory"
+        assert stats["cache_size"] == 1
+        assert stats["memory_usage"].endswith("MB")
+
+    @pytest.mark.asyncio
+    async def test_memory_limit_applied_immediately(self, manager):
+        await manager.set("k", {"v": "x" * 2048})
+        manager.set_memory_limit(0)
+
+        assert await manager.get("k") is None
@@ -0,0 +1,120 @@
+"""
+Unit tests for ProfileProjection
+"""
+
+import copy
+import json
+import pickle
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data.csv_loader import CSVDataLoader
+from data.transaction_index import TransactionIndex
+from core.profile_projection import (
+    ProfileProjection,
+    PROJECTION_FIELDS,
+    IDENTITY_FIELDS,
+    scenario_profile_fields
+)
+
+DATA_DIR = str(Path(__file__).parent.parent / "data")
+
+
+class TestProfileProjection:
+    """Test cases for ProfileProjection"""
+
+    @pytest.fixture(scope="class")
+    def profile(self):
+        return CSVDataLoader(DATA_DIR).load_profile(1)
+
+    @pytest.mark.parametrize("customer_id", [1, 2, 3])
+    def test_summary_matches_full_profile(self, customer_id):
+        """Projections built without transaction models match the full-profile path"""
+        loader = CSVDataLoader(DATA_DIR)
+        index = TransactionIndex(DATA_DIR)
+        expected = ProfileProjection.from_profile(loader.load_profile(customer_id)).to_dict()
+
+        from_index = loader.load_profile_summary(customer_id, index.iter_transactions(customer_id))
+        from_csv = loader.load_profile_summary(customer_id)
+
+        assert from_index.transactions == [] and from_csv.transactions == []
+        assert ProfileProjection.from_profile(from_index).to_dict() == pytest.approx(expected)
+        assert ProfileProjection.from_profile(from_csv).to_dict() == pytest.approx(expected)
+
+    def test_dict_interface(self, profile):
+        """Scenarios can read the projection like the old payload dict"""
+        projection = ProfileProjection.from_profile(profile)
+
+        assert projection.get('monthly_income') == profile.monthly_income
+        assert projection['income'] == profile.monthly_income
+        assert projection.get('missing_field', 42) == 42
+        assert set(projection.keys()) == set(PROJECTION_FIELDS)
+        assert all('balance' in account for account in projection['accounts'])
+
+    def test_transactions_are_lazy(self, profile):
+        """Transactions are loaded only when asked for, and only once"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [{"amount": 1.0}]
+
+        projection = ProfileProjection.from_profile(profile, transaction_loader=loader)
+        dict(projection)
+        repr(projection)
+        assert calls == []
+
+        assert projection['transactions'] == [{"amount": 1.0}]
+        assert projection.transactions == [{"amount": 1.0}]
+        assert calls == [1]
+
+    def test_default_transactions_match_profile(self, profile):
+        """Without a loader, the profile's own transactions are converted"""
+        projection = ProfileProjection.from_profile(profile)
+
+        assert len(projection.transactions) == len(profile.transactions)
+
+    def test_read_only_and_slotted(self, profile):
+        """Projections have no instance dict and reject assignment"""
+        projection = ProfileProjection.from_profile(profile)
+
+        assert not hasattr(projection, '__dict__')
+        with pytest.raises(AttributeError):
+            projection.age = 99
+
+    def test_scenario_field_selection(self, profile):
+        """Declared scenario fields plus identity fields are echoed back"""
+        class Declared:
+            profile_fields = ('age', 'credit_score')
+
+        projection = ProfileProjection.from_profile(profile)
+        selected = projection.to_dict(scenario_profile_fields(Declared()))
+
+        assert list(selected.keys()) == list(IDENTITY_FIELDS) + ['age', 'credit_score']
+        assert projection.to_dict(scenario_profile_fields(object())).keys() == set(PROJECTION_FIELDS)
+
+    def test_copy_and_pickle(self, profile):
+        """Copies and pickles keep every field; pickles carry the transactions"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [{"amount": 1.0}]
+
+        projection = ProfileProjection.from_profile(profile, transaction_loader=loader)
+
+        shallow = copy.copy(projection)
+        deep = copy.deepcopy(projection)
+        assert dict(shallow) == dict(projection) == dict(deep)
+        assert deep['accounts'] is not projection['accounts']
+        assert calls == []
+
+        restored = pickle.loads(pickle.dumps(projection))
+        assert dict(restored) == dict(projection)
+        assert restored.transactions == [{"amount": 1.0}]
+        json.dumps(restored.to_dict())
@@ -9,13 +9,19 @@ import shutil
 from pathlib import Path
 import json
 import sys
+import threading
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from unittest.mock import patch
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
 from rag.profile_rag_system import (
     ProfileRAGSystem,
     ProfileRAGManager,
+    SharedProfileIndex,
+    create_dspy_analyzer,
     get_rag_manager
 )
 
@@ -171,6 +177,18 @@ class TestProfileRAGSystem:
         assert isinstance(all_result, str)
         assert len(all_result) > 0
     
+    def test_aggregate_questions_skip_retrieval(self, temp_csv_dir):
+        """Balance and spending totals are computed from the records"""
+        system = ProfileRAGSystem(1, temp_csv_dir)
+        
+        with patch.object(system, '_search') as search:
+            accounts_result = system.query("What are my account balances?", "query_accounts")
+            spending_result = system.query("How much did I spend on groceries?", "query_transactions")
+        
+        search.assert_not_called()
+        assert "net: $18,000.00" in accounts_result
+        assert spending_result.startswith("Total spending on groceries: $150.00")
+    
     def test_missing_csv_files(self):
         """Test behavior when CSV files are missing"""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -290,6 +308,195 @@ class TestProfileRAGManager:
                 assert 'data_types' in summary
 
 
+class TestSharedProfileIndex:
+    """Test cases for the index shared by every profile"""
+    
+    @pytest.fixture
+    def temp_csv_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        pd.DataFrame({
+            'account_id': [101, 102, 201],
+            'customer_id': [1, 1, 2],
+            'institution_name': ['Chase', 'Chase', 'Wells'],
+            'account_type': ['checking', 'savings', 'checking'],
+            'balance': [5000.0, 15000.0, 3000.0],
+        }).to_csv(f"{temp_dir}/account.csv", index=False)
+        # No customer_id column: shared by every profile
+        pd.DataFrame({
+            'transaction_id': [1001],
+            'amount': [-150.0],
+            'category': ['groceries'],
+            'date': ['2024-01-15'],
+            'description': ['Whole Foods']
+        }).to_csv(f"{temp_dir}/transaction.csv", index=False)
+        
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+    
+    def test_csvs_parsed_once_for_all_profiles(self, temp_csv_dir):
+        manager = ProfileRAGManager(temp_csv_dir)
+        
+        with patch('rag.profile_rag_system.pd.read_csv', wraps=pd.read_csv) as read_csv:
+            system1 = manager.get_profile_system(1)
+            system2 = manager.get_profile_system(2)
+        
+        assert read_csv.call_count == 2  # account.csv and transaction.csv
+        assert system1.vector_store is system2.vector_store
+        assert len(system1.profile_data['accounts']) == 2
+        assert len(system2.profile_data['accounts']) == 1
+    
+    def test_searches_filtered_by_profile(self, temp_csv_dir):
+        index = SharedProfileIndex(temp_csv_dir)
+        system = ProfileRAGSystem(2, temp_csv_dir, shared_index=index)
+        
+        accounts = system._search("checking savings balance", 'accounts', k=10)
+        assert [doc.metadata['customer_id'] for doc in accounts] == [2]
+        
+        transactions = system._search("groceries", 'transactions', k=10)
+        assert len(transactions) == 1  # Shared records are visible to every profile
+        assert system.get_profile_summary()['total_documents'] == 2
+    
+    def test_transactions_attributed_through_accounts(self, temp_csv_dir):
+        """Transactions keyed by account_id belong to the account's owner, not every profile"""
+        pd.DataFrame({
+            'transaction_id': [1001, 1002, 1003],
+            'account_id': [101, 201, 999],
+            'amount': [-150.0, -80.0, -10.0],
+            'description': ['Whole Foods', 'Trader Joes', 'Unknown account'],
+        }).to_csv(f"{temp_csv_dir}/transaction.csv", index=False)
+        index = SharedProfileIndex(temp_csv_dir)
+        system = ProfileRAGSystem(2, temp_csv_dir, shared_index=index)
+        
+        transactions = system._search("groceries", 'transactions', k=10)
+        assert [doc.metadata['customer_id'] for doc in transactions] == [2]
+        assert system.profile_data['transactions']['transaction_id'].tolist() == [1002]
+        assert len(index.vector_index) == 5  # Unknown-account transaction dropped
+        
+        standalone = ProfileRAGSystem(1, temp_csv_dir)
+        assert standalone.profile_data['transactions']['transaction_id'].tolist() == [1001]
+    
+    def test_shipped_transactions_found_by_category(self, tmp_path):
+        """transaction.csv rows carry category_id and timestamp, rendered as name and date"""
+        csv_dir = tmp_path / "data"
+        shutil.copytree(Path(__file__).parent.parent / "data", csv_dir)
+        index = SharedProfileIndex(str(csv_dir))
+
+        hits = index.vector_index.lexical.search("grocery", k=5)
+        documents = [index.vector_index.documents[row] for row, _ in hits]
+
+        assert len(documents) == 5
+        for doc in documents:
+            assert doc.metadata['data_type'] == 'transactions'
+            assert " for grocery: " in doc.page_content
+            assert "Unknown date" not in doc.page_content
+        assert any(" on 2025-" in doc.page_content for doc in documents)
+
+    def test_unknown_profile_has_no_records(self, temp_csv_dir):
+        system = ProfileRAGSystem(999, temp_csv_dir, shared_index=SharedProfileIndex(temp_csv_dir))
+        
+        assert system.profile_data['accounts'].empty
+        assert system._search("balance", 'accounts') == []
+    
+    def test_index_persisted_and_reloaded(self, temp_csv_dir):
+        """A second manager loads the saved index instead of embedding every record"""
+        ProfileRAGManager(temp_csv_dir).get_shared_index()
+        
+        with patch('langchain_core.embeddings.DeterministicFakeEmbedding.embed_documents') as embed:
+            index = ProfileRAGManager(temp_csv_dir).get_shared_index()
+        
+        assert index.loaded_from_disk
+        assert embed.call_count == 0
+        assert len(index.vector_index) == 4  # Three accounts and one shared transaction
+    
+    def test_changed_data_rebuilds_persisted_index(self, temp_csv_dir):
+        ProfileRAGManager(temp_csv_dir).get_shared_index()
+        pd.DataFrame({'customer_id': [1], 'age': [30]}).to_csv(f"{temp_csv_dir}/demographics.csv", index=False)
+        
+        index = ProfileRAGManager(temp_csv_dir).get_shared_index()
+        assert not index.loaded_from_disk
+        assert len(index.vector_index) == 5
+    
+    def test_background_build(self, temp_csv_dir):
+        manager = ProfileRAGManager(temp_csv_dir)
+        manager.start_background_build().join(timeout=30)
+        
+        assert manager.is_index_ready()
+        assert manager.get_profile_system(1).shared_index is manager.shared_index
+    
+    def test_invalidation_rebuilds_shared_index(self, temp_csv_dir):
+        manager = ProfileRAGManager(temp_csv_dir)
+        old_index = manager.get_profile_system(1).shared_index
+        
+        assert manager.invalidate_profiles([1]) == [1]
+        assert manager.get_profile_system(2).shared_index is not old_index
+
+    def test_invalidation_reembeds_only_changed_profiles(self, temp_csv_dir):
+        manager = ProfileRAGManager(temp_csv_dir)
+        system1 = manager.get_profile_system(1)
+        manager.get_profile_system(2)
+        accounts = pd.read_csv(f"{temp_csv_dir}/account.csv")
+        accounts.loc[accounts['customer_id'] == 2, 'balance'] = 4200.0
+        accounts.to_csv(f"{temp_csv_dir}/account.csv", index=False)
+
+        assert manager.invalidate_profiles({2}) == [2]
+        assert manager.get_profile_system(1) is system1  # Still served from the old index
+
+        with patch.object(
+            DeterministicFakeEmbedding, 'embed_documents', autospec=True,
+            side_effect=DeterministicFakeEmbedding.embed_documents
+        ) as embed:
+            index = manager.get_shared_index()
+
+        embedded = [text for call in embed.call_args_list for text in call.args[1]]
+        assert len(embedded) == 1 and "4,200.00" in embedded[0]
+        assert len(index.vector_index) == 4
+        assert system1.vector_store is index.vector_index
+        accounts = manager.get_profile_system(2)._search("checking balance", 'accounts')
+        assert "4,200.00" in accounts[0].page_content
+
+    def test_invalidation_not_blocked_by_build(self, temp_csv_dir):
+        """A build invalidated while running is discarded and rebuilt from the new data"""
+        manager = ProfileRAGManager(temp_csv_dir)
+        started, release = threading.Event(), threading.Event()
+        builds = []
+        real_init = SharedProfileIndex.__init__
+
+        def slow_init(index, *args, **kwargs):
+            builds.append(index)
+            if len(builds) == 1:
+                started.set()
+                release.wait(timeout=30)
+            real_init(index, *args, **kwargs)
+
+        with patch.object(SharedProfileIndex, '__init__', slow_init):
+            builder = threading.Thread(target=manager.get_shared_index)
+            builder.start()
+            assert started.wait(timeout=30)
+            invalidator = threading.Thread(target=manager.invalidate_profiles, args=([1],))
+            invalidator.start()
+            invalidator.join(timeout=5)
+            assert not invalidator.is_alive()
+            release.set()
+            builder.join(timeout=30)
+
+        assert len(builds) == 2
+        assert manager.shared_index is builds[1]
+
+    def test_system_not_cached_on_invalidated_index(self, temp_csv_dir):
+        manager = ProfileRAGManager(temp_csv_dir)
+        old_index = manager.get_shared_index()
+        manager.invalidate_profiles([1])
+        real_get = manager.get_shared_index
+        # The first caller sees the index from before the invalidation
+        results = iter([old_index])
+
+        with patch.object(manager, 'get_shared_index', side_effect=lambda: next(results, None) or real_get()):
+            system = manager.get_profile_system(1)
+
+        assert system.shared_index is manager.shared_index
+        assert system.shared_index is not old_index
+
+
 class TestRAGManagerSingleton:
     """Test the global RAG manager singleton"""
     
@@ -349,6 +556,20 @@ class TestErrorHandling:
             assert isinstance(result, str)
 
 
+def test_dspy_analyzer_leaves_global_settings_alone(monkeypatch):
+    """Building the analyzer on a background thread must not make it DSPy's owner thread"""
+    import dspy
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    analyzers = []
+    
+    builder = threading.Thread(target=lambda: analyzers.append(create_dspy_analyzer()))
+    builder.start()
+    builder.join()
+    
+    assert analyzers[0] is not None
+    dspy.configure(lm=dspy.settings.lm)  # Raises if another thread configured DSPy
+
+
 # Test data validation
 def test_tool_descriptions():
     """Test that all tools have proper descriptions"""
@@ -0,0 +1,138 @@
+"""
+Unit tests for the semantic RAG result cache
+"""
+
+import pytest
+from unittest.mock import Mock
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from langchain_core.embeddings import Embeddings
+
+from rag.abstractions import RAGQuery, RAGResult, QueryType, BatchedRAGRequest
+from rag.batched_service import BatchedRAGService
+from rag.implementations import SimpleRAGQueryExecutor
+from rag.semantic_cache import SemanticRAGCache
+
+
+class PhraseEmbeddings(Embeddings):
+    """Fixed vectors so paraphrases are close and unrelated questions are not"""
+
+    VECTORS = {
+        "what are my balances": [1.0, 0.0, 0.0],
+        "show account balances": [0.98, 0.2, 0.0],
+        "how much did i spend on food": [0.0, 0.0, 1.0],
+        "how much did i spend on travel": [0.0, 0.05, 1.0],
+        "which bank holds my savings": [0.0, 1.0, 0.0],
+        "where is my savings account held": [0.1, 0.98, 0.0],
+    }
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self.VECTORS[text]
+
+
+def _result(query, answer="balances: $100"):
+    return RAGResult(query=query, result=answer, success=True)
+
+
+class TestSemanticRAGCache:
+    """Test cases for SemanticRAGCache"""
+
+    @pytest.fixture
+    def cache(self):
+        return SemanticRAGCache(PhraseEmbeddings(), similarity_threshold=0.9)
+
+    async def _store(self, cache, text, query_type=QueryType.ACCOUNTS, profile_id=1, data_version="v1"):
+        query = RAGQuery(text, query_type)
+        cache.store(profile_id, query, await cache.embed(text), _result(query), data_version)
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_hits(self, cache):
+        await self._store(cache, "what are my balances")
+
+        query = RAGQuery("show account balances", QueryType.ACCOUNTS)
+        hit = cache.lookup(1, query, await cache.embed(query.query_text), "v1")
+
+        assert hit.result == "balances: $100"
+        assert hit.query is query
+
+    @pytest.mark.asyncio
+    async def test_unrelated_question_misses(self, cache):
+        await self._store(cache, "what are my balances")
+
+        query = RAGQuery("how much did i spend on food", QueryType.ACCOUNTS)
+        assert cache.lookup(1, query, await cache.embed(query.query_text), "v1") is None
+
+    @pytest.mark.asyncio
+    async def test_scoped_to_profile_and_query_type(self, cache):
+        await self._store(cache, "what are my balances")
+        vector = await cache.embed("show account balances")
+
+        assert cache.lookup(2, RAGQuery("show account balances", QueryType.ACCOUNTS), vector, "v1") is None
+        assert cache.lookup(1, RAGQuery("show account balances", QueryType.GOALS), vector, "v1") is None
+
+    @pytest.mark.asyncio
+    async def test_data_version_change_drops_entries(self, cache):
+        await self._store(cache, "what are my balances")
+        query = RAGQuery("what are my balances", QueryType.ACCOUNTS)
+
+        assert cache.lookup(1, query, await cache.embed(query.query_text), "v2") is None
+        assert cache.get_stats()["total_entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_oldest_entry_overwritten_when_full(self):
+        cache = SemanticRAGCache(PhraseEmbeddings(), similarity_threshold=0.9, max_entries_per_profile=1)
+        await self._store(cache, "what are my balances")
+        await self._store(cache, "how much did i spend on food")
+
+        query = RAGQuery("what are my balances", QueryType.ACCOUNTS)
+        assert cache.lookup(1, query, await cache.embed(query.query_text), "v1") is None
+        assert cache.invalidate(1) == 1
+
+    @staticmethod
+    def _service(answer):
+        profile_system = Mock()
+        profile_system.query.return_value = answer
+        rag_manager = Mock()
+        rag_manager.get_profile_system.return_value = profile_system
+        service = BatchedRAGService(
+            query_executor=SimpleRAGQueryExecutor(rag_manager),
+            data_version=lambda profile_id: "v1",
+            semantic_cache=SemanticRAGCache(PhraseEmbeddings(), similarity_threshold=0.9)
+        )
+        return service, profile_system
+
+    @pytest.mark.asyncio
+    async def test_batched_service_answers_paraphrase_from_cache(self):
+        service, profile_system = self._service("Savings at Ally")
+
+        for text in ["which bank holds my savings", "where is my savings account held"]:
+            response = await service.execute_batch(
+                BatchedRAGRequest(profile_id=1, queries=[RAGQuery(text, QueryType.ACCOUNTS)])
+            )
+            assert response.get_result(QueryType.ACCOUNTS).result == "Savings at Ally"
+
+        assert profile_system.query.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_exact_aggregate_answers_not_cached(self):
+        """Close embeddings with different parameters must not share a computed total"""
+        service, profile_system = self._service("Total spending: $100")
+
+        for text in ["how much did i spend on food", "how much did i spend on travel"]:
+            await service.execute_batch(
+                BatchedRAGRequest(profile_id=1, queries=[RAGQuery(text, QueryType.TRANSACTIONS)])
+            )
+
+        assert profile_system.query.call_count == 2
+        assert service._semantic_cache.get_stats()["total_entries"] == 0
@@ -0,0 +1,116 @@
+"""
+Unit tests for progressive Monte Carlo results
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.simulation_progress import SimulationProgress, report_progress, stream_simulation
+from scenarios.emergency_fund import EmergencyFundScenario
+
+
+class CountingScenario:
+    """Records outcomes 1..n, succeeding on even values"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.recorded = 0
+        self.thread = None
+
+    def run_simulation(self, profile_data, config):
+        self.thread = threading.current_thread()
+        total = config['iterations']
+        progress = SimulationProgress(total, 'value')
+        for value in range(1, total + 1):
+            time.sleep(self.delay)
+            self.recorded += 1
+            progress.record(value, value % 2 == 0)
+        return {'total': total}
+
+
+class TestSimulationProgress:
+    """Test cases for SimulationProgress"""
+
+    def test_no_listener_is_noop(self):
+        progress = SimulationProgress(10, 'value')
+        for value in range(10):
+            progress.record(value)
+
+        assert progress.callback is None
+        assert progress.completed == 0
+
+    def test_snapshot_every_chunk(self):
+        snapshots = []
+        with report_progress(snapshots.append, chunks=4):
+            CountingScenario().run_simulation({}, {'iterations': 10})
+
+        assert [s['completed'] for s in snapshots] == [3, 6, 9, 10]
+        final = snapshots[-1]
+        assert final['fraction'] == 1.0
+        assert final['mean'] == 5.5
+        assert final['percentiles']['50'] == pytest.approx(np.percentile(np.arange(1, 11), 50))
+        assert final['success_probability'] == 0.5
+        assert snapshots[0]['success_probability'] == pytest.approx(1 / 3)
+
+    def test_success_probability_optional(self):
+        snapshots = []
+        with report_progress(snapshots.append, chunks=1):
+            progress = SimulationProgress(2, 'value')
+            progress.record(1.0)
+            progress.record(2.0)
+
+        assert snapshots[-1]['success_probability'] is None
+
+
+class TestStreamSimulation:
+    """Test cases for stream_simulation"""
+
+    @pytest.mark.asyncio
+    async def test_progress_then_result_from_worker_thread(self):
+        scenario = CountingScenario()
+        updates = [update async for update in stream_simulation(scenario, {}, {'iterations': 100}, chunks=5)]
+
+        assert [u.progress['completed'] for u in updates[:-1]] == [20, 40, 60, 80, 100]
+        assert updates[-1].result == {'total': 100}
+        assert scenario.thread is not threading.main_thread()
+
+    @pytest.mark.asyncio
+    async def test_closing_stops_simulation(self):
+        scenario = CountingScenario(delay=0.002)
+        updates = stream_simulation(scenario, {}, {'iterations': 1000}, chunks=100)
+
+        first = await updates.__anext__()
+        await updates.aclose()
+        await asyncio.sleep(0.1)
+        stopped_at = scenario.recorded
+        await asyncio.sleep(0.1)
+
+        assert first.progress['completed'] == 10
+        assert stopped_at < 1000
+        assert scenario.recorded == stopped_at
+
+    @pytest.mark.asyncio
+    async def test_emergency_fund_estimates_converge_to_result(self):
+        config = {'simulations': 50}
+        profile = {'monthly_income': 6000, 'monthly_expenses': 4000, 'emergency_fund': 8000}
+        updates = [u async for u in stream_simulation(EmergencyFundScenario(), profile, config, chunks=5)]
+
+        final_estimate = updates[-2].progress
+        result = updates[-1].result
+        final_amounts = np.array(result['simulation_results']['final_amounts'])
+
+        assert len(updates) == 6
+        assert final_estimate['metric'] == 'final_emergency_fund'
+        assert final_estimate['mean'] == pytest.approx(final_amounts.mean())
+        assert final_estimate['success_probability'] == pytest.approx(
+            (final_amounts >= result['target_emergency_fund']).mean()
+        )
@@ -0,0 +1,146 @@
+"""
+Unit tests for SQLiteProfileRepository
+"""
+
+import os
+import pytest
+import tempfile
+import shutil
+from datetime import datetime
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data.csv_loader import CSVDataLoader
+from data.sqlite_repository import SQLiteProfileRepository
+
+DATA_DIR = str(Path(__file__).parent.parent / "data")
+
+
+class TestSQLiteProfileRepository:
+    """Test cases for SQLiteProfileRepository"""
+
+    @pytest.fixture(scope="class")
+    def repository(self):
+        """Build an in-memory repository from the bundled CSV data"""
+        repo = SQLiteProfileRepository(DATA_DIR)
+        yield repo
+        repo.close()
+
+    @pytest.fixture(scope="class")
+    def csv_loader(self):
+        """Reference CSV loader over the same data"""
+        return CSVDataLoader(DATA_DIR)
+
+    def test_available_profiles_match_csv(self, repository, csv_loader):
+        """Repository exposes the same customers as the CSV loader"""
+        assert repository.get_available_profiles() == sorted(csv_loader.get_available_profiles())
+
+    @pytest.mark.parametrize("customer_id", [1, 2, 3])
+    def test_profile_matches_csv_loader(self, repository, csv_loader, customer_id):
+        """Loaded profiles are equivalent to the CSV loader output"""
+        from_db = repository.load_profile(customer_id)
+        from_csv = csv_loader.load_profile(customer_id)
+
+        assert from_db.customer_id == from_csv.customer_id
+        assert from_db.age == from_csv.age
+        assert from_db.demographic == from_csv.demographic
+        assert from_db.credit_score == from_csv.credit_score
+        assert from_db.monthly_income == pytest.approx(from_csv.monthly_income)
+        assert from_db.monthly_expenses == pytest.approx(from_csv.monthly_expenses)
+        assert len(from_db.transactions) == len(from_csv.transactions)
+        assert [a.model_dump() for a in from_db.accounts] == [a.model_dump() for a in from_csv.accounts]
+
+    def test_summary_skips_transactions(self, repository):
+        """Summaries carry the precomputed metrics without the transaction list"""
+        summary = repository.load_profile_summary(1)
+        full = repository.load_profile(1)
+
+        assert summary.transactions == []
+        assert summary.model_dump(exclude={'transactions'}) == full.model_dump(exclude={'transactions'})
+
+    def test_missing_profile_raises(self, repository):
+        """Unknown customers raise ValueError like the CSV loader"""
+        with pytest.raises(ValueError):
+            repository.load_profile(9999)
+
+    def test_transactions_resolve_category_names(self, repository):
+        """Transactions carry category names from category.csv"""
+        transactions = repository.get_transactions(1)
+        categories = {t.category for t in transactions}
+
+        assert 'salary' in categories
+        assert None not in categories
+
+    def test_date_range_query(self, repository):
+        """Date range queries are inclusive of start and exclusive of end"""
+        start = datetime(2025, 8, 1)
+        end = datetime(2025, 8, 5)
+        transactions = repository.get_transactions(1, start, end)
+
+        assert len(transactions) > 0
+        assert all(start <= t.timestamp < end for t in transactions)
+        assert [t.timestamp for t in transactions] == sorted(t.timestamp for t in transactions)
+
+    def test_limit_returns_most_recent(self, repository):
+        """A limit returns the most recent transactions first"""
+        all_transactions = repository.get_transactions(1)
+        recent = repository.get_transactions(1, limit=5)
+
+        assert len(recent) == 5
+        assert recent[0].timestamp == max(t.timestamp for t in all_transactions)
+
+    def test_spending_categories_precomputed(self, repository):
+        """Spending categories are pre-computed per profile"""
+        categories = repository.get_spending_categories(1)
+
+        assert len(categories) > 0
+        assert sum(c['percentage'] for c in categories) == pytest.approx(100, abs=1)
+        assert categories == sorted(categories, key=lambda c: c['amount'], reverse=True)
+
+    def test_declared_indexes_exist(self, repository):
+        """Indexes declared in schema.sql are created"""
+        rows = repository._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        ).fetchall()
+        names = {row['name'] for row in rows}
+
+        assert 'idx_accounts_profile_id' in names
+        assert 'idx_transactions_profile_id' in names
+        assert 'idx_transactions_date' in names
+
+
+class TestSQLiteRepositoryPersistence:
+    """Test on-disk database reuse and rebuild"""
+
+    @pytest.fixture
+    def temp_data_dir(self):
+        """Copy the bundled CSV data into a temporary directory"""
+        temp_dir = tempfile.mkdtemp()
+        for filename in ('customer.csv', 'account.csv', 'transaction.csv', 'category.csv', 'goal.csv'):
+            shutil.copy(os.path.join(DATA_DIR, filename), temp_dir)
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def test_existing_database_is_reused(self, temp_data_dir):
+        """A database newer than the CSVs is not rebuilt"""
+        db_path = os.path.join(temp_data_dir, "profiles.db")
+        SQLiteProfileRepository(temp_data_dir, db_path=db_path).close()
+
+        repo = SQLiteProfileRepository(temp_data_dir, db_path=db_path)
+        assert not repo._is_stale()
+        assert repo.get_available_profiles() == [1, 2, 3]
+        repo.close()
+
+    def test_newer_csv_triggers_rebuild(self, temp_data_dir):
+        """Touching a CSV file marks the database as stale"""
+        db_path = os.path.join(temp_data_dir, "profiles.db")
+        repo = SQLiteProfileRepository(temp_data_dir, db_path=db_path)
+
+        future = os.path.getmtime(db_path) + 10
+        os.utime(os.path.join(temp_data_dir, 'transaction.csv'), (future, future))
+
+        assert repo._is_stale()
+        repo.close()
@@ -0,0 +1,262 @@
+"""
+Unit tests for the streaming AI pipeline and its per-profile indexer
+"""
+
+import json
+import shutil
+import tempfile
+
+import pandas as pd
+import pytest
+from unittest.mock import Mock, patch, AsyncMock
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from api.streaming_ai import StreamingAIPipeline, StreamEventType, OptimizedRAGIndexer
+from core.api_cache import UnifiedAPICache, APIConfig, APIProvider
+from rag.profile_rag_system import ProfileRAGSystem
+
+
+SIMULATION_DATA = {'scenario_name': 'emergency_fund', 'months_covered': 2.5}
+USER_PROFILE = {'monthly_income': 5000, 'demographic': 'millennial'}
+
+
+class FakeLLM:
+    """Streams a fixed rationale a few words at a time"""
+
+    def __init__(self, text="Your checking balance covers two months.", fail_for=None):
+        self.text = text
+        self.fail_for = fail_for
+        self.prompts = []
+
+    async def stream_completion(self, prompt=None, **kwargs):
+        self.prompts.append(prompt)
+        if self.fail_for and self.fail_for in prompt:
+            raise RuntimeError("provider down")
+        for word in self.text.split(" "):
+            yield word + " "
+
+
+@pytest.fixture
+def temp_csv_dir():
+    """Profile 1 data in the layout of the real CSVs"""
+    temp_dir = tempfile.mkdtemp()
+    pd.DataFrame({
+        'account_id': [101, 102, 103, 201],
+        'customer_id': [1, 1, 1, 2],
+        'institution_name': ['Chase', 'Chase', 'Amex', 'Wells'],
+        'account_type': ['checking', 'savings', 'credit_card', 'checking'],
+        'balance': [5000.0, 15000.0, -2000.0, 3000.0],
+        'account_number': ['****1234', '****5678', '****9012', '****3456']
+    }).to_csv(f"{temp_dir}/account.csv", index=False)
+    pd.DataFrame({
+        'account_id': [101, 103, 103, 101, 201],
+        'timestamp': ['2025-07-03 10:00:00', '2025-07-20 12:00:00', '2025-08-02 09:30:00',
+                      '2025-08-01 09:00:00', '2025-08-02 10:00:00'],
+        'amount': [-120.50, -780.25, -45.00, 4000.00, -999.00],
+        'description': ['Whole Foods', 'Costco Run', 'Chipotle', 'Salary', 'Someone else'],
+        'category_id': [1, 1, 3, 5, 1]
+    }).to_csv(f"{temp_dir}/transaction.csv", index=False)
+    pd.DataFrame({
+        'category_id': [1, 3, 5],
+        'name': ['grocery', 'dining', 'salary']
+    }).to_csv(f"{temp_dir}/category.csv", index=False)
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def rag_manager(temp_csv_dir):
+    system = ProfileRAGSystem(1, temp_csv_dir)
+    manager = Mock()
+    manager.get_profile_system.return_value = system
+    return manager
+
+
+def _template_pipeline(rag_manager=None):
+    """Pipeline that keeps the template rationales whatever providers are configured"""
+    pipeline = StreamingAIPipeline(rag_manager)
+    pipeline.ai_system = None
+    return pipeline
+
+
+async def _collect(pipeline, **kwargs):
+    return [event async for event in pipeline.stream_ai_generation(SIMULATION_DATA, USER_PROFILE, **kwargs)]
+
+
+class TestOptimizedRAGIndexer:
+    """Test cases for OptimizedRAGIndexer"""
+
+    def test_indexes_built_per_value(self, rag_manager):
+        indexer = OptimizedRAGIndexer(rag_manager.get_profile_system(1))
+
+        assert {'category_grocery', 'month_2025_07', 'amount_medium', 'account_type_checking', 'institution_amex'} <= set(indexer.indexes)
+        assert 'institution_wells' not in indexer.indexes
+
+    def test_aggregate_question_answered_from_indexes(self, rag_manager):
+        indexer = OptimizedRAGIndexer(rag_manager.get_profile_system(1))
+
+        result = indexer.optimized_query("How much did I spend on groceries last month?", "chat")
+
+        assert result['query_type'] == 'spending_analysis'
+        assert result['source'] == 'structured'
+        assert result['answer'] == "Total spending on grocery in July 2025: $900.75 across 2 transactions."
+        assert result['indexes_used'] == ['category_grocery', 'month_2025_07']
+        assert [record['description'] for record in result['records']] == ['Whole Foods', 'Costco Run']
+        json.dumps(result)
+
+    def test_index_families_intersect(self, rag_manager):
+        indexer = OptimizedRAGIndexer(rag_manager.get_profile_system(1))
+
+        used, records = indexer._lookup("large purchases in july", 'transactions')
+
+        assert set(used) == {'amount_large', 'month_2025_07'}
+        assert [record['description'] for record in records] == ['Costco Run']
+
+    def test_open_question_uses_retrieval(self, rag_manager):
+        system = rag_manager.get_profile_system(1)
+        indexer = OptimizedRAGIndexer(system)
+
+        with patch.object(system, 'query', return_value="retrieved") as mock_query:
+            result = indexer.optimized_query("Should I pay off my credit card first?")
+
+        assert result['query_type'] == 'debt_analysis'
+        assert result['source'] == 'retrieval'
+        assert result['answer'] == "retrieved"
+        mock_query.assert_called_once_with("Should I pay off my credit card first?", 'query_accounts')
+
+    def test_pipeline_reuses_indexer_until_profile_rebuilt(self, rag_manager, temp_csv_dir):
+        pipeline = StreamingAIPipeline(rag_manager, llm=FakeLLM())
+        indexer = pipeline.get_optimized_indexer(1)
+        assert pipeline.get_optimized_indexer(1) is indexer
+
+        rag_manager.get_profile_system.return_value = ProfileRAGSystem(1, temp_csv_dir)
+        assert pipeline.get_optimized_indexer(1) is not indexer
+
+    def test_indexer_requires_rag_manager(self):
+        with pytest.raises(RuntimeError):
+            StreamingAIPipeline(llm=FakeLLM()).get_optimized_indexer(1)
+
+
+class TestStreamingAIPipeline:
+    """Test cases for StreamingAIPipeline"""
+
+    @pytest.mark.asyncio
+    async def test_cards_sent_before_rationale_tokens(self, rag_manager):
+        events = await _collect(StreamingAIPipeline(rag_manager, llm=FakeLLM()))
+        types = [event.event_type for event in events]
+
+        assert types[0] == StreamEventType.START
+        assert types[-1] == StreamEventType.COMPLETE
+        assert types.index(StreamEventType.CARD) < types.index(StreamEventType.TOKEN)
+        assert types.count(StreamEventType.CARD_COMPLETE) == types.count(StreamEventType.CARD)
+        progress = [event.progress for event in events]
+        assert progress == sorted(progress)
+
+    @pytest.mark.asyncio
+    async def test_rationales_streamed_and_grounded(self, rag_manager):
+        llm = FakeLLM()
+        events = await _collect(StreamingAIPipeline(rag_manager, llm=llm))
+
+        cards = events[-1].data['cards']
+        assert cards and all(card['rationale'] == llm.text for card in cards)
+        tokens = "".join(event.data['delta'] for event in events
+                         if event.event_type == StreamEventType.TOKEN and event.data['card_index'] == 0)
+        assert tokens.strip() == llm.text
+        assert "Total assets: $20,000.00" in llm.prompts[0]
+
+    @pytest.mark.asyncio
+    async def test_failed_rationale_keeps_template(self, rag_manager):
+        pipeline = StreamingAIPipeline(rag_manager, llm=FakeLLM())
+        template = await _collect(_template_pipeline(rag_manager))
+        first_title = template[-1].data['cards'][0]['title']
+        pipeline.ai_system.fail_for = first_title
+
+        events = await _collect(pipeline)
+
+        completes = {event.data['card_index']: event for event in events if event.event_type == StreamEventType.CARD_COMPLETE}
+        assert completes[0].data['error'] == "provider down"
+        assert events[-1].data['cards'][0]['rationale'] == template[-1].data['cards'][0]['rationale']
+        assert events[-1].data['cards'][1]['rationale'] == pipeline.ai_system.text
+
+    @pytest.mark.asyncio
+    async def test_without_llm_or_rag(self):
+        events = await _collect(_template_pipeline())
+        types = [event.event_type for event in events]
+
+        assert StreamEventType.TOKEN not in types
+        assert events[types.index(StreamEventType.RAG_RETRIEVAL)].data['profile_context'] is None
+        assert all(event.data['message'] == event.message for event in events)
+
+
+class TestStreamCompletion:
+    """Test cases for UnifiedAPICache.stream_completion"""
+
+    @pytest.fixture
+    def cache(self):
+        UnifiedAPICache._instance = None
+        cache = UnifiedAPICache()
+        cache.configs = {
+            APIProvider.OPENAI.value: APIConfig(
+                provider=APIProvider.OPENAI, api_key="test-key",
+                base_url="https://api.openai.com/v1", model="gpt-4o-mini"
+            ),
+            APIProvider.ANTHROPIC.value: APIConfig(
+                provider=APIProvider.ANTHROPIC, api_key="test-key",
+                base_url="https://api.anthropic.com/v1", model="claude-3-haiku"
+            )
+        }
+        return cache
+
+    @staticmethod
+    def _stream(*chunks, error=None):
+        async def stream(config, prompt, messages, **kwargs):
+            for chunk in chunks:
+                yield chunk
+            if error:
+                raise error
+        return stream
+
+    @pytest.mark.asyncio
+    async def test_streamed_text_cached(self, cache):
+        with patch.object(cache, '_stream_api_call', side_effect=self._stream("Hello", " world")):
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=None):
+                with patch('core.api_cache.cache_manager.set', new_callable=AsyncMock) as mock_set:
+                    chunks = [c async for c in cache.stream_completion("hi", provider=APIProvider.OPENAI)]
+
+        assert chunks == ["Hello", " world"]
+        assert mock_set.call_args[0][1]["result"] == "Hello world"
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_provider(self, cache):
+        with patch.object(cache, '_stream_api_call') as mock_stream:
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value={"result": "Cached"}):
+                chunks = [c async for c in cache.stream_completion("hi", provider=APIProvider.OPENAI)]
+
+        assert chunks == ["Cached"]
+        mock_stream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fallback_tried_once_before_first_chunk(self, cache):
+        streams = [self._stream(error=RuntimeError("down"))(None, None, None), self._stream("Fallback")(None, None, None)]
+        with patch.object(cache, '_stream_api_call', side_effect=streams) as mock_stream:
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=None):
+                with patch('core.api_cache.cache_manager.set', new_callable=AsyncMock):
+                    chunks = [c async for c in cache.stream_completion("hi", provider=APIProvider.ANTHROPIC)]
+        assert chunks == ["Fallback"]
+        assert mock_stream.call_args[0][0].provider == APIProvider.OPENAI
+
+        with patch.object(cache, '_stream_api_call', side_effect=self._stream("Part", error=RuntimeError("cut off"))):
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=None):
+                with pytest.raises(RuntimeError):
+                    [c async for c in cache.stream_completion("hi", provider=APIProvider.ANTHROPIC)]
+
+        failing = self._stream(error=RuntimeError("down"))
+        with patch.object(cache, '_stream_api_call', side_effect=failing) as mock_stream:
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=None):
+                with pytest.raises(RuntimeError):
+                    [c async for c in cache.stream_completion("hi", provider=APIProvider.ANTHROPIC)]
+        assert mock_stream.call_count == 2
@@ -0,0 +1,128 @@
+"""
+Unit tests for the structured query fast path
+"""
+
+import pandas as pd
+import pytest
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag.profile_rag_system import attribute_to_customers
+from rag.structured_queries import StructuredQueryPlanner, load_category_names, NON_FLOW_CATEGORIES
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+@pytest.fixture
+def planner():
+    accounts = pd.DataFrame({
+        'account_id': [101, 102, 103],
+        'customer_id': [1, 1, 1],
+        'institution_name': ['Chase', 'Chase', 'Amex'],
+        'account_number': ['****1234', '****5678', '****9012'],
+        'account_type': ['checking', 'savings', 'credit_card'],
+        'balance': [5000.0, 15000.0, -2000.0]
+    })
+    # No customer_id: rows are attributed through account_id, as in transaction.csv
+    transactions = pd.DataFrame({
+        'account_id': [101, 103, 103, 101, 999],
+        'timestamp': ['2025-07-03 10:00:00', '2025-07-20 12:00:00', '2025-08-02 09:30:00', '2025-08-01 09:00:00', '2025-08-02 10:00:00'],
+        'amount': [-120.50, -80.25, -45.00, 4000.00, -999.00],
+        'description': ['Whole Foods', 'Trader Joes', 'Chipotle', 'Salary', 'Someone else'],
+        'category_id': [1, 1, 3, 5, 1]
+    })
+    goals = pd.DataFrame({
+        'customer_id': [1],
+        'name': ['Emergency Fund'],
+        'target_amount': [10000.0],
+        'current_amount': [2500.0],
+        'target_date': ['2026-12-31']
+    })
+    return StructuredQueryPlanner(
+        {'accounts': accounts, 'transactions': transactions, 'goals': goals},
+        category_names={1: 'grocery', 3: 'dining', 5: 'salary'}
+    )
+
+
+class TestStructuredQueryPlanner:
+    """Test cases for StructuredQueryPlanner"""
+
+    def test_account_balances_and_totals(self, planner):
+        answer = planner.answer("What are my account balances?", 'accounts')
+
+        assert "Checking ****1234 at Chase: $5,000.00" in answer
+        assert "Total assets: $20,000.00; total debts: $2,000.00; net: $18,000.00" in answer
+
+    def test_account_type_filter(self, planner):
+        answer = planner.answer("what's my savings balance", 'accounts')
+
+        assert "Savings ****5678" in answer
+        assert "Checking" not in answer
+
+    def test_category_and_month_filter(self, planner):
+        """'Last month' is relative to the latest transaction and 'groceries' matches 'grocery'"""
+        answer = planner.answer("total spending on groceries last month", 'transactions')
+
+        assert answer == "Total spending on grocery in July 2025: $200.75 across 2 transactions."
+
+    def test_other_profiles_transactions_excluded(self, planner):
+        answer = planner.answer("how much did I spend in august", 'transactions')
+
+        assert answer.startswith("Total spending in August 2025: $45.00 across 1 transactions.")
+        assert "dining $45.00" in answer
+
+    def test_income_and_counts(self, planner):
+        assert planner.answer("how much income did I earn", 'transactions').startswith("Total income: $4,000.00")
+        assert planner.answer("how many grocery purchases", 'transactions').startswith("2 spending transactions on grocery")
+
+    def test_goal_progress(self, planner):
+        answer = planner.answer("what is my goal progress", 'goals')
+
+        assert "Emergency Fund: target $10,000.00 by 2026-12-31, saved $2,500.00 (25.0%)" in answer
+
+    def test_open_ended_questions_use_retrieval(self, planner):
+        assert planner.answer("should I pay off my credit card balance first?", 'accounts') is None
+        assert planner.answer("tell me about my checking account", 'accounts') is None
+        assert planner.answer("what is my risk profile", 'demographics') is None
+
+    def test_category_names_loaded_from_csv(self, tmp_path):
+        pd.DataFrame({'category_id': [1, 2], 'name': ['grocery', 'utilities']}).to_csv(tmp_path / "category.csv", index=False)
+
+        assert load_category_names(str(tmp_path)) == {1: 'grocery', 2: 'utilities'}
+        assert load_category_names(str(tmp_path / "missing")) == {}
+
+
+class TestStructuredQueriesOnShippedData:
+    """Exact answers for profile 1 from the real data/*.csv files"""
+
+    @pytest.fixture(scope="class")
+    def planner(self):
+        frames = {
+            'accounts': pd.read_csv(DATA_DIR / "account.csv"),
+            'transactions': pd.read_csv(DATA_DIR / "transaction.csv")
+        }
+        attribute_to_customers(frames)
+        profile = {data_type: df[df['customer_id'] == 1] for data_type, df in frames.items()}
+        return StructuredQueryPlanner(profile, load_category_names(str(DATA_DIR)))
+
+    def test_category_profile_never_used(self, planner):
+        """A known category with no transactions is not read as an unfiltered question"""
+        assert planner.answer("how much did I spend on rent", 'transactions') == "No spending on rent found."
+
+    def test_biggest_expense_skips_opening_balance(self, planner):
+        answer = planner.answer("What is my biggest expense?", 'transactions')
+
+        assert "opening_balance" not in answer
+        assert "(mortgage_payment)" in answer
+
+    def test_income_excludes_transfers_and_payments(self, planner):
+        answer = planner.answer("How much income did I earn this year", 'transactions')
+
+        assert answer.startswith("Total income in 2025: $43,723.93 across 25 transactions.")
+        assert not any(category in answer for category in NON_FLOW_CATEGORIES)
+
+    def test_named_transfer_category_still_answered(self, planner):
+        assert planner.answer("how much did I transfer", 'transactions').startswith("Total spending on transfer:")
@@ -0,0 +1,89 @@
+"""
+Unit tests for TransactionIndex
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from data.csv_loader import CSVDataLoader
+from data.transaction_index import TransactionIndex, decode_cursor
+
+DATA_DIR = str(Path(__file__).parent.parent / "data")
+
+
+class TestTransactionIndex:
+    """Test cases for TransactionIndex"""
+
+    @pytest.fixture(scope="class")
+    def index(self):
+        return TransactionIndex(DATA_DIR)
+
+    @pytest.fixture(scope="class")
+    def csv_loader(self):
+        return CSVDataLoader(DATA_DIR)
+
+    def test_iteration_matches_loader(self, index, csv_loader):
+        """The index holds the same transactions as the CSV loader, in sorted order"""
+        indexed = list(index.iter_transactions(1))
+        loaded = csv_loader.load_profile(1).transactions
+
+        assert sorted(str(r.transaction_id) for r in indexed) == sorted(t.transaction_id for t in loaded)
+        assert [r.sort_key for r in indexed] == sorted(r.sort_key for r in indexed)
+
+    def test_pagination_covers_all_transactions(self, index):
+        """Following cursors visits every transaction exactly once"""
+        expected = [r.transaction_id for r in index.iter_transactions(1)]
+
+        seen = []
+        cursor = None
+        while True:
+            page = index.get_page(1, cursor=cursor, limit=7)
+            seen.extend(r.transaction_id for r in page.transactions)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == expected
+
+    def test_date_range_filter(self, index):
+        """Start is inclusive and end is exclusive"""
+        start = datetime(2025, 8, 1)
+        end = datetime(2025, 8, 5)
+        records = list(index.iter_transactions(1, start_date="2025-08-01", end_date=end))
+
+        assert len(records) > 0
+        assert all(start <= r.timestamp < end for r in records)
+
+    def test_timezone_aware_bounds_normalized_to_utc(self, index):
+        """Aware bounds compare in UTC instead of raising TypeError"""
+        naive = list(index.iter_transactions(1, start_date="2025-08-01", end_date="2025-08-05"))
+        eastern = timezone(timedelta(hours=-4))
+
+        assert list(index.iter_transactions(
+            1, start_date="2025-08-01T00:00:00+00:00", end_date=datetime(2025, 8, 4, 20, tzinfo=eastern)
+        )) == naive
+        assert list(index.iter_transactions(1, start_date="2025-07-31T20:00:00-04:00", end_date="2025-08-05")) == naive
+
+    def test_category_filter(self, index):
+        """Only requested categories are returned"""
+        records = list(index.iter_transactions(1, categories=["salary"]))
+
+        assert len(records) > 0
+        assert all(r.category == "salary" for r in records)
+
+    def test_unknown_customer_is_empty(self, index):
+        """Customers without accounts yield nothing"""
+        assert not index.has_customer(9999)
+        assert index.get_page(9999).transactions == []
+
+    def test_invalid_cursor_raises(self, index):
+        """Malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+        with pytest.raises(ValueError):
+            index.get_page(1, cursor="not-a-cursor")
@@ -4,6 +4,7 @@ Ensures zero duplicate API calls and proper caching behavior
 """
 
 import asyncio
+import httpx
 import pytest
 import os
 import time
@@ -17,6 +18,7 @@ from core.api_cache import (
     APIConfig,
     CacheConfig,
     CacheAwareEmbeddings,
+    api_cache,
     cached_llm_call
 )
 
@@ -125,6 +127,124 @@ class TestUnifiedAPICache:
                     assert result == "Fallback response"
                     assert mock_api.call_count == 2, "Should try fallback provider"
     
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_coalesce(self, cache):
+        """ENFORCED: Concurrent misses for one key make a single API call"""
+        
+        async def slow_response(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return "API response"
+        
+        with patch.object(cache, '_execute_api_call', side_effect=slow_response) as mock_api:
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=None):
+                with patch('core.api_cache.cache_manager.set', new_callable=AsyncMock):
+                    results = await asyncio.gather(*[
+                        cache.cached_api_call(
+                            operation="completion",
+                            provider=APIProvider.OPENAI,
+                            prompt="same prompt"
+                        )
+                        for _ in range(5)
+                    ])
+                    
+                    assert results == ["API response"] * 5
+                    assert mock_api.call_count == 1, "VIOLATION: Duplicate in-flight API calls"
+                    assert cache.get_stats()["coalesced_calls"] == 4
+                    assert cache._in_flight == {}
+    
+    @pytest.mark.asyncio
+    async def test_coalesced_callers_share_fallback(self, cache):
+        """Callers joined to a failing call receive the fallback result"""
+        
+        async def flaky(config, *args, **kwargs):
+            await asyncio.sleep(0.05)
+            if config.provider == APIProvider.ANTHROPIC:
+                raise Exception("Provider 1 failed")
+            return "Fallback response"
+        
+        with patch.object(cache, '_execute_api_call', side_effect=flaky) as mock_api:
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=None):
+                with patch('core.api_cache.cache_manager.set', new_callable=AsyncMock):
+                    results = await asyncio.gather(*[
+                        cache.cached_api_call(
+                            operation="completion",
+                            provider=APIProvider.ANTHROPIC,
+                            prompt="test prompt"
+                        )
+                        for _ in range(3)
+                    ])
+                    
+                    assert results == ["Fallback response"] * 3
+                    assert mock_api.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_waits_for_other_process_holding_lock(self, cache):
+        """When another worker holds the key's lock, wait for its cached result"""
+        cache.cache_config.single_flight_poll_seconds = 0.01
+        
+        with patch.object(cache, '_execute_api_call', new_callable=AsyncMock) as mock_api:
+            with patch('core.api_cache.cache_manager') as mock_cache_manager:
+                mock_cache_manager.get = AsyncMock(
+                    side_effect=[None, None, {"result": "Remote response"}]
+                )
+                mock_cache_manager.acquire_lock = AsyncMock(return_value=None)
+                mock_cache_manager.is_locked = AsyncMock(return_value=True)
+                
+                result = await cache.cached_api_call(
+                    operation="completion",
+                    provider=APIProvider.OPENAI,
+                    prompt="test prompt"
+                )
+                
+                assert result == "Remote response"
+                assert mock_api.call_count == 0
+                mock_cache_manager.release_lock.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_stale_result_served_and_refreshed(self, cache):
+        """Entries past the soft TTL are returned immediately and refreshed in the background"""
+        stale_entry = {"result": "Old response", "timestamp": time.time() - 7200, "stale_at": time.time() - 1}
+        
+        with patch.object(cache, '_execute_api_call', new_callable=AsyncMock, return_value="New response") as mock_api:
+            with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=stale_entry):
+                with patch('core.api_cache.cache_manager.set', new_callable=AsyncMock) as mock_set:
+                    result = await cache.cached_api_call(
+                        operation="completion",
+                        provider=APIProvider.OPENAI,
+                        prompt="test prompt"
+                    )
+                    assert result == "Old response"
+                    
+                    # A second stale hit does not start another refresh
+                    await cache.cached_api_call(
+                        operation="completion",
+                        provider=APIProvider.OPENAI,
+                        prompt="test prompt"
+                    )
+                    await asyncio.gather(*cache._refresh_tasks.values())
+                    
+                    assert mock_api.call_count == 1
+                    stored = mock_set.call_args[0][1]
+                    assert stored["result"] == "New response"
+                    assert stored["stale_at"] > time.time()
+                    assert cache.get_stats()["background_refreshes"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_fresh_and_legacy_entries_not_refreshed(self, cache):
+        """Entries within the soft TTL, or written without one, never trigger a refresh"""
+        entries = [
+            {"result": "cached", "timestamp": time.time(), "stale_at": time.time() + 60},
+            {"result": "cached", "timestamp": time.time() - 7200},
+        ]
+        
+        with patch.object(cache, '_execute_api_call', new_callable=AsyncMock) as mock_api:
+            for entry in entries:
+                with patch('core.api_cache.cache_manager.get', new_callable=AsyncMock, return_value=entry):
+                    assert await cache.cached_api_call("completion", provider=APIProvider.OPENAI, prompt="p") == "cached"
+            
+            assert cache._refresh_tasks == {}
+            assert mock_api.call_count == 0
+    
     @pytest.mark.asyncio
     async def test_ttl_configuration(self):
         """Test TTL configuration for different operation types"""
@@ -134,6 +254,10 @@ class TestUnifiedAPICache:
         assert config.get_ttl_for_operation("completion") == 3600   # 1 hour
         assert config.get_ttl_for_operation("analysis") == 1800     # 30 minutes
         assert config.get_ttl_for_operation("unknown") == 3600      # Default
+        
+        # Soft TTL expires up to the jitter early; hard TTL keeps stale results around longer
+        assert 3600 * (1 - config.ttl_jitter) <= config.get_soft_ttl("completion") <= 3600
+        assert config.get_hard_ttl("completion") >= 3600 * config.stale_ttl_multiplier * (1 - config.ttl_jitter) - 1
     
     @pytest.mark.asyncio
     async def test_cache_statistics(self, cache):
@@ -158,36 +282,199 @@ class TestUnifiedAPICache:
                     assert "hit_rate" in stats
 
 
-class TestCacheAwareEmbeddings:
-    """Test cache-aware embeddings"""
+class TestBatchedEmbeddings:
+    """Test batched embedding lookups and requests"""
+    
+    @pytest.fixture
+    def cache(self):
+        UnifiedAPICache._instance = None
+        cache = UnifiedAPICache()
+        cache.configs = {
+            APIProvider.OPENAI.value: APIConfig(
+                provider=APIProvider.OPENAI,
+                api_key="test-key",
+                base_url="https://api.openai.com/v1",
+                model="gpt-4o-mini"
+            )
+        }
+        cache.cache_config.embedding_batch_size = 2
+        cache.cache_config.embedding_max_concurrency = 2
+        return cache
     
     @pytest.mark.asyncio
-    async def test_embedding_caching(self):
-        """ENFORCED: Ensure embeddings are cached properly"""
-        embeddings = CacheAwareEmbeddings()
+    async def test_only_misses_are_sent_in_batches(self, cache):
+        """One multi-get for all texts, de-duplicated misses sent in size-limited batches"""
+        cached_key = cache._generate_cache_key("embedding", "openai", "cached")
+        in_flight = 0
+        max_in_flight = 0
         
-        with patch('core.api_cache.api_cache.cached_api_call', new_callable=AsyncMock) as mock_call:
-            mock_call.return_value = [0.1, 0.2, 0.3]
-            
-            # First call
-            result1 = await embeddings.embed_query("test query")
-            assert mock_call.call_count == 1
+        async def embed(config, texts, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [[float(len(text))] for text in texts]
+        
+        texts = ["cached", "a", "bb", "a", "ccc", "dddd", "eeeee", "ffffff"]
+        with patch.object(cache, '_execute_embedding_batch', side_effect=embed) as mock_batch:
+            with patch('core.api_cache.cache_manager.get_many', new_callable=AsyncMock,
+                       return_value={cached_key: {"result": [0.5]}}) as mock_get_many:
+                with patch('core.api_cache.cache_manager.set_many', new_callable=AsyncMock) as mock_set_many:
+                    vectors = await cache.cached_embeddings(texts, provider=APIProvider.OPENAI)
+        
+        assert vectors == [[0.5], [1.0], [2.0], [1.0], [3.0], [4.0], [5.0], [6.0]]
+        assert mock_get_many.call_count == 1
+        assert mock_batch.call_count == 3  # 6 unique misses in batches of 2
+        assert max_in_flight <= 2
+        assert len(mock_set_many.call_args[0][0]) == 6
+        
+        # Batch entries share keys with the single-text path
+        single_key = cache._generate_cache_key("embedding", "openai", "a")
+        assert single_key in mock_set_many.call_args[0][0]
+    
+    @pytest.mark.asyncio
+    async def test_all_cached_makes_no_request(self, cache):
+        texts = ["x", "y"]
+        keys = [cache._generate_cache_key("embedding", "openai", text) for text in texts]
+        
+        with patch.object(cache, '_execute_embedding_batch', new_callable=AsyncMock) as mock_batch:
+            with patch('core.api_cache.cache_manager.get_many', new_callable=AsyncMock,
+                       return_value={keys[0]: {"result": [1.0]}, keys[1]: {"result": [2.0]}}):
+                assert await cache.cached_embeddings(texts, provider=APIProvider.OPENAI) == [[1.0], [2.0]]
+        
+        assert mock_batch.call_count == 0
+    
+    def test_sync_bridge_reuses_one_loop(self, cache):
+        """Synchronous calls run on one long-lived loop instead of a new loop each time"""
+        
+        async def current_loop():
+            return asyncio.get_running_loop()
+        
+        try:
+            first = cache.run_sync(current_loop())
+            second = cache.run_sync(current_loop())
+            assert first is second
+            assert first.is_running()
+        finally:
+            cache._sync_bridge.stop()
+    
+    @pytest.mark.asyncio
+    async def test_sync_bridge_gets_its_own_http_clients(self, cache):
+        """Clients opened on the caller's loop are never reused from the bridge loop"""
+        config = cache.configs[APIProvider.OPENAI.value]
+        cache.clients[APIProvider.OPENAI.value] = loop_client = httpx.AsyncClient()
+        
+        async def bridge_client():
+            return cache._client(config)
+        
+        try:
+            assert cache._client(config) is loop_client
+            bridge = cache.run_sync(bridge_client())
+            assert bridge is not loop_client
+            assert cache.run_sync(bridge_client()) is bridge
+        finally:
+            await cache.cleanup()
+        assert bridge.is_closed and loop_client.is_closed
+    
+    def test_embeddings_require_embedding_provider(self, cache):
+        cache.configs = {
+            APIProvider.ANTHROPIC.value: APIConfig(
+                provider=APIProvider.ANTHROPIC,
+                api_key="test-key",
+                base_url="https://api.anthropic.com/v1",
+                model="claude-3-haiku"
+            )
+        }
+        
+        with pytest.raises(ValueError):
+            cache._select_embedding_provider()
+    
+    def test_sync_embed_documents_uses_batch_path(self):
+        embeddings = CacheAwareEmbeddings(provider=APIProvider.OPENAI, persist=False)
+        
+        with patch('core.api_cache.api_cache.cached_embeddings', new_callable=AsyncMock) as mock_batch:
+            mock_batch.return_value = [[0.1], [0.2]]
             
-            # Should use same cache mechanism
-            result2 = await embeddings.embed_query("test query")
-            assert mock_call.call_count == 2  # Called again but cache handles deduplication
+            assert embeddings.embed_documents(["a", "b"]) == [[0.1], [0.2]]
+            mock_batch.assert_called_once_with(["a", "b"], provider=APIProvider.OPENAI)
+
     
-    def test_sync_wrapper(self):
-        """Test synchronous wrapper for compatibility"""
-        embeddings = CacheAwareEmbeddings()
+    @pytest.mark.asyncio
+    async def test_embeddings_served_from_disk_store(self, tmp_path):
+        """Stored embeddings skip the API cache; new ones are written to the store"""
+        from core.embedding_store import EmbeddingStore, content_key
+        
+        store = EmbeddingStore(str(tmp_path))
+        store.put(content_key("known", "text-embedding-3-small"), [1.0, 2.0])
+        embeddings = CacheAwareEmbeddings(provider=APIProvider.OPENAI, store=store)
         
-        with patch('core.api_cache.api_cache.cached_api_call_sync') as mock_call:
-            mock_call.return_value = [0.1, 0.2, 0.3]
+        with patch('core.api_cache.api_cache.cached_embeddings', new_callable=AsyncMock) as mock_batch:
+            mock_batch.return_value = [[3.0, 4.0]]
             
-            result = embeddings.embed_query_sync("test query")
+            vectors = await embeddings.aembed_documents(["known", "new"])
+            assert vectors == [[1.0, 2.0], [3.0, 4.0]]
+            mock_batch.assert_called_once_with(["new"], provider=APIProvider.OPENAI)
             
-            assert result == [0.1, 0.2, 0.3]
-            mock_call.assert_called_once()
+            mock_batch.reset_mock()
+            assert await embeddings.aembed_query("new") == [3.0, 4.0]
+            mock_batch.assert_not_called()
+
+
+class TestCacheAwareEmbeddings:
+    """Test cache-aware embeddings"""
+    
+    @pytest.fixture
+    def openai_configured(self):
+        """Embeddings need an OpenAI config on the shared cache"""
+        config = APIConfig(
+            provider=APIProvider.OPENAI,
+            api_key="test-key",
+            base_url="https://api.openai.com/v1",
+            model="gpt-4o-mini"
+        )
+        with patch.dict(api_cache.configs, {APIProvider.OPENAI.value: config}):
+            yield
+    
+    @pytest.mark.asyncio
+    async def test_embedding_caching(self, openai_configured):
+        """ENFORCED: Ensure embeddings are cached properly"""
+        embeddings = CacheAwareEmbeddings(persist=False)
+        assert embeddings.provider == APIProvider.OPENAI
+        stored = {}
+        
+        async def get_many(keys):
+            return {key: stored[key] for key in keys if key in stored}
+        
+        async def set_many(items, ttl=None):
+            stored.update(items)
+            return True
+        
+        async def embed(config, texts, **kwargs):
+            return [[float(len(text))] for text in texts]
+        
+        with patch.object(api_cache, '_execute_embedding_batch', side_effect=embed) as mock_batch:
+            with patch('core.api_cache.cache_manager.get_many', side_effect=get_many):
+                with patch('core.api_cache.cache_manager.set_many', side_effect=set_many):
+                    result1 = await embeddings.aembed_documents(["test query", "other"])
+                    result2 = await embeddings.aembed_documents(["test query", "other"])
+        
+        assert result1 == result2 == [[10.0], [5.0]]
+        assert mock_batch.call_count == 1  # Both texts in one batch; the second call is served from cache
+    
+    def test_sync_wrapper(self, openai_configured):
+        """Synchronous LangChain calls run on the shared sync bridge"""
+        embeddings = CacheAwareEmbeddings(persist=False)
+        
+        with patch.object(api_cache, 'cached_api_call', new_callable=AsyncMock) as mock_call:
+            with patch.object(api_cache, 'run_sync', wraps=api_cache.run_sync) as run_sync:
+                mock_call.return_value = [0.1, 0.2, 0.3]
+                
+                result = embeddings.embed_query("test query")
+        
+        assert result == [0.1, 0.2, 0.3]
+        run_sync.assert_called_once()
+        mock_call.assert_called_once_with(operation="embedding", provider=APIProvider.OPENAI, prompt="test query")
 
 
 class TestCachedDecorator:
@@ -0,0 +1,207 @@
+"""
+Unit tests for the partitioned vector index
+"""
+
+import os
+
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from pathlib import Path
+import sys
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from rag.vector_index import PartitionedVectorIndex
+
+
+def _doc(text, data_type, customer_id=1):
+    return Document(page_content=text, metadata={"data_type": data_type, "customer_id": customer_id})
+
+
+class TestPartitionedVectorIndex:
+    """Test cases for PartitionedVectorIndex"""
+
+    @pytest.fixture
+    def index(self):
+        index = PartitionedVectorIndex(DeterministicFakeEmbedding(size=3), partition_fields=("data_type", "customer_id"))
+        index.add_documents(
+            [
+                _doc("checking", "accounts"),
+                _doc("savings", "accounts", customer_id=2),
+                _doc("groceries", "transactions"),
+                _doc("rent", "transactions"),
+            ],
+            vectors=np.array([[1, 0, 0], [0.9, 0.1, 0], [0.8, 0.2, 0], [0, 1, 0]], dtype=np.float32)
+        )
+        return index
+
+    def test_exact_top_k_over_all_rows(self, index):
+        results = index.search_by_vector([1, 0, 0], k=2)
+
+        assert [doc.page_content for doc, _ in results] == ["checking", "savings"]
+        assert results[0][1] == pytest.approx(1.0)
+
+    def test_search_restricted_to_partition(self, index):
+        """Transactions are returned even when account rows score higher"""
+        results = index.search_by_vector([1, 0, 0], k=5, filter={"data_type": "transactions"})
+
+        assert [doc.page_content for doc, _ in results] == ["groceries", "rent"]
+
+    def test_filters_intersect(self, index):
+        results = index.search_by_vector([1, 0, 0], k=5, filter={"data_type": "accounts", "customer_id": 2})
+
+        assert [doc.page_content for doc, _ in results] == ["savings"]
+        assert index.search_by_vector([1, 0, 0], filter={"data_type": "goals"}) == []
+
+    def test_unindexed_filter_field_rejected(self, index):
+        with pytest.raises(ValueError):
+            index.search_by_vector([1, 0, 0], filter={"account_type": "checking"})
+
+    def test_incremental_add_extends_partitions(self, index):
+        index.add_documents([_doc("brokerage", "accounts")], vectors=np.array([[0, 0, 1]]))
+
+        results = index.search_by_vector([0, 0, 1], k=1, filter={"data_type": "accounts"})
+        assert len(index) == 5
+        assert results[0][0].page_content == "brokerage"
+
+    def test_query_text_embedded(self):
+        index = PartitionedVectorIndex(DeterministicFakeEmbedding(size=16))
+        index.add_documents([_doc("checking balance", "accounts"), _doc("grocery expense", "transactions")])
+
+        assert index.similarity_search("checking balance", k=1)[0].page_content == "checking balance"
+        assert index.as_retriever(k=1, filter={"data_type": "transactions"}).invoke("anything")[0].page_content == "grocery expense"
+
+
+class TestHybridSearch:
+    """Test cases for fused BM25 and vector ranking"""
+
+    def _index(self, embeddings):
+        index = PartitionedVectorIndex(embeddings, partition_fields=("data_type",))
+        index.add_documents(
+            [
+                _doc("Transaction: Starbucks $5.20 dining", "transactions"),
+                _doc("Transaction: Whole Foods $120.00 groceries", "transactions"),
+                _doc("Account: checking balance $2,500.00", "accounts"),
+            ],
+            vectors=np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+        )
+        return index
+
+    def test_lexical_match_found_with_uninformative_embeddings(self):
+        """Constant query vectors leave ranking to BM25"""
+        embeddings = Mock(embed_query=Mock(return_value=[1, 1, 1]))
+        index = self._index(embeddings)
+
+        assert index.hybrid_search("whole foods", k=1)[0].page_content.startswith("Transaction: Whole Foods")
+
+    def test_rankings_fused(self):
+        """A row ranked well by both retrievers beats one ranked first by only one"""
+        embeddings = Mock(embed_query=Mock(return_value=[0.6, 0.8, 0]))
+        index = self._index(embeddings)
+
+        results = index.hybrid_search("starbucks", k=2, filter={"data_type": "transactions"})
+        assert [doc.page_content.split()[1] for doc in results] == ["Starbucks", "Whole"]
+
+    def test_vector_only_when_no_terms_match(self):
+        embeddings = Mock(embed_query=Mock(return_value=[0, 0, 1]))
+
+        assert self._index(embeddings).hybrid_search("net worth", k=1)[0].metadata["data_type"] == "accounts"
+
+    def test_lexical_only_when_embedding_fails(self):
+        embeddings = Mock(embed_query=Mock(side_effect=RuntimeError("no API key")))
+        index = self._index(embeddings)
+
+        assert index.hybrid_search("starbucks", k=3)[0].page_content.startswith("Transaction: Starbucks")
+        assert index.hybrid_search("starbucks", k=3, filter={"data_type": "accounts"}) == []
+
+
+class TestVectorIndexPersistence:
+    """Test cases for saving and memory-mapping indexes"""
+
+    def _index(self):
+        index = PartitionedVectorIndex(DeterministicFakeEmbedding(size=3), partition_fields=("data_type", "customer_id"))
+        index.add_documents(
+            [_doc("checking", "accounts"), _doc("rent", "transactions", customer_id=None)],
+            vectors=np.array([[1, 0, 0], [0, 1, 0]], dtype=np.float32)
+        )
+        return index
+
+    def test_round_trip_memory_mapped(self, tmp_path):
+        self._index().save(str(tmp_path / "index"), fingerprint="v1")
+
+        loaded = PartitionedVectorIndex.load(str(tmp_path / "index"), DeterministicFakeEmbedding(size=3), fingerprint="v1")
+        assert isinstance(loaded.matrix, np.memmap)
+        assert len(loaded) == 2
+        results = loaded.search_by_vector([0, 1, 0], k=1, filter={"customer_id": [1, None]})
+        assert results[0][0].page_content == "rent"
+        assert results[0][0].metadata["customer_id"] is None
+        assert loaded.hybrid_search("rent", k=1)[0].page_content == "rent"
+
+    def test_fingerprint_mismatch_or_missing_not_loaded(self, tmp_path):
+        self._index().save(str(tmp_path / "index"), fingerprint="v1")
+        embeddings = DeterministicFakeEmbedding(size=3)
+
+        assert PartitionedVectorIndex.load(str(tmp_path / "index"), embeddings, fingerprint="v2") is None
+        assert PartitionedVectorIndex.load(str(tmp_path / "missing"), embeddings) is None
+
+    def test_save_replaces_previous_index(self, tmp_path):
+        path = str(tmp_path / "index")
+        self._index().save(path, fingerprint="v1")
+        self._index().save(path, fingerprint="v2")
+
+        assert PartitionedVectorIndex.load(path, DeterministicFakeEmbedding(size=3), fingerprint="v2") is not None
+        # Only the link and the version it points to remain
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["index", (tmp_path / "index").resolve().name])
+
+    def test_legacy_directory_replaced(self, tmp_path):
+        """Indexes saved as a plain directory are replaced by the versioned layout"""
+        legacy = tmp_path / "index"
+        legacy.mkdir()
+        (legacy / "manifest.json").write_text("{}")
+
+        self._index().save(str(legacy), fingerprint="v1")
+
+        assert legacy.is_symlink()
+        assert PartitionedVectorIndex.load(str(legacy), DeterministicFakeEmbedding(size=3), fingerprint="v1") is not None
+
+    def test_index_visible_throughout_save(self, tmp_path, monkeypatch):
+        """A reader at any point of a save finds a complete index"""
+        path = str(tmp_path / "index")
+        embeddings = DeterministicFakeEmbedding(size=3)
+        self._index().save(path, fingerprint="v1")
+        visible = []
+        real_replace = os.replace
+
+        def replace(src, dst):
+            visible.append(PartitionedVectorIndex.load(path, embeddings, fingerprint="v1") is not None)
+            real_replace(src, dst)
+            visible.append(PartitionedVectorIndex.load(path, embeddings, fingerprint="v1") is not None)
+
+        monkeypatch.setattr("rag.vector_index.os.replace", replace)
+        self._index().save(path, fingerprint="v1")
+
+        assert visible and all(visible)
+
+    def test_load_retries_version_removed_by_concurrent_save(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "index")
+        self._index().save(path, fingerprint="v1")
+        real_load_version = PartitionedVectorIndex._load_version
+        versions = []
+
+        def racing_load_version(version_dir, *args):
+            if not versions:
+                # Another process saves between resolving the link and reading the files
+                self._index().save(path, fingerprint="v1")
+            versions.append(version_dir)
+            return real_load_version(version_dir, *args)
+
+        monkeypatch.setattr(PartitionedVectorIndex, "_load_version", staticmethod(racing_load_version))
+        loaded = PartitionedVectorIndex.load(path, DeterministicFakeEmbedding(size=3), fingerprint="v1")
+
+        assert loaded is not None and len(loaded) == 2
+        assert len(versions) == 2 and versions[0] != versions[1]